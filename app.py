@@ -1,32 +1,49 @@
 import os
+from datetime import timedelta
 
 import structlog
 from flask import Flask, jsonify
 from flask_cors import CORS
 
-from src.application.services.unit_service_impl import UnitServiceImpl
-from src.application.use_cases.get_tracking_history import \
-    GetTrackingHistoryUseCase
+from src.application.use_cases.get_tracking_history import (
+    CachedGetTrackingHistoryUseCase, GetTrackingHistoryUseCase)
 from src.application.use_cases.list_units_by_status import \
     ListUnitsByStatusUseCase
 from src.application.use_cases.register_checkpoint import \
     RegisterCheckpointUseCase
+from src.application.use_cases.register_checkpoint_batch import \
+    RegisterCheckpointBatchUseCase
+from src.application.use_cases.register_shipment_checkpoint import \
+    RegisterShipmentCheckpointUseCase
 from src.domain.value_objects.unit_status import UnitStatus
 from src.infrastructure.database.database import init_database
+from src.infrastructure.database.group_commit import create_group_commit
+from src.infrastructure.database.unit_locks import create_unit_lock
+from src.infrastructure.external.batch_jobs import CheckpointBatchJobs
 from src.infrastructure.external.celery_config import celery
+from src.infrastructure.external.checkpoint_stream import CheckpointStream
+from src.infrastructure.external.tracking_cache import \
+    create_tracking_history_cache
 from src.infrastructure.monitoring.health import create_health_endpoints
-from src.infrastructure.monitoring.metrics import (track_business_metrics,
+from src.infrastructure.monitoring.metrics import (init_query_metrics,
+                                                   track_business_metrics,
                                                    track_request_metrics)
 from src.infrastructure.repositories.checkpoint_repository_impl import \
     CheckpointRepositoryImpl
+from src.infrastructure.repositories.shipment_repository_impl import \
+    ShipmentRepositoryImpl
 from src.infrastructure.repositories.unit_repository_impl import \
     UnitRepositoryImpl
 from src.infrastructure.security.auth import (init_auth, log_request,
                                               rate_limit, require_api_key,
                                               validate_content_type)
+from src.infrastructure.security.idempotency import (create_idempotency_store,
+                                                     idempotent)
 from src.infrastructure.security.middleware import SecurityMiddleware
+from src.presentation.cli.tracking_commands import tracking_cli
 from src.presentation.controllers.checkpoint_controller import \
     CheckpointController
+from src.presentation.schemas.checkpoint_schemas import NDJSON_MIMETYPE
 
 
 def configure_logging():
@@ -50,70 +67,149 @@ def configure_logging():
     )
 
 
-def create_app():
-    """Factory function para crear la aplicación Flask"""
-
-    # Configurar logging
-    configure_logging()
-    logger = structlog.get_logger(__name__)
+def create_use_cases(app, unit_repository: UnitRepositoryImpl, logger) -> dict:
+    """
+    Crea los casos de uso de checkpoints
 
-    app = Flask(__name__)
-
-    # Configurar CORS
-    CORS(app, origins=["*"])
-
-    # Configurar seguridad
-    init_auth(app)
-    SecurityMiddleware(app)
-
-    # Configurar base de datos
-    db = init_database(app)
-
-    # Configurar Celery
-    celery.conf.update(
-        broker_url=os.getenv("REDIS_URL", "redis://localhost:6379/0"),
-        result_backend=os.getenv("REDIS_URL", "redis://localhost:6379/0"),
-    )
-
-    # Inicializar repositorios
-    unit_repository = UnitRepositoryImpl()
+    Returns:
+        dict: Casos de uso por nombre de argumento de CheckpointController
+    """
     checkpoint_repository = CheckpointRepositoryImpl()
+    shipment_repository = ShipmentRepositoryImpl()
 
-    # Inicializar servicios de dominio
-    unit_service = UnitServiceImpl(unit_repository)
-
-    # Inicializar casos de uso
-    register_checkpoint_use_case = RegisterCheckpointUseCase(
-        unit_repository=unit_repository,
-        checkpoint_repository=checkpoint_repository,
-        unit_service=unit_service,
+    # Ventana para aceptar checkpoints tardíos (p. ej. handhelds sin conexión)
+    app.config["CHECKPOINT_REORDER_WINDOW"] = timedelta(
+        seconds=int(os.getenv("CHECKPOINT_REORDER_WINDOW_SECONDS", "0"))
     )
 
+    # Caché opcional del historial de tracking (TRACKING_CACHE_TTL_SECONDS > 0);
+    # los casos de uso de escritura la invalidan después de cada commit
+    history_cache = create_tracking_history_cache()
+
     get_tracking_history_use_case = GetTrackingHistoryUseCase(
         unit_repository=unit_repository, checkpoint_repository=checkpoint_repository
     )
+    if history_cache:
+        get_tracking_history_use_case = CachedGetTrackingHistoryUseCase(
+            get_tracking_history_use_case, history_cache
+        )
+        logger.info(
+            "Caché de historial de tracking habilitada",
+            ttl=history_cache.ttl,
+            final_ttl=history_cache.final_ttl,
+        )
 
-    list_units_by_status_use_case = ListUnitsByStatusUseCase(
-        unit_repository=unit_repository
-    )
+    return {
+        "register_checkpoint_use_case": RegisterCheckpointUseCase(
+            unit_repository=unit_repository,
+            reorder_window=app.config["CHECKPOINT_REORDER_WINDOW"],
+            unit_lock=create_unit_lock(app.config["SQLALCHEMY_DATABASE_URI"]),
+            history_cache=history_cache,
+        ),
+        "get_tracking_history_use_case": get_tracking_history_use_case,
+        "list_units_by_status_use_case": ListUnitsByStatusUseCase(
+            unit_repository=unit_repository
+        ),
+        "register_checkpoint_batch_use_case": RegisterCheckpointBatchUseCase(
+            unit_repository=unit_repository,
+            reorder_window=app.config["CHECKPOINT_REORDER_WINDOW"],
+            history_cache=history_cache,
+        ),
+        "register_shipment_checkpoint_use_case": RegisterShipmentCheckpointUseCase(
+            shipment_repository=shipment_repository,
+            unit_repository=unit_repository,
+            history_cache=history_cache,
+        ),
+    }
+
+
+def create_checkpoint_controller(use_cases: dict, logger) -> CheckpointController:
+    """Crea el controlador de checkpoints con los modos de ingesta configurados"""
+    # Modo de ingesta: "sync" escribe en la base de datos dentro del request,
+    # "stream" encola el checkpoint en Redis Streams (write-behind)
+    checkpoint_stream = None
+    if os.getenv("CHECKPOINT_INGESTION_MODE", "sync") == "stream":
+        checkpoint_stream = CheckpointStream.from_env()
+        logger.info("Ingesta de checkpoints en modo stream")
+
+    # Group commit opcional: agrupa en una transacción los registros
+    # concurrentes del worker (CHECKPOINT_GROUP_COMMIT_WINDOW_MS > 0)
+    group_commit = create_group_commit(use_cases["register_checkpoint_use_case"])
+    if group_commit:
+        logger.info(
+            "Group commit de checkpoints habilitado",
+            window_ms=group_commit.window * 1000,
+            max_batch_size=group_commit.max_batch_size,
+        )
 
-    # Inicializar controlador
-    checkpoint_controller = CheckpointController(
-        register_checkpoint_use_case=register_checkpoint_use_case,
-        get_tracking_history_use_case=get_tracking_history_use_case,
-        list_units_by_status_use_case=list_units_by_status_use_case,
+    return CheckpointController(
+        register_checkpoint_use_case=use_cases["register_checkpoint_use_case"],
+        get_tracking_history_use_case=use_cases["get_tracking_history_use_case"],
+        list_units_by_status_use_case=use_cases["list_units_by_status_use_case"],
+        register_checkpoint_batch_use_case=use_cases[
+            "register_checkpoint_batch_use_case"
+        ],
+        checkpoint_stream=checkpoint_stream,
+        register_shipment_checkpoint_use_case=use_cases[
+            "register_shipment_checkpoint_use_case"
+        ],
+        group_commit=group_commit,
+        batch_jobs=CheckpointBatchJobs.from_env(),
     )
 
-    # Registrar rutas con seguridad y métricas
+
+def register_checkpoint_routes(app, checkpoint_controller: CheckpointController):
+    """Registra las rutas de checkpoints con seguridad y métricas"""
+    # Respuestas guardadas por Idempotency-Key para reintentos de escáneres
+    idempotency_store = create_idempotency_store()
+
     @app.route("/api/v1/checkpoints", methods=["POST"])
     @require_api_key
     @rate_limit(max_requests=1000, window=3600)  # 1000 requests por hora
     @validate_content_type()
+    @idempotent(idempotency_store)
     @track_request_metrics
     @track_business_metrics("checkpoint_registration")
     def register_checkpoint():
         return checkpoint_controller.register_checkpoint()
 
+    @app.route("/api/v1/checkpoints/batch", methods=["POST"])
+    @require_api_key
+    @rate_limit(max_requests=200, window=3600)  # 200 lotes por hora
+    @validate_content_type("application/json", NDJSON_MIMETYPE)
+    @idempotent(idempotency_store)
+    @track_request_metrics
+    @track_business_metrics("checkpoint_batch_registration")
+    def register_checkpoint_batch():
+        return checkpoint_controller.register_checkpoint_batch()
+
+    @app.route("/api/v1/checkpoints/batch/jobs", methods=["POST"])
+    @require_api_key
+    @rate_limit(max_requests=200, window=3600)  # 200 lotes por hora
+    @validate_content_type("application/json", NDJSON_MIMETYPE)
+    @idempotent(idempotency_store)
+    @track_request_metrics
+    @track_business_metrics("checkpoint_batch_job_submission")
+    def submit_checkpoint_batch_job():
+        return checkpoint_controller.submit_checkpoint_batch_job()
+
+    @app.route("/api/v1/checkpoints/batch/jobs/<job_id>", methods=["GET"])
+    @require_api_key
+    @rate_limit(max_requests=5000, window=3600)  # consultas de avance
+    @track_request_metrics
+    def get_checkpoint_batch_job(job_id):
+        return checkpoint_controller.get_checkpoint_batch_job(job_id)
+
+    @app.route("/api/v1/shipments/<tracking_id>/checkpoints", methods=["POST"])
+    @require_api_key
+    @rate_limit(max_requests=200, window=3600)  # 200 eventos de envío por hora
+    @validate_content_type()
+    @idempotent(idempotency_store)
+    @track_request_metrics
+    @track_business_metrics("shipment_checkpoint_registration")
+    def register_shipment_checkpoint(tracking_id):
+        return checkpoint_controller.register_shipment_checkpoint(tracking_id)
+
     @app.route("/api/v1/tracking/<tracking_id>", methods=["GET"])
     @require_api_key
     @rate_limit(max_requests=2000, window=3600)  # 2000 requests por hora
@@ -130,8 +226,9 @@ def create_app():
     def list_units_by_status():
         return checkpoint_controller.list_units_by_status()
 
-    # Health check endpoints
-    create_health_endpoints(app)
+
+def register_operational_routes(app, unit_repository, logger):
+    """Registra los endpoints de monitoreo de Celery y de prueba"""
 
     # Endpoint para monitorear tareas de Celery
     @app.route("/api/v1/celery/status", methods=["GET"])
@@ -183,7 +280,10 @@ def create_app():
         except Exception as e:
             return jsonify({"error": str(e)}), 500
 
-    # Manejador de errores global
+
+def register_error_handlers(app, logger):
+    """Registra los manejadores de errores globales"""
+
     @app.errorhandler(404)
     def not_found(error):
         return jsonify({"error": "not_found", "message": "Endpoint no encontrado"}), 404
@@ -205,6 +305,50 @@ def create_app():
             500,
         )
 
+
+def create_app():
+    """Factory function para crear la aplicación Flask"""
+
+    # Configurar logging
+    configure_logging()
+    logger = structlog.get_logger(__name__)
+
+    app = Flask(__name__)
+
+    # Configurar CORS
+    CORS(app, origins=["*"])
+
+    # Configurar seguridad
+    init_auth(app)
+    SecurityMiddleware(app)
+
+    # Configurar base de datos
+    db = init_database(app)
+    init_query_metrics(app)
+
+    # Configurar Celery
+    celery.conf.update(
+        broker_url=os.getenv("REDIS_URL", "redis://localhost:6379/0"),
+        result_backend=os.getenv("REDIS_URL", "redis://localhost:6379/0"),
+    )
+
+    # Inicializar repositorios, casos de uso y controlador
+    unit_repository = UnitRepositoryImpl()
+    use_cases = create_use_cases(app, unit_repository, logger)
+    checkpoint_controller = create_checkpoint_controller(use_cases, logger)
+
+    # Comandos CLI (flask tracking ...)
+    app.cli.add_command(tracking_cli)
+
+    # Registrar rutas con seguridad y métricas
+    register_checkpoint_routes(app, checkpoint_controller)
+
+    # Health check endpoints
+    create_health_endpoints(app)
+
+    register_operational_routes(app, unit_repository, logger)
+    register_error_handlers(app, logger)
+
     # Crear tablas de base de datos
     with app.app_context():
         try:
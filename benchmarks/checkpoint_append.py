@@ -0,0 +1,103 @@
+"""
+Benchmark del costo por checkpoint agregado a medida que crece el historial.
+
+Compara el modo append-only de UnitRepositoryImpl con el modo legado que
+reescribe el historial completo en cada save.
+
+Uso:
+    python -m benchmarks.checkpoint_append [--history 1000] [--samples 20]
+"""
+
+import argparse
+from datetime import datetime, timedelta
+
+from benchmarks.support import (StatementCounter, create_benchmark_app,
+                                print_table, timed)
+from src.domain.entities.unit import Unit
+from src.domain.value_objects.checkpoint_data import CheckpointData
+from src.domain.value_objects.tracking_id import TrackingId
+from src.domain.value_objects.unit_status import UnitStatus
+from src.infrastructure.database.database import db
+from src.infrastructure.repositories.unit_repository_impl import \
+    UnitRepositoryImpl
+
+# IN_TRANSIT <-> AT_FACILITY es un ciclo válido que permite historiales largos
+CYCLE = [UnitStatus.IN_TRANSIT, UnitStatus.AT_FACILITY]
+
+
+def run_mode(append_only: bool, history: int, samples: int, sample_sizes):
+    repository = UnitRepositoryImpl(append_only=append_only)
+    counter = StatementCounter(db.engine)
+    mode = "append" if append_only else "rewrite"
+
+    start = datetime.utcnow() - timedelta(days=1)
+    unit = Unit(
+        tracking_id=TrackingId(f"BENCH-{mode.upper()}"),
+        current_status=UnitStatus.CREATED,
+        created_at=start,
+        updated_at=start,
+        checkpoints=[],
+    )
+    unit.add_checkpoint(CheckpointData(status=UnitStatus.PICKED_UP, timestamp=start))
+    unit = repository.save(unit)
+
+    rows = []
+    step = 0
+    sample_points = set(sample_sizes)
+    while len(unit.checkpoints) <= history:
+        step += 1
+        status = CYCLE[step % 2]
+        unit.add_checkpoint(
+            CheckpointData(status=status, timestamp=start + timedelta(seconds=step))
+        )
+
+        size = len(unit.checkpoints)
+        if size in sample_points:
+            durations = []
+            statements = []
+            for _ in range(samples):
+                with counter.counting(), timed() as elapsed:
+                    unit = repository.save(unit)
+                durations.append(elapsed["ms"])
+                statements.append(counter.count)
+
+                step += 1
+                unit.add_checkpoint(
+                    CheckpointData(
+                        status=CYCLE[step % 2],
+                        timestamp=start + timedelta(seconds=step),
+                    )
+                )
+            rows.append(
+                (
+                    mode,
+                    size,
+                    round(sum(durations) / len(durations), 3),
+                    round(sum(statements) / len(statements), 1),
+                )
+            )
+
+        unit = repository.save(unit)
+
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--history", type=int, default=1000)
+    parser.add_argument("--samples", type=int, default=20)
+    args = parser.parse_args()
+
+    sizes = [size for size in (10, 100, 250, 500, 1000, 2000) if size <= args.history]
+
+    app = create_benchmark_app()
+    with app.app_context():
+        db.create_all()
+        rows = run_mode(True, args.history, args.samples, sizes)
+        rows += run_mode(False, args.history, args.samples, sizes)
+
+    print_table(("mode", "history", "ms/append", "statements/append"), rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""
+Prueba de estrés de escaneos concurrentes sobre una misma unidad.
+
+Varios hilos registran checkpoints para el mismo tracking ID a través de
+RegisterCheckpointUseCase y se reporta el throughput, los conflictos de
+versión reintentados y si hubo actualizaciones perdidas (checkpoints
+confirmados que no quedaron en la base de datos). Con --lock se compara
+contra la serialización por tracking ID (striped o advisory).
+
+Uso:
+    python -m benchmarks.checkpoint_concurrency [--workers 16] [--scans 400]
+        [--lock none|striped|advisory] [--database-url postgresql://...]
+"""
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from benchmarks.support import create_benchmark_app, print_table
+from src.application.use_cases.register_checkpoint import \
+    RegisterCheckpointUseCase
+from src.domain.entities.unit import Unit
+from src.domain.exceptions import ConcurrentModificationError
+from src.domain.value_objects.checkpoint_data import CheckpointData
+from src.domain.value_objects.tracking_id import TrackingId
+from src.domain.value_objects.unit_status import UnitStatus
+from src.infrastructure.database.database import db
+from src.infrastructure.database.models import CheckpointModel, UnitModel
+from src.infrastructure.database.unit_locks import (AdvisoryUnitLock,
+                                                    StripedUnitLock)
+from src.infrastructure.repositories.unit_repository_impl import \
+    UnitRepositoryImpl
+
+# IN_TRANSIT <-> AT_FACILITY es un ciclo válido que permite historiales largos
+CYCLE = [UnitStatus.IN_TRANSIT, UnitStatus.AT_FACILITY]
+TRACKING_ID = TrackingId("STRESS0001")
+
+
+class ConflictCountingRepository(UnitRepositoryImpl):
+    """Repositorio que cuenta los conflictos de versión detectados"""
+
+    def __init__(self):
+        super().__init__()
+        self.conflicts = 0
+        self._lock = threading.Lock()
+
+    def save_with_checkpoint(self, unit, checkpoint):
+        try:
+            return super().save_with_checkpoint(unit, checkpoint)
+        except ConcurrentModificationError:
+            with self._lock:
+                self.conflicts += 1
+            raise
+
+
+def seed_unit(repository: UnitRepositoryImpl) -> None:
+    start = datetime.utcnow() - timedelta(hours=1)
+    unit = Unit(
+        tracking_id=TRACKING_ID,
+        current_status=UnitStatus.CREATED,
+        created_at=start,
+        updated_at=start,
+        checkpoints=[],
+    )
+    unit.add_checkpoint(CheckpointData(status=UnitStatus.PICKED_UP, timestamp=start))
+    repository.save(unit)
+
+
+LOCKS = {"none": None, "striped": StripedUnitLock, "advisory": AdvisoryUnitLock}
+
+
+def run(app, workers: int, scans: int, max_retries: int, lock: str):
+    repository = ConflictCountingRepository()
+    use_case = RegisterCheckpointUseCase(
+        unit_repository=repository,
+        max_retries=max_retries,
+        unit_lock=LOCKS[lock]() if LOCKS[lock] else None,
+    )
+    outcomes = {"success": 0, "rejected": 0, "exhausted": 0, "error": 0}
+    outcomes_lock = threading.Lock()
+
+    def scan(index: int):
+        with app.app_context():
+            checkpoint_data = CheckpointData(
+                status=CYCLE[index % 2], timestamp=datetime.utcnow()
+            )
+            try:
+                use_case.execute(TRACKING_ID, checkpoint_data)
+                outcome = "success"
+            except ValueError:
+                # Transición o timestamp inválido frente al estado ganador
+                outcome = "rejected"
+            except ConcurrentModificationError:
+                outcome = "exhausted"
+            except Exception:
+                outcome = "error"
+            finally:
+                db.session.remove()
+            with outcomes_lock:
+                outcomes[outcome] += 1
+
+    with app.app_context():
+        seed_unit(repository)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(scan, range(scans)))
+    elapsed = time.perf_counter() - started
+
+    with app.app_context():
+        stored = (
+            db.session.query(CheckpointModel)
+            .filter_by(tracking_id=str(TRACKING_ID))
+            .count()
+        )
+        version = (
+            db.session.query(UnitModel.version)
+            .filter_by(tracking_id=str(TRACKING_ID))
+            .scalar()
+        )
+
+    # El checkpoint inicial más uno por cada registro confirmado
+    lost_updates = 1 + outcomes["success"] - stored
+    return (
+        lock,
+        workers,
+        scans,
+        round(elapsed, 2),
+        round(scans / elapsed, 1),
+        outcomes["success"],
+        outcomes["rejected"],
+        repository.conflicts,
+        outcomes["exhausted"],
+        outcomes["error"],
+        lost_updates,
+        version,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--scans", type=int, default=400)
+    parser.add_argument("--max-retries", type=int, default=5)
+    parser.add_argument("--lock", choices=LOCKS, default=None)
+    parser.add_argument("--database-url", default=None)
+    args = parser.parse_args()
+
+    # SQLite en memoria comparte una sola conexión entre hilos: usar archivo
+    database_url = args.database_url
+    if database_url is None:
+        path = os.path.join(tempfile.mkdtemp(), "stress.db")
+        database_url = f"sqlite:///{path}"
+
+    app = create_benchmark_app(database_url)
+    locks = [args.lock] if args.lock else ["none", "striped"]
+    rows = []
+    for lock in locks:
+        with app.app_context():
+            db.drop_all()
+            db.create_all()
+        rows.append(run(app, args.workers, args.scans, args.max_retries, lock))
+
+    print_table(
+        (
+            "lock",
+            "workers",
+            "scans",
+            "seconds",
+            "scans/s",
+            "succeeded",
+            "rejected",
+            "conflicts",
+            "exhausted",
+            "errors",
+            "lost",
+            "version",
+        ),
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
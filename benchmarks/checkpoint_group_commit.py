@@ -0,0 +1,159 @@
+"""
+Benchmark del group commit de checkpoints.
+
+Varios hilos registran checkpoints sobre unidades distintas, primero con un
+commit por request (RegisterCheckpointUseCase.execute) y luego a través de
+GroupCommitCoordinator. Se reportan los escaneos y los commits por segundo y
+el tamaño promedio de grupo: con group commit cada commit (y su fsync)
+confirma varios escaneos.
+
+Uso:
+    python -m benchmarks.checkpoint_group_commit [--workers 32] [--scans 20]
+        [--window-ms 2] [--max-batch 64] [--database-url postgresql://...]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+
+from benchmarks.support import create_benchmark_app, print_table
+from src.application.use_cases.register_checkpoint import \
+    RegisterCheckpointUseCase
+from src.domain.entities.unit import Unit
+from src.domain.value_objects.checkpoint_data import CheckpointData
+from src.domain.value_objects.tracking_id import TrackingId
+from src.domain.value_objects.unit_status import UnitStatus
+from src.infrastructure.database.database import db
+from src.infrastructure.database.group_commit import GroupCommitCoordinator
+from src.infrastructure.repositories.unit_repository_impl import \
+    UnitRepositoryImpl
+
+# IN_TRANSIT <-> AT_FACILITY es un ciclo válido que permite historiales largos
+CYCLE = [UnitStatus.IN_TRANSIT, UnitStatus.AT_FACILITY]
+
+
+def seed_units(repository: UnitRepositoryImpl, workers: int) -> None:
+    start = datetime.utcnow() - timedelta(hours=1)
+    for worker in range(workers):
+        unit = Unit(
+            tracking_id=TrackingId(f"GROUP{worker:05d}"),
+            current_status=UnitStatus.CREATED,
+            created_at=start,
+            updated_at=start,
+            checkpoints=[],
+        )
+        unit.add_checkpoint(
+            CheckpointData(status=UnitStatus.PICKED_UP, timestamp=start)
+        )
+        repository.save(unit)
+
+
+def run(app, mode: str, workers: int, scans: int, window: float, max_batch: int):
+    repository = UnitRepositoryImpl()
+    use_case = RegisterCheckpointUseCase(
+        unit_repository=repository,
+    )
+    coordinator = GroupCommitCoordinator(
+        use_case, window=window, max_batch_size=max_batch
+    )
+    register = coordinator.submit if mode == "group" else use_case.execute
+
+    def scan_unit(worker: int) -> int:
+        """Registra los escaneos de una unidad y retorna los rechazados"""
+        failed = 0
+        with app.app_context():
+            tracking_id = TrackingId(f"GROUP{worker:05d}")
+            for step in range(scans):
+                checkpoint_data = CheckpointData(
+                    status=CYCLE[step % 2], timestamp=datetime.utcnow()
+                )
+                try:
+                    register(tracking_id, checkpoint_data)
+                except Exception:
+                    failed += 1
+            db.session.remove()
+        return failed
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        seed_units(repository, workers)
+        engine = db.engine
+
+    commits = []
+
+    def on_commit(conn):
+        commits.append(1)
+
+    event.listen(engine, "commit", on_commit)
+    started = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            failed = sum(executor.map(scan_unit, range(workers)))
+    finally:
+        elapsed = time.perf_counter() - started
+        event.remove(engine, "commit", on_commit)
+
+    total = workers * scans
+    return (
+        mode,
+        workers,
+        total,
+        failed,
+        round(elapsed, 2),
+        round(total / elapsed, 1),
+        round(len(commits) / elapsed, 1),
+        round((total - failed) / max(len(commits), 1), 1),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, default=32)
+    parser.add_argument("--scans", type=int, default=20)
+    parser.add_argument("--window-ms", type=float, default=2.0)
+    parser.add_argument("--max-batch", type=int, default=64)
+    parser.add_argument("--database-url", default=None)
+    args = parser.parse_args()
+
+    # SQLite en memoria comparte una sola conexión entre hilos: usar archivo
+    database_url = args.database_url
+    if database_url is None:
+        path = os.path.join(tempfile.mkdtemp(), "group_commit.db")
+        database_url = f"sqlite:///{path}"
+
+    app = create_benchmark_app(database_url)
+    rows = [
+        run(
+            app,
+            mode,
+            args.workers,
+            args.scans,
+            args.window_ms / 1000,
+            args.max_batch,
+        )
+        for mode in ("per_request", "group")
+    ]
+
+    print_table(
+        (
+            "mode",
+            "workers",
+            "scans",
+            "failed",
+            "seconds",
+            "scans/s",
+            "commits/s",
+            "scans/commit",
+        ),
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
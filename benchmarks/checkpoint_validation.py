@@ -0,0 +1,87 @@
+"""
+Benchmark de la validación del payload de registro de checkpoint.
+
+Compara el camino marshmallow (json.loads, RegisterCheckpointSchema
+instanciado por request y construcción de los objetos de dominio) con el
+validador precompilado (decodificador rápido y una sola validación por
+campo), para un payload válido y uno inválido.
+
+Uso:
+    python -m benchmarks.checkpoint_validation [--iterations 20000]
+"""
+
+import argparse
+import json
+import time
+from datetime import datetime, timedelta
+
+from marshmallow import ValidationError
+
+from benchmarks.support import print_table
+from src.presentation.schemas.checkpoint_schemas import \
+    RegisterCheckpointSchema
+from src.presentation.schemas.checkpoint_validator import (
+    CheckpointPayloadValidator, build_checkpoint, loads)
+
+TIMESTAMP = (datetime.utcnow() - timedelta(hours=1)).isoformat()
+PAYLOADS = {
+    "valid": {
+        "tracking_id": "TEST123456",
+        "checkpoint_data": {
+            "status": "PICKED_UP",
+            "timestamp": TIMESTAMP,
+            "location": "Centro de distribución",
+            "notes": "Paquete recogido exitosamente",
+            "operator_id": "OP001",
+        },
+    },
+    "invalid": {
+        "tracking_id": "AB",
+        "checkpoint_data": {"status": "LOST", "timestamp": TIMESTAMP},
+    },
+}
+
+
+def marshmallow_path(body: bytes):
+    return build_checkpoint(RegisterCheckpointSchema().load(json.loads(body)))
+
+
+def make_fast_path():
+    validator = CheckpointPayloadValidator()
+
+    def fast_path(body: bytes):
+        return validator.load(loads(body))
+
+    return fast_path
+
+
+def measure(parse, body: bytes, iterations: int) -> float:
+    """Retorna los microsegundos promedio por payload"""
+    started = time.perf_counter()
+    for _ in range(iterations):
+        try:
+            parse(body)
+        except ValidationError:
+            pass
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    rows = []
+    for name, payload in PAYLOADS.items():
+        body = json.dumps(payload).encode("utf-8")
+        baseline = measure(marshmallow_path, body, args.iterations)
+        fast = measure(make_fast_path(), body, args.iterations)
+        rows.append(
+            (name, round(baseline, 1), round(fast, 1), round(baseline / fast, 1))
+        )
+
+    print_table(("payload", "marshmallow_us", "fast_us", "speedup"), rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""
+Benchmark de la latencia de una página de unidades por estado.
+
+Crea flotas sintéticas de unidades IN_TRANSIT de distintos tamaños y mide
+una página de ListUnitsByStatusUseCase (LIMIT/OFFSET y COUNT en SQL)
+frente al camino anterior, que cargaba todas las unidades del estado con
+sus checkpoints y recortaba la página en Python. También compara la última
+página de la flota leída por OFFSET con la misma página leída por cursor
+(keyset sobre created_at, id).
+
+Uso:
+    python -m benchmarks.list_units_pagination [--fleets 1000,10000,100000]
+        [--limit 100] [--samples 5] [--legacy-max 10000]
+"""
+
+import argparse
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+from sqlalchemy import insert
+
+from benchmarks.support import (StatementCounter, create_benchmark_app,
+                                print_table, timed)
+from src.application.use_cases.list_units_by_status import \
+    ListUnitsByStatusUseCase
+from src.application.use_cases.pagination import encode_cursor
+from src.domain.value_objects.unit_status import UnitStatus
+from src.infrastructure.database.database import db
+from src.infrastructure.database.models import CheckpointModel, UnitModel
+from src.infrastructure.repositories.unit_repository_impl import \
+    UnitRepositoryImpl
+
+STATUS = UnitStatus.IN_TRANSIT
+
+
+def grow_fleet(current: int, target: int) -> None:
+    """Agrega unidades IN_TRANSIT con un checkpoint hasta llegar a target"""
+    start = datetime.utcnow() - timedelta(days=30)
+    for offset in range(current, target, 10000):
+        units, checkpoints = [], []
+        for index in range(offset, min(offset + 10000, target)):
+            unit_id = str(uuid4())
+            tracking_id = f"FLEET{index:08d}"
+            timestamp = start + timedelta(seconds=index)
+            units.append(
+                {
+                    "id": unit_id,
+                    "tracking_id": tracking_id,
+                    "current_status": STATUS.value,
+                    "version": 1,
+                    "created_at": timestamp,
+                    "updated_at": timestamp,
+                }
+            )
+            checkpoints.append(
+                {
+                    "id": str(uuid4()),
+                    "tracking_id": tracking_id,
+                    "status": STATUS.value,
+                    "timestamp": timestamp,
+                    "unit_id": unit_id,
+                    "created_at": timestamp,
+                }
+            )
+        db.session.execute(insert(UnitModel), units)
+        db.session.execute(insert(CheckpointModel), checkpoints)
+        db.session.commit()
+
+
+def legacy_page(repository: UnitRepositoryImpl, limit: int, offset: int) -> dict:
+    """Camino anterior: cargar todo el estado y recortar en Python"""
+    units = repository.find_by_status(STATUS)
+    return {
+        "units": [unit.to_dict() for unit in units[offset : offset + limit]],
+        "total": len(units),
+    }
+
+
+def measure(page, samples: int, counter: StatementCounter):
+    durations, statements = [], []
+    for _ in range(samples):
+        with counter.counting(), timed() as elapsed:
+            page()
+        db.session.expunge_all()
+        durations.append(elapsed["ms"])
+        statements.append(counter.count)
+    return round(sum(durations) / samples, 2), round(sum(statements) / samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--fleets", default="1000,10000,100000")
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--samples", type=int, default=5)
+    parser.add_argument("--legacy-max", type=int, default=10000)
+    args = parser.parse_args()
+
+    app = create_benchmark_app()
+    rows = []
+    with app.app_context():
+        db.create_all()
+        repository = UnitRepositoryImpl()
+        use_case = ListUnitsByStatusUseCase(repository)
+        counter = StatementCounter(db.engine)
+
+        fleet = 0
+        for target in sorted(int(size) for size in args.fleets.split(",")):
+            grow_fleet(fleet, target)
+            fleet = target
+
+            sql_ms, sql_statements = measure(
+                lambda: use_case.execute(STATUS, limit=args.limit),
+                args.samples,
+                counter,
+            )
+            deep_offset = max(fleet - args.limit, 0)
+            deep_offset_ms, _ = measure(
+                lambda: use_case.execute(STATUS, limit=args.limit, offset=deep_offset),
+                args.samples,
+                counter,
+            )
+            (before_last_page,) = repository.find_by_status(
+                STATUS, limit=1, offset=max(deep_offset - 1, 0)
+            )
+            cursor = encode_cursor(before_last_page.created_at, before_last_page.id)
+            deep_cursor_ms, _ = measure(
+                lambda: use_case.execute(STATUS, limit=args.limit, cursor=cursor),
+                args.samples,
+                counter,
+            )
+            legacy_ms, legacy_statements = "-", "-"
+            if fleet <= args.legacy_max:
+                legacy_ms, legacy_statements = measure(
+                    lambda: legacy_page(repository, args.limit, 0), 1, counter
+                )
+            rows.append(
+                (
+                    fleet,
+                    sql_ms,
+                    sql_statements,
+                    deep_offset_ms,
+                    deep_cursor_ms,
+                    legacy_ms,
+                    legacy_statements,
+                )
+            )
+
+    print_table(
+        (
+            "units",
+            "sql_page_ms",
+            "sql_queries",
+            "last_page_offset_ms",
+            "last_page_cursor_ms",
+            "legacy_page_ms",
+            "legacy_queries",
+        ),
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Benchmark del historial de tracking con fields= (sparse fieldsets).
+
+Crea una unidad con un historial largo de checkpoints con notas y operador,
+y mide el tamaño de una página de GET /api/v1/tracking/<id> y su latencia
+para distintos conjuntos de campos, desde todos los campos hasta solo el
+estado actual de la unidad.
+
+Uso:
+    python -m benchmarks.sparse_fieldsets [--history 2000] [--limit 1000]
+        [--samples 20]
+"""
+
+import argparse
+from datetime import datetime, timedelta
+
+from benchmarks.support import (StatementCounter, create_benchmark_app,
+                                print_table, timed)
+from src.domain.entities.unit import Unit
+from src.domain.value_objects.checkpoint_data import CheckpointData
+from src.domain.value_objects.tracking_id import TrackingId
+from src.domain.value_objects.unit_status import UnitStatus
+from src.infrastructure.database.database import db
+from src.infrastructure.repositories.unit_repository_impl import \
+    UnitRepositoryImpl
+
+TRACKING_ID = "BENCHSPARSE1"
+# IN_TRANSIT <-> AT_FACILITY es un ciclo válido que permite historiales largos
+CYCLE = [UnitStatus.IN_TRANSIT, UnitStatus.AT_FACILITY]
+FIELD_SETS = {
+    "completo": None,
+    "movil": "unit.current_status,checkpoints.status,checkpoints.timestamp",
+    "estado": "unit.current_status",
+}
+
+
+def create_history(history: int) -> None:
+    start = datetime.utcnow() - timedelta(days=30)
+    unit = Unit(
+        tracking_id=TrackingId(TRACKING_ID),
+        current_status=UnitStatus.CREATED,
+        created_at=start,
+        updated_at=start,
+        checkpoints=[],
+    )
+    unit.add_checkpoint(CheckpointData(status=UnitStatus.PICKED_UP, timestamp=start))
+    for step in range(1, history):
+        unit.add_checkpoint(
+            CheckpointData(
+                status=CYCLE[step % 2],
+                timestamp=start + timedelta(minutes=step),
+                location=f"Centro de distribución {step % 40}",
+                notes="Escaneo registrado por el operador en la bodega de tránsito",
+                operator_id=f"OP{step % 100:03d}",
+            )
+        )
+    UnitRepositoryImpl().save(unit)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--history", type=int, default=2000)
+    parser.add_argument("--limit", type=int, default=1000)
+    parser.add_argument("--samples", type=int, default=20)
+    args = parser.parse_args()
+
+    app = create_benchmark_app()
+    headers = {"X-API-Key": app.config.get("API_KEY", "benchmark-api-key")}
+    rows = []
+    with app.app_context():
+        db.create_all()
+        create_history(args.history)
+        client = app.test_client()
+        counter = StatementCounter(db.engine)
+
+        for name, fields in FIELD_SETS.items():
+            url = f"/api/v1/tracking/{TRACKING_ID}?limit={args.limit}"
+            if fields:
+                url += f"&fields={fields}"
+            durations = []
+            for _ in range(args.samples):
+                with counter.counting(), timed() as elapsed:
+                    response = client.get(url, headers=headers)
+                assert response.status_code == 200, response.data
+                durations.append(elapsed["ms"])
+            rows.append(
+                (
+                    name,
+                    len(response.data),
+                    round(sum(durations) / args.samples, 2),
+                    counter.count,
+                )
+            )
+
+    print_table(("fields", "bytes", "latency_ms", "queries"), rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+import os
+import time
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+
+def create_benchmark_app(database_url: str = "sqlite:///:memory:"):
+    """Crea una aplicación Flask aislada para ejecutar benchmarks"""
+    os.environ["DATABASE_URL"] = database_url
+    os.environ.setdefault("API_KEY", "benchmark-api-key")
+
+    from app import create_app
+
+    app = create_app()
+    app.config["TESTING"] = True
+    return app
+
+
+class StatementCounter:
+    """Cuenta las sentencias SQL ejecutadas sobre un engine"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.count = 0
+
+    def _on_execute(self, *args, **kwargs):
+        self.count += 1
+
+    @contextmanager
+    def counting(self):
+        self.count = 0
+        event.listen(self.engine, "before_cursor_execute", self._on_execute)
+        try:
+            yield self
+        finally:
+            event.remove(self.engine, "before_cursor_execute", self._on_execute)
+
+
+@contextmanager
+def timed():
+    """Mide el tiempo transcurrido en milisegundos"""
+    result = {"ms": 0.0}
+    start = time.perf_counter()
+    try:
+        yield result
+    finally:
+        result["ms"] = (time.perf_counter() - start) * 1000
+
+
+def print_table(headers, rows):
+    """Imprime una tabla simple de resultados"""
+    widths = [
+        max(len(str(header)), *(len(str(row[i])) for row in rows))
+        for i, header in enumerate(headers)
+    ]
+    line = "  ".join(str(h).rjust(w) for h, w in zip(headers, widths))
+    print(line)
+    print("-" * len(line))
+    for row in rows:
+        print("  ".join(str(v).rjust(w) for v, w in zip(row, widths)))
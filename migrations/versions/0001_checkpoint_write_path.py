@@ -0,0 +1,102 @@
+"""Esquema del camino de escritura de checkpoints
+
+Agrega sobre una base creada con db.create_all() del esquema original:
+
+- units.version para el compare-and-swap de UnitRepositoryImpl
+- checkpoints.fingerprint con índice único (deduplicación de escaneos)
+- los índices de paginación ix_units_status_created_at e
+  ix_checkpoints_tracking_timestamp y el índice de checkpoints.unit_id
+- la tabla outbox_messages
+
+Cada paso se omite si el objeto ya existe, porque la aplicación crea al
+iniciar las tablas nuevas (pero no las columnas ni los índices de tablas
+existentes). Después de aplicarla, `flask tracking dedupe-checkpoints`
+calcula las huellas de las filas anteriores.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+INDEXES = (
+    ("ix_units_status_created_at", "units", ["current_status", "created_at", "id"]),
+    (
+        "ix_checkpoints_tracking_timestamp",
+        "checkpoints",
+        ["tracking_id", "timestamp", "id"],
+    ),
+    ("ix_checkpoints_unit_id", "checkpoints", ["unit_id"]),
+)
+
+
+def _columns(inspector, table: str) -> set:
+    return {column["name"] for column in inspector.get_columns(table)}
+
+
+def _indexes(inspector, table: str) -> set:
+    return {index["name"] for index in inspector.get_indexes(table)}
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+
+    if "version" not in _columns(inspector, "units"):
+        op.add_column(
+            "units",
+            sa.Column("version", sa.Integer(), nullable=False, server_default="1"),
+        )
+
+    if "fingerprint" not in _columns(inspector, "checkpoints"):
+        op.add_column(
+            "checkpoints", sa.Column("fingerprint", sa.String(length=64), nullable=True)
+        )
+    # Las filas anteriores quedan en NULL, que no viola el índice único
+    fingerprint_unique = any(
+        constraint["column_names"] == ["fingerprint"]
+        for constraint in inspector.get_unique_constraints("checkpoints")
+    )
+    if not fingerprint_unique and "ix_checkpoints_fingerprint" not in _indexes(
+        inspector, "checkpoints"
+    ):
+        op.create_index(
+            "ix_checkpoints_fingerprint", "checkpoints", ["fingerprint"], unique=True
+        )
+
+    for name, table, columns in INDEXES:
+        if name not in _indexes(inspector, table):
+            op.create_index(name, table, columns)
+
+    if not inspector.has_table("outbox_messages"):
+        op.create_table(
+            "outbox_messages",
+            sa.Column("id", sa.String(length=36), primary_key=True),
+            sa.Column("task_name", sa.String(length=200), nullable=False),
+            sa.Column("payload", sa.Text(), nullable=False),
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+            sa.Column("sent_at", sa.DateTime(), nullable=True),
+            sa.Column("attempts", sa.Integer(), nullable=False),
+            sa.Column("last_error", sa.Text(), nullable=True),
+        )
+        op.create_index(
+            "ix_outbox_messages_created_at", "outbox_messages", ["created_at"]
+        )
+        op.create_index("ix_outbox_messages_sent_at", "outbox_messages", ["sent_at"])
+
+
+def downgrade():
+    op.drop_table("outbox_messages")
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
+    op.drop_index("ix_checkpoints_fingerprint", table_name="checkpoints")
+    with op.batch_alter_table("checkpoints") as batch_op:
+        batch_op.drop_column("fingerprint")
+    with op.batch_alter_table("units") as batch_op:
+        batch_op.drop_column("version")
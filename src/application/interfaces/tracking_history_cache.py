@@ -0,0 +1,46 @@
+from abc import ABC, abstractmethod
+from typing import Iterable, Optional, Tuple
+
+from ...domain.value_objects.tracking_id import TrackingId
+
+
+class TrackingHistoryCache(ABC):
+    """Interfaz de la caché de respuestas del historial de tracking"""
+
+    @abstractmethod
+    def get(
+        self, tracking_id: TrackingId, variant: str
+    ) -> Tuple[Optional[dict], Optional[str]]:
+        """
+        Retorna el historial guardado de una unidad para una variante de la
+        consulta (campos y página), o None si no está en caché, junto con la
+        versión de la unidad con la que se leyó
+
+        En un miss esa versión se pasa a set, de modo que un resultado
+        calculado antes de una invalidación no se guarde bajo la versión
+        nueva. Es None si no pudo leerse.
+        """
+        pass
+
+    @abstractmethod
+    def set(
+        self,
+        tracking_id: TrackingId,
+        variant: str,
+        history: dict,
+        version: Optional[str],
+        final: bool = False,
+    ) -> None:
+        """
+        Guarda el historial de una unidad para una variante de la consulta
+        bajo la versión retornada por get
+
+        final indica que la unidad está en un estado final, por lo que su
+        historial puede guardarse por más tiempo.
+        """
+        pass
+
+    @abstractmethod
+    def invalidate(self, tracking_ids: Iterable[TrackingId]) -> None:
+        """Invalida todas las variantes guardadas de las unidades indicadas"""
+        pass
@@ -0,0 +1,19 @@
+from abc import ABC, abstractmethod
+from typing import ContextManager
+
+from ...domain.value_objects.tracking_id import TrackingId
+
+
+class UnitLock(ABC):
+    """Interfaz para serializar las escrituras sobre una misma unidad"""
+
+    @abstractmethod
+    def hold(self, tracking_id: TrackingId) -> ContextManager[None]:
+        """
+        Retorna un context manager que mantiene el lock de la unidad
+
+        Si el lock no se obtiene dentro del timeout configurado, el bloque se
+        ejecuta de todas formas y la escritura queda protegida solo por el
+        control de concurrencia optimista.
+        """
+        pass
@@ -1,14 +1,37 @@
-from typing import List, Optional
+import hashlib
+import json
+from datetime import datetime
+from typing import Collection, Optional, Tuple
 
 import structlog
 
-from ...domain.entities.unit import Unit
+from ...application.interfaces.tracking_history_cache import \
+    TrackingHistoryCache
+from ...domain.read_models.checkpoint_view import CHECKPOINT_VIEW_FIELDS
+from ...domain.read_models.unit_summary import UNIT_SUMMARY_FIELDS
 from ...domain.repositories.checkpoint_repository import CheckpointRepository
 from ...domain.repositories.unit_repository import UnitRepository
 from ...domain.value_objects.tracking_id import TrackingId
+from .pagination import decode_cursor, encode_cursor
 
 logger = structlog.get_logger(__name__)
 
+# Campos válidos de fields=: secciones completas o campos de una sección
+TRACKING_HISTORY_FIELDS = (
+    ("unit", "checkpoints", "total_checkpoints")
+    + tuple(f"unit.{name}" for name in UNIT_SUMMARY_FIELDS)
+    + tuple(f"checkpoints.{name}" for name in CHECKPOINT_VIEW_FIELDS)
+)
+
+
+def _section_fields(
+    fields: Optional[Collection[str]], section: str, section_fields: Tuple[str, ...]
+) -> Tuple[str, ...]:
+    """Campos solicitados de una sección del historial"""
+    if fields is None or section in fields:
+        return section_fields
+    return tuple(name for name in section_fields if f"{section}.{name}" in fields)
+
 
 class GetTrackingHistoryUseCase:
     """Caso de uso para obtener el historial de tracking de una unidad"""
@@ -21,43 +44,177 @@ class GetTrackingHistoryUseCase:
         self.unit_repository = unit_repository
         self.checkpoint_repository = checkpoint_repository
 
-    def execute(self, tracking_id: TrackingId) -> dict:
+    def execute(
+        self,
+        tracking_id: TrackingId,
+        fields: Optional[Collection[str]] = None,
+        limit: int = 100,
+        before: Optional[datetime] = None,
+        cursor: Optional[str] = None,
+    ) -> dict:
         """
-        Obtiene el historial completo de tracking de una unidad
+        Obtiene el historial de tracking de una unidad, del checkpoint más
+        reciente al más antiguo
+
+        Los checkpoints se paginan por keyset: cada página con más
+        checkpoints incluye next_cursor para pedir los anteriores. Con
+        before la primera página empieza en los checkpoints anteriores a ese
+        timestamp. total_checkpoints es el total del historial, no de la
+        página, y solo se cuenta en la primera: las páginas pedidas con
+        cursor lo omiten para no repetir el COUNT en cada página.
+
+        La unidad y sus checkpoints se leen como proyecciones con solo las
+        columnas de los campos solicitados; las secciones no solicitadas no
+        se consultan ni se incluyen en el resultado.
 
         Args:
             tracking_id: ID de tracking de la unidad
+            fields: Campos a incluir, de TRACKING_HISTORY_FIELDS (por
+                defecto, todos)
+            limit: Máximo de checkpoints por página
+            before: Solo checkpoints anteriores a este timestamp
+            cursor: Cursor opaco next_cursor de la página anterior (tiene
+                prioridad sobre before)
 
         Returns:
-            dict: Información de la unidad y su historial de checkpoints
+            dict: Información de la unidad y una página de su historial
 
         Raises:
-            ValueError: Si la unidad no existe
+            ValueError: Si la unidad no existe o el cursor no es válido
         """
-        logger.info("Obteniendo historial de tracking", tracking_id=str(tracking_id))
+        logger.info(
+            "Obteniendo historial de tracking",
+            tracking_id=str(tracking_id),
+            fields=fields,
+            limit=limit,
+            before=before,
+            cursor=cursor,
+        )
 
-        # Buscar la unidad
-        unit = self.unit_repository.find_by_tracking_id(tracking_id)
+        if limit <= 0 or limit > 1000:
+            limit = 100
+
+        # Un timestamp sin ID deja fuera todos los checkpoints de ese instante
+        if cursor is not None:
+            before_key = decode_cursor(cursor)
+        elif before is not None:
+            before_key = (before, "")
+        else:
+            before_key = None
+
+        unit_fields = _section_fields(fields, "unit", UNIT_SUMMARY_FIELDS)
+        checkpoint_fields = _section_fields(
+            fields, "checkpoints", CHECKPOINT_VIEW_FIELDS
+        )
+
+        # Buscar la unidad (sin campos solicitados solo se verifica que exista)
+        unit = self.unit_repository.find_summary_by_tracking_id(
+            tracking_id, fields=unit_fields
+        )
         if not unit:
             logger.warning(
                 "Unidad no encontrada para historial", tracking_id=str(tracking_id)
             )
             raise ValueError(f"Unidad con tracking ID {tracking_id} no encontrada")
 
-        # Obtener todos los checkpoints de la unidad
-        checkpoints = self.checkpoint_repository.find_by_tracking_id(tracking_id)
+        result = {}
+        if unit_fields:
+            result["unit"] = unit.to_dict(unit_fields)
 
-        # Ordenar checkpoints por timestamp
-        checkpoints.sort(key=lambda cp: cp.checkpoint_data.timestamp)
+        if checkpoint_fields:
+            # Un checkpoint extra indica si hay una página siguiente
+            checkpoints = self.checkpoint_repository.find_views_by_tracking_id(
+                tracking_id,
+                fields=checkpoint_fields,
+                limit=limit + 1,
+                before=before_key,
+                newest_first=True,
+            )
+            has_more = len(checkpoints) > limit
+            page = checkpoints[:limit]
+            result["checkpoints"] = [
+                checkpoint.to_dict(checkpoint_fields) for checkpoint in page
+            ]
+            result["pagination"] = {"limit": limit, "has_more": has_more}
+            result["next_cursor"] = (
+                encode_cursor(page[-1].timestamp, page[-1].id) if has_more else None
+            )
+
+        if cursor is None and (fields is None or "total_checkpoints" in fields):
+            result["total_checkpoints"] = (
+                self.checkpoint_repository.count_by_tracking_id(tracking_id)
+            )
 
         logger.info(
             "Historial obtenido exitosamente",
             tracking_id=str(tracking_id),
-            checkpoint_count=len(checkpoints),
+            checkpoint_count=len(result.get("checkpoints", ())),
+        )
+
+        return result
+
+
+class CachedGetTrackingHistoryUseCase:
+    """
+    Caché read-through alrededor de GetTrackingHistoryUseCase
+
+    Cada combinación de campos y página es una variante de la consulta de
+    una unidad. Un hit retorna la respuesta guardada sin consultar la base
+    de datos; un miss ejecuta el caso de uso y guarda su resultado bajo la
+    versión de la unidad leída antes de consultar. Las
+    escrituras de checkpoints invalidan todas las variantes de la unidad
+    después del commit.
+    """
+
+    def __init__(
+        self, use_case: GetTrackingHistoryUseCase, cache: TrackingHistoryCache
+    ):
+        self.use_case = use_case
+        self.cache = cache
+
+    @staticmethod
+    def variant(
+        fields: Optional[Collection[str]],
+        limit: int,
+        before: Optional[datetime],
+        cursor: Optional[str],
+    ) -> str:
+        """Identificador estable de una variante de la consulta"""
+        key = json.dumps(
+            [
+                sorted(fields) if fields is not None else None,
+                limit,
+                before.isoformat() if before else None,
+                cursor,
+            ]
         )
+        return hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+
+    def execute(
+        self,
+        tracking_id: TrackingId,
+        fields: Optional[Collection[str]] = None,
+        limit: int = 100,
+        before: Optional[datetime] = None,
+        cursor: Optional[str] = None,
+    ) -> dict:
+        """
+        Obtiene el historial de tracking desde la caché o el caso de uso
+
+        Mismos argumentos, resultado y errores que
+        GetTrackingHistoryUseCase.execute; las unidades inexistentes no se
+        guardan en caché.
+        """
+        variant = self.variant(fields, limit, before, cursor)
+        cached, version = self.cache.get(tracking_id, variant)
+        if cached is not None:
+            return cached
 
-        return {
-            "unit": unit.to_dict(),
-            "checkpoints": [cp.to_dict() for cp in checkpoints],
-            "total_checkpoints": len(checkpoints),
-        }
+        result = self.use_case.execute(
+            tracking_id, fields=fields, limit=limit, before=before, cursor=cursor
+        )
+        # El historial de una unidad entregada solo cambia si llega un
+        # checkpoint tardío, que de todas formas lo invalida
+        final = bool(result.get("unit", {}).get("is_delivered"))
+        self.cache.set(tracking_id, variant, result, version, final=final)
+        return result
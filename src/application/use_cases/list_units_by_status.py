@@ -1,10 +1,10 @@
-from typing import List
+from typing import Collection, List, Optional
 
 import structlog
 
-from ...domain.entities.unit import Unit
 from ...domain.repositories.unit_repository import UnitRepository
 from ...domain.value_objects.unit_status import UnitStatus
+from .pagination import decode_cursor, encode_cursor
 
 logger = structlog.get_logger(__name__)
 
@@ -15,23 +15,47 @@ class ListUnitsByStatusUseCase:
     def __init__(self, unit_repository: UnitRepository):
         self.unit_repository = unit_repository
 
-    def execute(self, status: UnitStatus, limit: int = 100, offset: int = 0) -> dict:
+    def execute(
+        self,
+        status: UnitStatus,
+        limit: int = 100,
+        offset: int = 0,
+        cursor: Optional[str] = None,
+        fields: Optional[Collection[str]] = None,
+    ) -> dict:
         """
         Lista unidades filtradas por estado
 
+        Las unidades se leen como resúmenes (UnitSummary), sin cargar su
+        historial de checkpoints, que el listado no muestra. Con fields solo
+        se leen y se retornan esos campos de cada unidad.
+
+        Con cursor la página se lee por keyset a partir de la última unidad
+        de la página anterior: su costo no depende de la profundidad y no
+        repite ni salta unidades si se insertan otras mientras se recorre.
+        En ese modo no se cuenta el total. Cada respuesta con más unidades
+        incluye next_cursor para pedir la siguiente página.
+
         Args:
             status: Estado de las unidades a buscar
             limit: Límite de resultados
-            offset: Offset para paginación
+            offset: Offset para paginación (se ignora si hay cursor)
+            cursor: Cursor opaco next_cursor de la página anterior
+            fields: Campos de UNIT_SUMMARY_FIELDS a incluir (por defecto,
+                todos)
 
         Returns:
-            dict: Lista de unidades y metadatos de paginación
+            dict: Lista de unidades, metadatos de paginación y next_cursor
+
+        Raises:
+            ValueError: Si el cursor no es válido
         """
         logger.info(
             "Listando unidades por estado",
             status=status.value,
             limit=limit,
             offset=offset,
+            cursor=cursor,
         )
 
         # Validar parámetros
@@ -41,12 +65,27 @@ class ListUnitsByStatusUseCase:
         if offset < 0:
             offset = 0
 
-        # Buscar unidades por estado
-        units = self.unit_repository.find_by_status(status)
-
-        # Aplicar paginación
-        total_count = len(units)
-        paginated_units = units[offset : offset + limit]
+        if cursor is not None:
+            # Una unidad extra indica si hay una página siguiente
+            units = self.unit_repository.find_summaries_by_status(
+                status, limit=limit + 1, after=decode_cursor(cursor), fields=fields
+            )
+            has_more = len(units) > limit
+            paginated_units = units[:limit]
+            total_count = None
+            offset = None
+        else:
+            # Contar y paginar en la base de datos: solo se cargan las
+            # unidades de la página
+            total_count = self.unit_repository.count_by_status(status)
+            paginated_units = (
+                self.unit_repository.find_summaries_by_status(
+                    status, limit=limit, offset=offset, fields=fields
+                )
+                if offset < total_count
+                else []
+            )
+            has_more = offset + limit < total_count
 
         logger.info(
             "Unidades listadas exitosamente",
@@ -56,12 +95,17 @@ class ListUnitsByStatusUseCase:
         )
 
         return {
-            "units": [unit.to_dict() for unit in paginated_units],
+            "units": [unit.to_dict(fields) for unit in paginated_units],
             "pagination": {
                 "total": total_count,
                 "limit": limit,
                 "offset": offset,
-                "has_more": offset + limit < total_count,
+                "has_more": has_more,
             },
+            "next_cursor": (
+                encode_cursor(paginated_units[-1].created_at, paginated_units[-1].id)
+                if has_more and paginated_units
+                else None
+            ),
             "status": status.value,
         }
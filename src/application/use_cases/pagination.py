@@ -0,0 +1,30 @@
+import base64
+import json
+from datetime import datetime
+from typing import Tuple
+
+
+def encode_cursor(timestamp: datetime, key: str) -> str:
+    """
+    Cursor opaco con una clave de orden (timestamp, id)
+
+    Es la clave del último elemento de una página; la página siguiente se
+    lee por keyset a partir de ella.
+    """
+    data = json.dumps([timestamp.isoformat(), key])
+    return base64.urlsafe_b64encode(data.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """
+    Recupera la clave de orden de un cursor
+
+    Raises:
+        ValueError: Si el cursor no fue emitido por encode_cursor
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        timestamp, key = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(timestamp), str(key)
+    except (TypeError, ValueError) as e:
+        raise ValueError("Cursor inválido") from e
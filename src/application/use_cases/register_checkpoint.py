@@ -1,17 +1,26 @@
-from typing import Optional
+import random
+import time
+from contextlib import nullcontext
+from datetime import timedelta
+from typing import Callable, Iterable, List, Optional, Tuple, TypeVar, Union
 
 import structlog
 
-from ...application.interfaces.unit_service import UnitService
+from ...application.interfaces.tracking_history_cache import \
+    TrackingHistoryCache
+from ...application.interfaces.unit_lock import UnitLock
 from ...domain.entities.checkpoint import Checkpoint
 from ...domain.entities.unit import Unit
-from ...domain.repositories.checkpoint_repository import CheckpointRepository
+from ...domain.exceptions import (ConcurrentModificationError,
+                                  DuplicateCheckpointError)
 from ...domain.repositories.unit_repository import UnitRepository
 from ...domain.value_objects.checkpoint_data import CheckpointData
 from ...domain.value_objects.tracking_id import TrackingId
 
 logger = structlog.get_logger(__name__)
 
+T = TypeVar("T")
+
 
 class RegisterCheckpointUseCase:
     """Caso de uso para registrar un checkpoint en una unidad"""
@@ -19,12 +28,22 @@ class RegisterCheckpointUseCase:
     def __init__(
         self,
         unit_repository: UnitRepository,
-        checkpoint_repository: CheckpointRepository,
-        unit_service: UnitService,
+        reorder_window: timedelta = timedelta(0),
+        max_retries: int = 5,
+        retry_backoff: float = 0.005,
+        unit_lock: Optional[UnitLock] = None,
+        history_cache: Optional[TrackingHistoryCache] = None,
     ):
         self.unit_repository = unit_repository
-        self.checkpoint_repository = checkpoint_repository
-        self.unit_service = unit_service
+        # Antigüedad máxima con la que se acepta un checkpoint fuera de orden
+        self.reorder_window = reorder_window
+        # Reintentos ante escrituras concurrentes sobre la misma unidad
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        # Serializa las escrituras sobre una misma unidad (unidades calientes)
+        self.unit_lock = unit_lock
+        # Caché del historial de tracking que se invalida tras cada commit
+        self.history_cache = history_cache
 
     def execute(self, tracking_id: TrackingId, checkpoint_data: CheckpointData) -> dict:
         """
@@ -39,6 +58,9 @@ class RegisterCheckpointUseCase:
 
         Raises:
             ValueError: Si la unidad no existe o la transición no es válida
+            DuplicateCheckpointError: Si el checkpoint ya estaba registrado
+            ConcurrentModificationError: Si se agotan los reintentos por
+                escrituras concurrentes sobre la unidad
         """
         logger.info(
             "Registrando checkpoint",
@@ -46,40 +68,91 @@ class RegisterCheckpointUseCase:
             status=checkpoint_data.status.value,
         )
 
-        # Verificar que la unidad existe, si no existe, crearla
+        def register():
+            with self._hold_unit(tracking_id):
+                return self._register(tracking_id, checkpoint_data)
+
+        return self._with_retries(register, tracking_id=str(tracking_id))
+
+    def execute_group(
+        self, items: List[Tuple[TrackingId, CheckpointData]]
+    ) -> List[Union[dict, ValueError]]:
+        """
+        Registra en una sola transacción los checkpoints de varios requests
+
+        Los checkpoints se aplican en orden de llegada con las mismas reglas
+        que execute. Los rechazados no afectan al resto del grupo; si otra
+        escritura cambia alguna unidad, el grupo completo se recarga y se
+        vuelve a aplicar.
+
+        Args:
+            items: Pares (tracking ID, datos del checkpoint) en orden de llegada
+
+        Returns:
+            List[Union[dict, ValueError]]: Por item, la información del
+                checkpoint registrado o el error de negocio que lo rechazó
+
+        Raises:
+            ConcurrentModificationError: Si se agotan los reintentos por
+                escrituras concurrentes sobre las unidades del grupo
+        """
+        logger.info("Registrando grupo de checkpoints", item_count=len(items))
+
+        return self._with_retries(
+            lambda: self._register_group(items), item_count=len(items)
+        )
+
+    def _with_retries(self, register: Callable[[], T], **context) -> T:
+        """Ejecuta una escritura reintentándola ante conflictos de versión"""
+        attempt = 0
+        while True:
+            try:
+                return register()
+            except ConcurrentModificationError:
+                attempt += 1
+                if attempt > self.max_retries:
+                    logger.error(
+                        "Reintentos agotados por escrituras concurrentes",
+                        attempts=attempt,
+                        **context,
+                    )
+                    raise
+
+                logger.warning(
+                    "Conflicto de concurrencia, reintentando checkpoint",
+                    attempt=attempt,
+                    **context,
+                )
+                # Espera aleatoria creciente para desincronizar a los escritores
+                time.sleep(random.uniform(0, self.retry_backoff * attempt))
+
+    def _hold_unit(self, tracking_id: TrackingId):
+        """Retorna el lock de escritura de la unidad, si hay uno configurado"""
+        if self.unit_lock is None:
+            return nullcontext()
+        return self.unit_lock.hold(tracking_id)
+
+    def _invalidate_history(self, tracking_ids: Iterable[TrackingId]) -> None:
+        """Invalida el historial en caché de unidades ya confirmadas"""
+        if self.history_cache is not None:
+            self.history_cache.invalidate(tracking_ids)
+
+    def _register(
+        self, tracking_id: TrackingId, checkpoint_data: CheckpointData
+    ) -> dict:
+        """Carga la unidad, aplica el checkpoint y lo persiste con CAS"""
+        # Cargar la unidad una sola vez; si no existe, crearla en memoria
         unit = self.unit_repository.find_by_tracking_id(tracking_id)
         if not unit:
             logger.info(
                 "Unidad no encontrada, creando nueva unidad",
                 tracking_id=str(tracking_id),
             )
-            # Crear nueva unidad con estado inicial
-            from datetime import datetime
+            unit = Unit.create_for_checkpoint(tracking_id, checkpoint_data)
 
-            from src.domain.entities.unit import Unit
-            from src.domain.value_objects.unit_status import UnitStatus
-
-            # Crear unidad con estado inicial CREATED si el checkpoint no es CREATED
-            initial_status = (
-                UnitStatus.CREATED
-                if checkpoint_data.status != UnitStatus.CREATED
-                else checkpoint_data.status
-            )
-            unit = Unit(
-                id=None,  # Se generará automáticamente
-                tracking_id=tracking_id,
-                current_status=initial_status,
-                created_at=datetime.utcnow(),
-                updated_at=datetime.utcnow(),
-                checkpoints=[],  # Lista vacía inicialmente
-            )
-            unit = self.unit_repository.save(unit)
-
-        # Agregar checkpoint a la unidad
+        # Validar la transición y agregar el checkpoint a la unidad
         try:
-            updated_unit = self.unit_service.add_checkpoint(
-                tracking_id, checkpoint_data
-            )
+            unit.add_checkpoint(checkpoint_data, self.reorder_window)
         except ValueError as e:
             logger.error(
                 "Error al agregar checkpoint",
@@ -91,15 +164,82 @@ class RegisterCheckpointUseCase:
         # Crear checkpoint inmutable
         checkpoint = Checkpoint.create(tracking_id, checkpoint_data)
 
-        # Guardar en repositorios
-        saved_unit = self.unit_repository.save(updated_unit)
-        saved_checkpoint = self.checkpoint_repository.save(checkpoint)
+        # Guardar unidad y checkpoint en una sola transacción, sin recargar
+        duplicates = self.unit_repository.save_with_checkpoint(unit, checkpoint)
+        if checkpoint_data.fingerprint(tracking_id) in duplicates:
+            logger.info("Checkpoint duplicado omitido", tracking_id=str(tracking_id))
+            raise DuplicateCheckpointError(str(tracking_id))
+        self._invalidate_history([tracking_id])
 
         logger.info(
             "Checkpoint registrado exitosamente",
             tracking_id=str(tracking_id),
-            checkpoint_id=saved_checkpoint.id,
+            checkpoint_id=checkpoint.id,
             new_status=checkpoint_data.status.value,
         )
 
-        return {"checkpoint": saved_checkpoint.to_dict(), "unit": saved_unit.to_dict()}
+        return {"checkpoint": checkpoint.to_dict(), "unit": unit.to_dict()}
+
+    def _register_group(
+        self, items: List[Tuple[TrackingId, CheckpointData]]
+    ) -> List[Union[dict, ValueError]]:
+        """Carga las unidades del grupo, aplica los checkpoints y los persiste"""
+        units = {
+            str(unit.tracking_id): unit
+            for unit in self.unit_repository.find_by_tracking_ids(
+                list({tracking_id: None for tracking_id, _ in items})
+            )
+        }
+        new_unit_ids = set()
+
+        outcomes: List[Union[dict, ValueError]] = []
+        checkpoints: List[Checkpoint] = []
+        # Posición en outcomes del resultado de cada checkpoint
+        positions: List[int] = []
+        for tracking_id, checkpoint_data in items:
+            unit = units.get(str(tracking_id))
+            if unit is None:
+                unit = Unit.create_for_checkpoint(tracking_id, checkpoint_data)
+                units[str(tracking_id)] = unit
+                new_unit_ids.add(str(tracking_id))
+
+            try:
+                unit.add_checkpoint(checkpoint_data, self.reorder_window)
+            except ValueError as e:
+                outcomes.append(e)
+                continue
+
+            checkpoint = Checkpoint.create(tracking_id, checkpoint_data)
+            checkpoints.append(checkpoint)
+            positions.append(len(outcomes))
+            # Estado de la unidad justo después de este checkpoint
+            outcomes.append(
+                {"checkpoint": checkpoint.to_dict(), "unit": unit.to_dict()}
+            )
+
+        if checkpoints:
+            written = [
+                unit for unit in units.values() if unit.get_pending_checkpoints()
+            ]
+            duplicates = self.unit_repository.save_batch(
+                [unit for unit in written if str(unit.tracking_id) in new_unit_ids],
+                [unit for unit in written if str(unit.tracking_id) not in new_unit_ids],
+                checkpoints,
+            )
+            stored = []
+            for position, checkpoint in zip(positions, checkpoints):
+                if checkpoint.fingerprint() in duplicates:
+                    outcomes[position] = DuplicateCheckpointError(
+                        str(checkpoint.tracking_id)
+                    )
+                else:
+                    stored.append(checkpoint.tracking_id)
+            self._invalidate_history(stored)
+
+        logger.info(
+            "Grupo de checkpoints registrado",
+            item_count=len(items),
+            checkpoint_count=len(checkpoints),
+        )
+
+        return outcomes
@@ -0,0 +1,226 @@
+from datetime import timedelta
+from typing import Dict, List, Optional, Tuple
+
+import structlog
+
+from ...application.interfaces.tracking_history_cache import \
+    TrackingHistoryCache
+from ...domain.entities.checkpoint import Checkpoint
+from ...domain.entities.unit import Unit
+from ...domain.exceptions import (ConcurrentModificationError,
+                                  DuplicateCheckpointError)
+from ...domain.repositories.unit_repository import UnitRepository
+from ...domain.value_objects.checkpoint_data import CheckpointData
+from ...domain.value_objects.tracking_id import TrackingId
+
+logger = structlog.get_logger(__name__)
+
+# Clave del resumen que cuenta cada estado de resultado de un item
+RESULT_SUMMARY_KEYS = {
+    "success": "succeeded",
+    "duplicate": "duplicates",
+    "error": "failed",
+}
+
+
+def summarize_results(results: List[dict]) -> dict:
+    """Resume los resultados por item de un lote de checkpoints"""
+    summary = {"total": len(results), "succeeded": 0, "duplicates": 0, "failed": 0}
+    for result in results:
+        summary[RESULT_SUMMARY_KEYS[result["status"]]] += 1
+    return summary
+
+
+class RegisterCheckpointBatchUseCase:
+    """Caso de uso para registrar un lote de checkpoints de varias unidades"""
+
+    def __init__(
+        self,
+        unit_repository: UnitRepository,
+        units_per_transaction: int = 500,
+        reorder_window: timedelta = timedelta(0),
+        max_retries: int = 3,
+        history_cache: Optional[TrackingHistoryCache] = None,
+    ):
+        self.unit_repository = unit_repository
+        self.units_per_transaction = units_per_transaction
+        # Antigüedad máxima con la que se acepta un checkpoint fuera de orden
+        self.reorder_window = reorder_window
+        # Reintentos de un bloque ante escrituras concurrentes
+        self.max_retries = max_retries
+        # Caché del historial de tracking que se invalida tras cada commit
+        self.history_cache = history_cache
+
+    def execute(self, items: List[Tuple[TrackingId, CheckpointData]]) -> dict:
+        """
+        Registra un lote de checkpoints agrupándolos por tracking ID
+
+        Los checkpoints de cada unidad se aplican en orden cronológico con las
+        reglas de Unit.add_checkpoints. Las unidades se cargan y persisten por
+        bloques, cada bloque en una sola transacción con inserts masivos.
+
+        Args:
+            items: Pares (tracking ID, datos del checkpoint) en orden de llegada
+
+        Returns:
+            dict: Resultado por item (en el orden recibido) y resumen del lote
+        """
+        logger.info("Registrando lote de checkpoints", item_count=len(items))
+
+        # Agrupar índices por tracking ID conservando el orden de aparición
+        groups: Dict[TrackingId, List[int]] = {}
+        for index, (tracking_id, _) in enumerate(items):
+            groups.setdefault(tracking_id, []).append(index)
+
+        results: List[dict] = [None] * len(items)
+        tracking_ids = list(groups)
+        for start in range(0, len(tracking_ids), self.units_per_transaction):
+            chunk = tracking_ids[start : start + self.units_per_transaction]
+            self._register_chunk_with_retries(chunk, groups, items, results)
+
+        summary = summarize_results(results)
+
+        logger.info(
+            "Lote de checkpoints registrado",
+            item_count=len(items),
+            succeeded=summary["succeeded"],
+            duplicates=summary["duplicates"],
+            failed=summary["failed"],
+        )
+
+        return {"results": results, "summary": summary}
+
+    def _register_chunk_with_retries(
+        self,
+        chunk: List[TrackingId],
+        groups: Dict[TrackingId, List[int]],
+        items: List[Tuple[TrackingId, CheckpointData]],
+        results: List[dict],
+    ) -> None:
+        """Registra un bloque recargándolo si otra escritura cambió sus unidades"""
+        for attempt in range(1, self.max_retries + 2):
+            try:
+                self._register_chunk(chunk, groups, items, results)
+                return
+            except ConcurrentModificationError as e:
+                logger.warning(
+                    "Conflicto de concurrencia en bloque de checkpoints",
+                    attempt=attempt,
+                    error=str(e),
+                )
+
+        for tracking_id in chunk:
+            for index in groups[tracking_id]:
+                if results[index]["status"] == "success":
+                    results[index] = self._error(
+                        index,
+                        tracking_id,
+                        "internal_error",
+                        "Conflicto de concurrencia al persistir el checkpoint",
+                    )
+
+    def _register_chunk(
+        self,
+        chunk: List[TrackingId],
+        groups: Dict[TrackingId, List[int]],
+        items: List[Tuple[TrackingId, CheckpointData]],
+        results: List[dict],
+    ) -> None:
+        """Aplica y persiste en una transacción los checkpoints de un bloque"""
+        existing_units = {
+            str(unit.tracking_id): unit
+            for unit in self.unit_repository.find_by_tracking_ids(chunk)
+        }
+
+        new_units: List[Unit] = []
+        updated_units: List[Unit] = []
+        checkpoints: List[Checkpoint] = []
+        applied: List[int] = []
+
+        for tracking_id in chunk:
+            # Orden cronológico estable dentro de la unidad
+            indexes = sorted(groups[tracking_id], key=lambda i: items[i][1].timestamp)
+            unit = existing_units.get(str(tracking_id))
+            is_new = unit is None
+            if is_new:
+                unit = Unit.create_for_checkpoint(tracking_id, items[indexes[0]][1])
+
+            # La secuencia completa de la unidad se valida de una vez
+            errors = unit.add_checkpoints(
+                [items[index][1] for index in indexes], self.reorder_window
+            )
+            for position, index in enumerate(indexes):
+                if position in errors:
+                    results[index] = self._error(
+                        index, tracking_id, "business_error", errors[position]
+                    )
+                    continue
+
+                checkpoint_data = items[index][1]
+                checkpoint = Checkpoint.create(tracking_id, checkpoint_data)
+                checkpoints.append(checkpoint)
+                applied.append(index)
+                results[index] = {
+                    "index": index,
+                    "tracking_id": str(tracking_id),
+                    "status": "success",
+                    "checkpoint_id": checkpoint.id,
+                    "unit_status": checkpoint_data.status.value,
+                }
+
+            if unit.get_pending_checkpoints():
+                (new_units if is_new else updated_units).append(unit)
+
+        if not checkpoints:
+            return
+
+        try:
+            duplicates = self.unit_repository.save_batch(
+                new_units, updated_units, checkpoints
+            )
+        except ConcurrentModificationError:
+            raise
+        except Exception as e:
+            logger.error(
+                "Error persistiendo bloque de checkpoints",
+                unit_count=len(new_units) + len(updated_units),
+                checkpoint_count=len(checkpoints),
+                error=str(e),
+            )
+            for index in applied:
+                results[index] = self._error(
+                    index,
+                    items[index][0],
+                    "internal_error",
+                    "Error interno al persistir el checkpoint",
+                )
+        else:
+            stored = []
+            for index, checkpoint in zip(applied, checkpoints):
+                if checkpoint.fingerprint() in duplicates:
+                    results[index] = self._duplicate(index, checkpoint.tracking_id)
+                else:
+                    stored.append(checkpoint.tracking_id)
+            if self.history_cache is not None:
+                self.history_cache.invalidate(stored)
+
+    def _duplicate(self, index: int, tracking_id: TrackingId) -> dict:
+        """Construye el resultado de un item omitido por ya estar registrado"""
+        return {
+            "index": index,
+            "tracking_id": str(tracking_id),
+            "status": "duplicate",
+            "message": str(DuplicateCheckpointError(str(tracking_id))),
+        }
+
+    def _error(
+        self, index: int, tracking_id: TrackingId, error: str, message: str
+    ) -> dict:
+        """Construye el resultado de un item fallido"""
+        return {
+            "index": index,
+            "tracking_id": str(tracking_id),
+            "status": "error",
+            "error": error,
+            "message": message,
+        }
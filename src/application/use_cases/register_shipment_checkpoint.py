@@ -0,0 +1,152 @@
+from typing import List, Optional
+
+import structlog
+
+from ...application.interfaces.tracking_history_cache import \
+    TrackingHistoryCache
+from ...domain.entities.checkpoint import Checkpoint
+from ...domain.entities.unit import Unit
+from ...domain.exceptions import (ConcurrentModificationError,
+                                  DuplicateCheckpointError)
+from ...domain.repositories.shipment_repository import ShipmentRepository
+from ...domain.repositories.unit_repository import UnitRepository
+from ...domain.value_objects.checkpoint_data import CheckpointData
+from ...domain.value_objects.tracking_id import TrackingId
+from .register_checkpoint_batch import summarize_results
+
+logger = structlog.get_logger(__name__)
+
+
+class RegisterShipmentCheckpointUseCase:
+    """Caso de uso para aplicar un checkpoint a todas las unidades de un envío"""
+
+    def __init__(
+        self,
+        shipment_repository: ShipmentRepository,
+        unit_repository: UnitRepository,
+        max_retries: int = 3,
+        history_cache: Optional[TrackingHistoryCache] = None,
+    ):
+        self.shipment_repository = shipment_repository
+        self.unit_repository = unit_repository
+        # Reintentos ante escrituras concurrentes sobre unidades del envío
+        self.max_retries = max_retries
+        # Caché del historial de tracking que se invalida tras cada commit
+        self.history_cache = history_cache
+
+    def execute(self, tracking_id: TrackingId, checkpoint_data: CheckpointData) -> dict:
+        """
+        Aplica un checkpoint a todas las unidades de un envío
+
+        Las unidades se cargan con solo su último checkpoint y se validan en
+        una pasada; las que aceptan la transición se persisten juntas en una
+        transacción con un UPDATE y un INSERT masivos. Las unidades que la
+        rechazan se reportan sin afectar al resto. No se aceptan checkpoints
+        fuera de orden, porque validarlos requiere el historial completo.
+
+        Args:
+            tracking_id: ID de tracking (guía) del envío
+            checkpoint_data: Datos del checkpoint a aplicar
+
+        Returns:
+            dict: Resultado por unidad y resumen
+
+        Raises:
+            ValueError: Si el envío no existe
+            ConcurrentModificationError: Si se agotan los reintentos por
+                escrituras concurrentes sobre las unidades del envío
+        """
+        shipment = self.shipment_repository.find_by_tracking_id(tracking_id)
+        if not shipment:
+            raise ValueError(f"Envío no encontrado: {tracking_id}")
+
+        logger.info(
+            "Aplicando checkpoint a envío",
+            tracking_id=str(tracking_id),
+            status=checkpoint_data.status.value,
+            unit_count=shipment.get_unit_count(),
+        )
+
+        for attempt in range(1, self.max_retries + 2):
+            try:
+                results = self._apply(shipment.id, checkpoint_data)
+                break
+            except ConcurrentModificationError as e:
+                logger.warning(
+                    "Conflicto de concurrencia en checkpoint de envío",
+                    tracking_id=str(tracking_id),
+                    attempt=attempt,
+                    error=str(e),
+                )
+        else:
+            raise ConcurrentModificationError(str(tracking_id))
+
+        summary = summarize_results(results)
+
+        logger.info(
+            "Checkpoint de envío aplicado",
+            tracking_id=str(tracking_id),
+            succeeded=summary["succeeded"],
+            duplicates=summary["duplicates"],
+            failed=summary["failed"],
+        )
+
+        return {
+            "shipment_tracking_id": str(tracking_id),
+            "results": results,
+            "summary": summary,
+        }
+
+    def _apply(self, shipment_id: str, checkpoint_data: CheckpointData) -> List[dict]:
+        """Valida el checkpoint contra cada unidad y persiste las aceptadas"""
+        units = self.unit_repository.find_by_shipment_id(shipment_id)
+
+        updated_units: List[Unit] = []
+        checkpoints: List[Checkpoint] = []
+        results: List[dict] = []
+        for unit in units:
+            try:
+                unit.add_checkpoint(checkpoint_data)
+            except ValueError as e:
+                results.append(
+                    {
+                        "tracking_id": str(unit.tracking_id),
+                        "status": "error",
+                        "error": "business_error",
+                        "message": str(e),
+                    }
+                )
+                continue
+
+            checkpoint = Checkpoint.create(unit.tracking_id, checkpoint_data)
+            updated_units.append(unit)
+            checkpoints.append(checkpoint)
+            results.append(
+                {
+                    "tracking_id": str(unit.tracking_id),
+                    "status": "success",
+                    "checkpoint_id": checkpoint.id,
+                    "unit_status": checkpoint_data.status.value,
+                }
+            )
+
+        if not updated_units:
+            return results
+
+        duplicates = self.unit_repository.save_batch([], updated_units, checkpoints)
+        stored = []
+        for position, result in enumerate(results):
+            if result["status"] != "success":
+                continue
+            if checkpoint_data.fingerprint(result["tracking_id"]) in duplicates:
+                results[position] = {
+                    "tracking_id": result["tracking_id"],
+                    "status": "duplicate",
+                    "message": str(DuplicateCheckpointError(result["tracking_id"])),
+                }
+            else:
+                stored.append(TrackingId(result["tracking_id"]))
+        if self.history_cache is not None:
+            self.history_cache.invalidate(stored)
+
+        return results
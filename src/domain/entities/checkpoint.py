@@ -31,6 +31,10 @@ class Checkpoint:
             created_at=datetime.utcnow(),
         )
 
+    def fingerprint(self) -> str:
+        """Retorna la huella del escaneo (ver CheckpointData.fingerprint)"""
+        return self.checkpoint_data.fingerprint(self.tracking_id)
+
     def to_dict(self) -> dict:
         """Convierte el checkpoint a diccionario"""
         return {
@@ -1,11 +1,12 @@
-from dataclasses import dataclass
-from datetime import datetime
-from typing import List, Optional
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence
 from uuid import uuid4
 
 from ..value_objects.checkpoint_data import CheckpointData
 from ..value_objects.tracking_id import TrackingId
-from ..value_objects.unit_status import UnitStatus
+from ..value_objects.unit_status import UnitStatus, first_invalid_transition
 
 
 @dataclass
@@ -18,6 +19,12 @@ class Unit:
     updated_at: datetime
     checkpoints: List[CheckpointData]
     id: Optional[str] = None
+    # Versión persistida para control de concurrencia optimista (0 = nueva)
+    version: int = 0
+    # Checkpoints agregados desde la última vez que la unidad fue persistida
+    pending_checkpoints: List[CheckpointData] = field(
+        default_factory=list, repr=False, compare=False
+    )
 
     def __post_init__(self):
         if self.id is None:
@@ -40,10 +47,54 @@ class Unit:
             created_at=now,
             updated_at=now,
             checkpoints=[initial_checkpoint],
+            pending_checkpoints=[initial_checkpoint],
         )
 
-    def add_checkpoint(self, checkpoint_data: CheckpointData) -> None:
-        """Agrega un nuevo checkpoint a la unidad"""
+    @classmethod
+    def create_for_checkpoint(
+        cls, tracking_id: TrackingId, checkpoint_data: CheckpointData
+    ) -> "Unit":
+        """Crea una unidad sin historial que recibirá su primer checkpoint"""
+        # Estado inicial CREATED si el checkpoint no es CREATED
+        initial_status = (
+            UnitStatus.CREATED
+            if checkpoint_data.status != UnitStatus.CREATED
+            else checkpoint_data.status
+        )
+        now = datetime.utcnow()
+
+        return cls(
+            tracking_id=tracking_id,
+            current_status=initial_status,
+            created_at=now,
+            updated_at=now,
+            checkpoints=[],
+        )
+
+    def add_checkpoint(
+        self,
+        checkpoint_data: CheckpointData,
+        reorder_window: timedelta = timedelta(0),
+    ) -> None:
+        """
+        Agrega un nuevo checkpoint a la unidad
+
+        Un checkpoint anterior al último se acepta si llega dentro de
+        reorder_window: se inserta en su posición cronológica y solo se
+        validan las transiciones con sus vecinos inmediatos.
+        """
+        last_checkpoint = self.get_last_checkpoint()
+        is_late = bool(
+            last_checkpoint and checkpoint_data.timestamp <= last_checkpoint.timestamp
+        )
+        if (
+            is_late
+            and reorder_window
+            and last_checkpoint.timestamp - checkpoint_data.timestamp <= reorder_window
+        ):
+            self._insert_late_checkpoint(checkpoint_data)
+            return
+
         # Validar transición de estado
         if not self.current_status.can_transition_to(checkpoint_data.status):
             raise ValueError(
@@ -51,22 +102,115 @@ class Unit:
             )
 
         # Validar que el timestamp sea posterior al último checkpoint
-        if (
-            self.checkpoints
-            and checkpoint_data.timestamp <= self.checkpoints[-1].timestamp
-        ):
+        if is_late:
             raise ValueError(
                 "El timestamp del nuevo checkpoint debe ser posterior al último"
             )
 
         self.checkpoints.append(checkpoint_data)
+        self.pending_checkpoints.append(checkpoint_data)
         self.current_status = checkpoint_data.status
         self.updated_at = datetime.utcnow()
 
+    def add_checkpoints(
+        self,
+        checkpoints: Sequence[CheckpointData],
+        reorder_window: timedelta = timedelta(0),
+    ) -> Dict[int, str]:
+        """
+        Agrega en orden una secuencia de checkpoints a la unidad
+
+        Los tramos con timestamps crecientes se validan de una vez con la
+        matriz de transiciones y se agregan sin pasar por add_checkpoint. El
+        checkpoint que rompe un tramo se aplica con add_checkpoint, con sus
+        mismas reglas y mensajes de error, y la validación continúa con el
+        siguiente.
+
+        Returns:
+            Dict[int, str]: Mensaje de error por posición de los checkpoints
+                rechazados
+        """
+        errors: Dict[int, str] = {}
+        start = 0
+        while start < len(checkpoints):
+            end = self._valid_run_end(checkpoints, start)
+            if end > start:
+                run = checkpoints[start:end]
+                self.checkpoints.extend(run)
+                self.pending_checkpoints.extend(run)
+                self.current_status = run[-1].status
+                self.updated_at = datetime.utcnow()
+                start = end
+                continue
+
+            try:
+                self.add_checkpoint(checkpoints[start], reorder_window)
+            except ValueError as e:
+                errors[start] = str(e)
+            start += 1
+        return errors
+
+    def _valid_run_end(self, checkpoints: Sequence[CheckpointData], start: int) -> int:
+        """Retorna el final del tramo que puede agregarse sin más validación"""
+        last_checkpoint = self.get_last_checkpoint()
+        previous = last_checkpoint.timestamp if last_checkpoint else None
+        end = start
+        while end < len(checkpoints):
+            timestamp = checkpoints[end].timestamp
+            if previous is not None and timestamp <= previous:
+                break
+            previous = timestamp
+            end += 1
+
+        invalid = first_invalid_transition(
+            self.current_status,
+            [checkpoint.status for checkpoint in checkpoints[start:end]],
+        )
+        return end if invalid is None else start + invalid
+
+    def _insert_late_checkpoint(self, checkpoint_data: CheckpointData) -> None:
+        """Inserta un checkpoint tardío en su posición cronológica"""
+        position = bisect_right(
+            [checkpoint.timestamp for checkpoint in self.checkpoints],
+            checkpoint_data.timestamp,
+        )
+        previous = self.checkpoints[position - 1] if position else None
+        if previous and previous.timestamp == checkpoint_data.timestamp:
+            raise ValueError("Ya existe un checkpoint con el mismo timestamp")
+
+        # Con el timestamp del último checkpoint la posición queda al final
+        following = (
+            self.checkpoints[position] if position < len(self.checkpoints) else None
+        )
+
+        if previous and not previous.status.can_transition_to(checkpoint_data.status):
+            raise ValueError(
+                f"No se puede cambiar de {previous.status.value} a {checkpoint_data.status.value}"
+            )
+        if following and not checkpoint_data.status.can_transition_to(following.status):
+            raise ValueError(
+                f"El checkpoint tardío {checkpoint_data.status.value} no puede preceder a {following.status.value}"
+            )
+
+        self.checkpoints.insert(position, checkpoint_data)
+        self.pending_checkpoints.append(checkpoint_data)
+        # Las transiciones posteriores no cambian: el estado actual sigue
+        # siendo el del último checkpoint
+        self.current_status = self.checkpoints[-1].status
+        self.updated_at = datetime.utcnow()
+
     def get_checkpoint_history(self) -> List[CheckpointData]:
         """Retorna el historial completo de checkpoints"""
         return self.checkpoints.copy()
 
+    def get_pending_checkpoints(self) -> List[CheckpointData]:
+        """Retorna los checkpoints que aún no han sido persistidos"""
+        return self.pending_checkpoints.copy()
+
+    def mark_checkpoints_persisted(self) -> None:
+        """Marca todos los checkpoints pendientes como persistidos"""
+        self.pending_checkpoints.clear()
+
     def get_last_checkpoint(self) -> Optional[CheckpointData]:
         """Retorna el último checkpoint"""
         return self.checkpoints[-1] if self.checkpoints else None
@@ -0,0 +1,24 @@
+class ConcurrentModificationError(Exception):
+    """
+    Error lanzado cuando una unidad fue modificada por otro proceso
+
+    Indica que la versión leída de la unidad ya no es la vigente; la
+    operación puede reintentarse cargando de nuevo la unidad.
+    """
+
+    def __init__(self, tracking_id: str):
+        self.tracking_id = tracking_id
+        super().__init__(f"Unidad modificada concurrentemente: {tracking_id}")
+
+
+class DuplicateCheckpointError(ValueError):
+    """
+    Error lanzado cuando un checkpoint ya estaba registrado
+
+    El escaneo tiene la misma huella que uno persistido (p. ej. un reenvío
+    del escáner), por lo que no se guarda ni cambia el estado de la unidad.
+    """
+
+    def __init__(self, tracking_id: str):
+        self.tracking_id = tracking_id
+        super().__init__(f"El checkpoint ya fue registrado para {tracking_id}")
@@ -0,0 +1,58 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Iterable, Optional
+
+from ..value_objects.unit_status import UnitStatus
+
+# Campos de un checkpoint en el historial, con las claves de Checkpoint.to_dict
+CHECKPOINT_VIEW_FIELDS = (
+    "id",
+    "tracking_id",
+    "status",
+    "timestamp",
+    "location",
+    "notes",
+    "operator_id",
+    "created_at",
+)
+
+
+@dataclass(frozen=True)
+class CheckpointView:
+    """
+    Proyección de solo lectura de un checkpoint para el historial
+
+    Se construye solo con las columnas solicitadas; las demás quedan en None.
+    """
+
+    id: Optional[str] = None
+    tracking_id: Optional[str] = None
+    status: Optional[UnitStatus] = None
+    timestamp: Optional[datetime] = None
+    location: Optional[str] = None
+    notes: Optional[str] = None
+    operator_id: Optional[str] = None
+    created_at: Optional[datetime] = None
+
+    def to_dict(self, fields: Optional[Iterable[str]] = None) -> dict:
+        """
+        Convierte la proyección a diccionario con las claves de Checkpoint.to_dict
+
+        Args:
+            fields: Campos a incluir (por defecto, todos)
+        """
+        values = {
+            "id": self.id,
+            "tracking_id": self.tracking_id,
+            "status": self.status.value if self.status else None,
+            "timestamp": self.timestamp.isoformat() if self.timestamp else None,
+            "location": self.location,
+            "notes": self.notes,
+            "operator_id": self.operator_id,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+        }
+        if fields is None:
+            return values
+
+        fields = set(fields)
+        return {key: value for key, value in values.items() if key in fields}
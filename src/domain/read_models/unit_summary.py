@@ -0,0 +1,62 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Iterable, Optional
+
+from ..value_objects.unit_status import UnitStatus
+
+# Campos del resumen de una unidad, con las claves de Unit.to_dict
+UNIT_SUMMARY_FIELDS = (
+    "id",
+    "tracking_id",
+    "current_status",
+    "created_at",
+    "updated_at",
+    "is_delivered",
+    "has_exception",
+    "delivery_time",
+)
+
+
+@dataclass(frozen=True)
+class UnitSummary:
+    """
+    Proyección de solo lectura de una unidad para los listados
+
+    Contiene las columnas que muestra el listado, sin el historial de
+    checkpoints: delivered_at es el timestamp de entrega ya calculado en la
+    consulta. En una proyección parcial las columnas no solicitadas quedan
+    en None.
+    """
+
+    id: str
+    tracking_id: Optional[str] = None
+    current_status: Optional[UnitStatus] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    delivered_at: Optional[datetime] = None
+
+    def to_dict(self, fields: Optional[Iterable[str]] = None) -> dict:
+        """
+        Convierte el resumen a diccionario con las claves de Unit.to_dict
+
+        Args:
+            fields: Campos a incluir (por defecto, todos)
+        """
+        status = self.current_status
+        values = {
+            "id": self.id,
+            "tracking_id": self.tracking_id,
+            "current_status": status.value if status else None,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+            "is_delivered": status == UnitStatus.DELIVERED,
+            "has_exception": status == UnitStatus.EXCEPTION,
+            "delivery_time": (
+                self.delivered_at.isoformat() if self.delivered_at else None
+            ),
+        }
+        if fields is None:
+            return values
+
+        fields = set(fields)
+        return {key: value for key, value in values.items() if key in fields}
@@ -1,7 +1,9 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from datetime import datetime
+from typing import Collection, List, Optional, Tuple
 
 from ..entities.checkpoint import Checkpoint
+from ..read_models.checkpoint_view import CheckpointView
 from ..value_objects.tracking_id import TrackingId
 
 
@@ -18,6 +20,25 @@ class CheckpointRepository(ABC):
         """Busca todos los checkpoints de una unidad por tracking ID"""
         pass
 
+    @abstractmethod
+    def find_views_by_tracking_id(
+        self,
+        tracking_id: TrackingId,
+        fields: Optional[Collection[str]] = None,
+        limit: Optional[int] = None,
+        before: Optional[Tuple[datetime, str]] = None,
+        newest_first: bool = False,
+    ) -> List[CheckpointView]:
+        """
+        Busca los checkpoints de una unidad como proyecciones con solo los
+        campos indicados
+
+        Se ordenan por (timestamp, id), del más antiguo o del más reciente, y
+        se paginan con limit y before: la clave (timestamp, id) del último
+        checkpoint de la página anterior.
+        """
+        pass
+
     @abstractmethod
     def find_by_id(self, checkpoint_id: str) -> Optional[Checkpoint]:
         """Busca un checkpoint por su ID"""
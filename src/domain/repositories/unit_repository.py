@@ -1,7 +1,10 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from datetime import datetime
+from typing import Collection, List, Optional, Set, Tuple
 
+from ..entities.checkpoint import Checkpoint
 from ..entities.unit import Unit
+from ..read_models.unit_summary import UnitSummary
 from ..value_objects.tracking_id import TrackingId
 from ..value_objects.unit_status import UnitStatus
 
@@ -14,19 +17,91 @@ class UnitRepository(ABC):
         """Guarda una unidad en el repositorio"""
         pass
 
+    @abstractmethod
+    def save_with_checkpoint(self, unit: Unit, checkpoint: Checkpoint) -> Set[str]:
+        """
+        Guarda una unidad y su nuevo checkpoint en una sola transacción
+
+        Returns:
+            Set[str]: Huellas de los checkpoints omitidos por ya estar
+                registrados; la unidad no cambia si todos fueron omitidos
+        """
+        pass
+
     @abstractmethod
     def find_by_tracking_id(self, tracking_id: TrackingId) -> Optional[Unit]:
         """Busca una unidad por su tracking ID"""
         pass
 
+    @abstractmethod
+    def save_batch(
+        self,
+        new_units: List[Unit],
+        updated_units: List[Unit],
+        checkpoints: List[Checkpoint],
+    ) -> Set[str]:
+        """
+        Guarda un lote de unidades y sus checkpoints nuevos en una transacción
+
+        Returns:
+            Set[str]: Huellas de los checkpoints omitidos por ya estar
+                registrados; las unidades sin checkpoints insertados no cambian
+        """
+        pass
+
+    @abstractmethod
+    def find_by_tracking_ids(self, tracking_ids: List[TrackingId]) -> List[Unit]:
+        """Busca varias unidades por sus tracking IDs"""
+        pass
+
+    @abstractmethod
+    def find_by_shipment_id(self, shipment_id: str) -> List[Unit]:
+        """Busca las unidades de un envío cargando solo su último checkpoint"""
+        pass
+
     @abstractmethod
     def find_by_id(self, unit_id: str) -> Optional[Unit]:
         """Busca una unidad por su ID"""
         pass
 
     @abstractmethod
-    def find_by_status(self, status: UnitStatus) -> List[Unit]:
-        """Busca todas las unidades con un estado específico"""
+    def find_by_status(
+        self,
+        status: UnitStatus,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        after: Optional[Tuple[datetime, str]] = None,
+    ) -> List[Unit]:
+        """
+        Busca las unidades con un estado específico en orden de creación
+
+        Se pagina con limit y offset, o con after: la clave (created_at, id)
+        de la última unidad de la página anterior.
+        """
+        pass
+
+    @abstractmethod
+    def find_summaries_by_status(
+        self,
+        status: UnitStatus,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        after: Optional[Tuple[datetime, str]] = None,
+        fields: Optional[Collection[str]] = None,
+    ) -> List[UnitSummary]:
+        """
+        Busca los resúmenes de las unidades con un estado específico
+
+        Mismo orden y paginación que find_by_status, sin cargar checkpoints.
+        Con fields solo se leen las columnas de esos campos de UnitSummary.
+        """
+        pass
+
+    @abstractmethod
+    def find_summary_by_tracking_id(
+        self, tracking_id: TrackingId, fields: Optional[Collection[str]] = None
+    ) -> Optional[UnitSummary]:
+        """Busca el resumen de una unidad, con solo los campos indicados"""
         pass
 
     @abstractmethod
@@ -1,10 +1,43 @@
+import hashlib
 from dataclasses import dataclass
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Optional
 
 from .unit_status import UnitStatus
 
 
+def naive_utc(timestamp: datetime) -> datetime:
+    """Convierte un timestamp con zona horaria a UTC sin zona"""
+    if timestamp.tzinfo is not None:
+        return timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return timestamp
+
+
+def checkpoint_fingerprint(
+    tracking_id: str,
+    status: str,
+    timestamp: datetime,
+    location: Optional[str] = None,
+    operator_id: Optional[str] = None,
+) -> str:
+    """
+    Calcula la huella determinista de un escaneo físico
+
+    Dos checkpoints con el mismo tracking ID, estado, timestamp, ubicación y
+    operador corresponden al mismo escaneo y tienen la misma huella.
+    """
+    content = "\x1f".join(
+        [
+            tracking_id,
+            status,
+            naive_utc(timestamp).isoformat(),
+            location or "",
+            operator_id or "",
+        ]
+    )
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
 @dataclass(frozen=True)
 class CheckpointData:
     """Value Object que contiene los datos de un checkpoint"""
@@ -22,12 +55,8 @@ class CheckpointData:
         if not isinstance(self.timestamp, datetime):
             raise ValueError("Timestamp debe ser una instancia de datetime")
 
-        # Validar que el timestamp no sea futuro
-        now = datetime.utcnow()
-        if self.timestamp.tzinfo is not None:
-            # Si tiene timezone, convertir a UTC naive para comparar
-            now = now.replace(tzinfo=None)
-        if self.timestamp > now:
+        # Validar que el timestamp no sea futuro (con timezone, en UTC naive)
+        if naive_utc(self.timestamp) > datetime.utcnow():
             raise ValueError("Timestamp no puede ser futuro")
 
         # Validar longitud de campos opcionales
@@ -40,6 +69,16 @@ class CheckpointData:
         if self.operator_id and len(self.operator_id) > 50:
             raise ValueError("Operator ID no puede exceder 50 caracteres")
 
+    def fingerprint(self, tracking_id) -> str:
+        """Retorna la huella del checkpoint para el tracking ID dado"""
+        return checkpoint_fingerprint(
+            str(tracking_id),
+            self.status.value,
+            self.timestamp,
+            self.location,
+            self.operator_id,
+        )
+
     def to_dict(self) -> dict:
         """Convierte el checkpoint a diccionario"""
         return {
@@ -1,5 +1,5 @@
 from enum import Enum
-from typing import List
+from typing import List, Optional, Sequence
 
 
 class UnitStatus(Enum):
@@ -32,21 +32,76 @@ class UnitStatus(Enum):
         cls, current_status: "UnitStatus"
     ) -> List["UnitStatus"]:
         """Retorna los estados válidos siguientes basado en el estado actual"""
-        transitions = {
-            cls.CREATED: [cls.PICKED_UP, cls.EXCEPTION],
-            cls.PICKED_UP: [cls.IN_TRANSIT, cls.AT_FACILITY, cls.EXCEPTION],
-            cls.IN_TRANSIT: [cls.AT_FACILITY, cls.OUT_FOR_DELIVERY, cls.EXCEPTION],
-            cls.AT_FACILITY: [cls.OUT_FOR_DELIVERY, cls.IN_TRANSIT, cls.EXCEPTION],
-            cls.OUT_FOR_DELIVERY: [cls.DELIVERED, cls.AT_FACILITY, cls.EXCEPTION],
-            cls.DELIVERED: [],  # Estado final
-            cls.EXCEPTION: [
-                cls.PICKED_UP,
-                cls.IN_TRANSIT,
-                cls.AT_FACILITY,
-            ],  # Puede recuperarse
-        }
-        return transitions.get(current_status, [])
+        return list(_TRANSITIONS.get(current_status, ()))
 
     def can_transition_to(self, target_status: "UnitStatus") -> bool:
         """Verifica si es posible hacer la transición al estado objetivo"""
-        return target_status in self.get_next_valid_statuses(self)
+        return bool(
+            _TRANSITION_MATRIX[STATUS_CODES[self]] >> STATUS_CODES[target_status] & 1
+        )
+
+
+_TRANSITIONS = {
+    UnitStatus.CREATED: (UnitStatus.PICKED_UP, UnitStatus.EXCEPTION),
+    UnitStatus.PICKED_UP: (
+        UnitStatus.IN_TRANSIT,
+        UnitStatus.AT_FACILITY,
+        UnitStatus.EXCEPTION,
+    ),
+    UnitStatus.IN_TRANSIT: (
+        UnitStatus.AT_FACILITY,
+        UnitStatus.OUT_FOR_DELIVERY,
+        UnitStatus.EXCEPTION,
+    ),
+    UnitStatus.AT_FACILITY: (
+        UnitStatus.OUT_FOR_DELIVERY,
+        UnitStatus.IN_TRANSIT,
+        UnitStatus.EXCEPTION,
+    ),
+    UnitStatus.OUT_FOR_DELIVERY: (
+        UnitStatus.DELIVERED,
+        UnitStatus.AT_FACILITY,
+        UnitStatus.EXCEPTION,
+    ),
+    UnitStatus.DELIVERED: (),  # Estado final
+    UnitStatus.EXCEPTION: (
+        UnitStatus.PICKED_UP,
+        UnitStatus.IN_TRANSIT,
+        UnitStatus.AT_FACILITY,
+    ),  # Puede recuperarse
+}
+
+# Códigos enteros de estado en orden de declaración
+STATUS_CODES = {status: code for code, status in enumerate(UnitStatus)}
+
+# Matriz de transiciones compilada: la fila de cada estado es una máscara de
+# bits con un bit encendido por cada código de estado destino válido
+_TRANSITION_MATRIX = tuple(
+    sum(1 << STATUS_CODES[target] for target in _TRANSITIONS[status])
+    for status in UnitStatus
+)
+
+
+def first_invalid_transition(
+    current_status: UnitStatus, statuses: Sequence[UnitStatus]
+) -> Optional[int]:
+    """
+    Valida de una vez una secuencia de transiciones
+
+    Args:
+        current_status: Estado desde el que parte la secuencia
+        statuses: Estados destino en el orden en que se aplican
+
+    Returns:
+        Optional[int]: Índice del primer estado al que no se puede llegar
+            desde el anterior, o None si toda la secuencia es válida
+    """
+    matrix = _TRANSITION_MATRIX
+    codes = STATUS_CODES
+    allowed = matrix[codes[current_status]]
+    for index, status in enumerate(statuses):
+        code = codes[status]
+        if not allowed >> code & 1:
+            return index
+        allowed = matrix[code]
+    return None
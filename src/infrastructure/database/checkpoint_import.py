@@ -0,0 +1,481 @@
+import csv
+import heapq
+import io
+import json
+import os
+import tempfile
+import time
+import zlib
+from datetime import datetime
+from itertools import groupby
+from typing import Iterator, List, Optional, Tuple
+from uuid import uuid4
+
+import structlog
+from flask import Flask
+from sqlalchemy import insert
+
+from ...domain.entities.unit import Unit
+from ...domain.value_objects.checkpoint_data import CheckpointData, naive_utc
+from ...domain.value_objects.tracking_id import TrackingId
+from ...domain.value_objects.unit_status import UnitStatus
+from .database import db, init_database
+from .models import CheckpointModel, UnitModel
+
+logger = structlog.get_logger(__name__)
+
+UNIT_COLUMNS = (
+    "id",
+    "tracking_id",
+    "current_status",
+    "version",
+    "created_at",
+    "updated_at",
+)
+CHECKPOINT_COLUMNS = (
+    "id",
+    "tracking_id",
+    "status",
+    "timestamp",
+    "location",
+    "notes",
+    "operator_id",
+    "fingerprint",
+    "unit_id",
+    "created_at",
+)
+# Corridas ordenadas de una partición escritas por split_partitions
+PARTITION_SUFFIX = ".partition.ndjson"
+# Filas que se ordenan en memoria por corrida
+SORT_RUN_ROWS = 200_000
+
+Scan = Tuple[str, int, CheckpointData]
+
+
+def read_rows(path: str) -> Iterator[Tuple[int, dict]]:
+    """
+    Lee un archivo CSV o NDJSON fila por fila
+
+    Yields:
+        Tuple[int, dict]: Número de línea y columnas de la fila
+    """
+    with open(path, newline="", encoding="utf-8") as handle:
+        if path.endswith((".ndjson", ".jsonl")):
+            for line_number, line in enumerate(handle, start=1):
+                if line.strip():
+                    yield line_number, json.loads(line)
+        else:
+            # La línea 1 es el encabezado
+            for line_number, row in enumerate(csv.DictReader(handle), start=2):
+                yield line_number, row
+
+
+def split_partitions(
+    paths: List[str],
+    partitions: int,
+    directory: str,
+    rows_per_run: int = SORT_RUN_ROWS,
+) -> List[List[str]]:
+    """
+    Reparte las filas de los archivos en corridas ordenadas por partición
+
+    Los archivos de origen pueden venir en cualquier orden (los exports
+    legados suelen estar ordenados por tiempo) y se leen una sola vez. Es
+    un ordenamiento externo: las filas se acumulan en bloques de
+    rows_per_run, cada bloque se ordena por partición, tracking ID y
+    timestamp y se escribe como una corrida por partición. Cada worker
+    mezcla después solo las corridas de su partición (read_sorted_rows).
+
+    Returns:
+        List[List[str]]: Archivos de corrida de cada partición
+    """
+    runs: List[List[str]] = [[] for _ in range(partitions)]
+    block = []
+    for path in paths:
+        for line_number, row in read_rows(path):
+            block.append(
+                (partition_for(_tracking_id(row), partitions), path, line_number, row)
+            )
+            if len(block) >= rows_per_run:
+                _write_runs(block, directory, runs)
+                block = []
+    if block:
+        _write_runs(block, directory, runs)
+    return runs
+
+
+def _write_runs(block: list, directory: str, runs: List[List[str]]) -> None:
+    """Ordena un bloque de filas y escribe una corrida por partición"""
+    block.sort(key=lambda entry: (entry[0], _sort_key(entry[3])))
+    for partition, entries in groupby(block, key=lambda entry: entry[0]):
+        run_path = os.path.join(
+            directory, f"{partition}.{len(runs[partition])}{PARTITION_SUFFIX}"
+        )
+        with open(run_path, "w", encoding="utf-8") as handle:
+            for _, path, line_number, row in entries:
+                handle.write(
+                    json.dumps({"path": path, "line": line_number, "row": row}) + "\n"
+                )
+        runs[partition].append(run_path)
+
+
+def read_sorted_rows(run_paths: List[str]) -> Iterator[Tuple[str, int, dict]]:
+    """
+    Mezcla en orden de tracking ID y timestamp las corridas de una partición
+
+    Las filas conservan el archivo y la línea de origen, para que los
+    rechazos apunten al archivo original.
+
+    Yields:
+        Tuple[str, int, dict]: Archivo, número de línea y columnas de la fila
+    """
+    return heapq.merge(
+        *(_read_run(run_path) for run_path in run_paths),
+        key=lambda located: _sort_key(located[2]),
+    )
+
+
+def _read_run(run_path: str) -> Iterator[Tuple[str, int, dict]]:
+    for _, entry in read_rows(run_path):
+        yield entry["path"], entry["line"], entry["row"]
+
+
+def _sort_key(row: dict) -> Tuple[str, str]:
+    return _tracking_id(row), str(row.get("timestamp") or "")
+
+
+def _tracking_id(row: dict) -> str:
+    return str(row.get("tracking_id") or "")
+
+
+def parse_row(row: dict) -> Tuple[TrackingId, CheckpointData]:
+    """
+    Construye los objetos de dominio de una fila importada
+
+    Raises:
+        ValueError: Si la fila no cumple las reglas de TrackingId,
+            UnitStatus o CheckpointData
+    """
+    timestamp = row.get("timestamp")
+    if not isinstance(timestamp, datetime):
+        timestamp = datetime.fromisoformat(str(timestamp or "").replace("Z", "+00:00"))
+    timestamp = naive_utc(timestamp)
+
+    return TrackingId(row.get("tracking_id") or ""), CheckpointData(
+        status=UnitStatus(row.get("status")),
+        timestamp=timestamp,
+        location=row.get("location") or None,
+        notes=row.get("notes") or None,
+        operator_id=row.get("operator_id") or None,
+    )
+
+
+def partition_for(tracking_id: str, partitions: int) -> int:
+    """Retorna la partición estable de un tracking ID"""
+    return zlib.crc32(tracking_id.encode("utf-8")) % partitions
+
+
+class ImportProgress:
+    """
+    Archivo de progreso de una partición de la importación
+
+    Guarda el último tracking ID confirmado; las unidades se procesan en
+    orden de tracking ID, por lo que al reanudar se omiten las ya escritas.
+    También guarda el número de particiones: con otro número los tracking
+    IDs cambian de partición y el progreso guardado no aplica.
+
+    Raises:
+        ValueError: Si el archivo es de una importación con otro número de
+            particiones
+    """
+
+    def __init__(self, path: Optional[str], partitions: int = 1):
+        self.path = path
+        self.state = {
+            "last_tracking_id": None,
+            "units": 0,
+            "rows": 0,
+            "partitions": partitions,
+        }
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as handle:
+                self.state.update(json.load(handle))
+        if self.state["partitions"] != partitions:
+            raise ValueError(
+                f"{path} es de una importación con {self.state['partitions']} "
+                f"workers; reanude con --workers {self.state['partitions']}"
+            )
+
+    @property
+    def last_tracking_id(self) -> Optional[str]:
+        return self.state["last_tracking_id"]
+
+    def advance(self, last_tracking_id: str, units: int, rows: int) -> None:
+        """Registra un bloque confirmado y reescribe el archivo atómicamente"""
+        self.state["last_tracking_id"] = last_tracking_id
+        self.state["units"] += units
+        self.state["rows"] += rows
+        if not self.path:
+            return
+
+        temporary = f"{self.path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as handle:
+            json.dump(self.state, handle)
+        os.replace(temporary, self.path)
+
+
+class CheckpointImporter:
+    """
+    Importa checkpoints históricos de una partición de tracking IDs
+
+    Las filas se ordenan por tracking ID con split_partitions y se leen en
+    streaming: las filas consecutivas de una unidad se agrupan y se aplican
+    en orden cronológico con las reglas de Unit.add_checkpoints. Las
+    unidades se escriben por bloques, cada bloque en una transacción, con
+    COPY en PostgreSQL o executemany en otros motores, por lo que la memoria
+    depende del tamaño del bloque y no del archivo. Las unidades que ya existen
+    se omiten y no se generan mensajes de outbox: la importación carga
+    historial, no eventos nuevos.
+    """
+
+    def __init__(
+        self,
+        partition: int = 0,
+        partitions: int = 1,
+        units_per_chunk: int = 1000,
+        progress_path: Optional[str] = None,
+        rows_per_run: int = SORT_RUN_ROWS,
+    ):
+        self.partition = partition
+        self.partitions = partitions
+        self.units_per_chunk = units_per_chunk
+        self.rows_per_run = rows_per_run
+        self.progress = ImportProgress(progress_path, partitions)
+        self.stats = {
+            "rows": 0,
+            "units": 0,
+            "rejected": 0,
+            "duplicates": 0,
+            "skipped_units": 0,
+        }
+
+    def run(self, paths: List[str]) -> dict:
+        """
+        Ordena los archivos de origen e importa la partición
+
+        Con varios workers los archivos se ordenan una sola vez y cada
+        worker usa run_sorted con las corridas de su partición.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            runs = split_partitions(
+                paths, self.partitions, directory, self.rows_per_run
+            )
+            return self.run_sorted(runs[self.partition])
+
+    def run_sorted(self, run_paths: List[str]) -> dict:
+        """
+        Importa las corridas ordenadas de la partición (ver split_partitions)
+        y retorna su resumen
+        """
+        started = time.perf_counter()
+        chunk: List[Tuple[str, List[Scan]]] = []
+        for unit_scans in self._read_partition(run_paths):
+            chunk.append(unit_scans)
+            if len(chunk) >= self.units_per_chunk:
+                self._commit_chunk(chunk, started)
+                chunk = []
+        if chunk:
+            self._commit_chunk(chunk, started)
+
+        self.stats["seconds"] = round(time.perf_counter() - started, 3)
+        return self.stats
+
+    def _commit_chunk(self, chunk: List[Tuple[str, List[Scan]]], started: float):
+        """Importa un bloque de unidades y registra el progreso"""
+        units, rows = self._import_chunk(chunk)
+        self.progress.advance(chunk[-1][0], units, rows)
+
+        elapsed = time.perf_counter() - started
+        logger.info(
+            "Bloque de importación confirmado",
+            partition=self.partition,
+            units=self.stats["units"],
+            rows=self.stats["rows"],
+            rows_per_second=round(self.stats["rows"] / elapsed, 1),
+        )
+
+    def _read_partition(self, run_paths: List[str]) -> Iterator[Tuple[str, List[Scan]]]:
+        """
+        Lee las filas de la partición agrupadas por tracking ID
+
+        Al reanudar se omiten las unidades hasta el último tracking ID
+        confirmado.
+        """
+        last_tracking_id = self.progress.last_tracking_id
+        rows = read_sorted_rows(run_paths)
+        for tracking_id, located_rows in groupby(
+            rows, key=lambda located: _tracking_id(located[2])
+        ):
+            if last_tracking_id is not None and tracking_id <= last_tracking_id:
+                continue
+
+            scans = []
+            for path, line_number, row in located_rows:
+                try:
+                    _, checkpoint_data = parse_row(row)
+                except (TypeError, ValueError) as e:
+                    self._reject(path, line_number, str(e))
+                    continue
+                scans.append((path, line_number, checkpoint_data))
+            if scans:
+                yield tracking_id, scans
+
+    def _reject(self, path: str, line_number: int, error: str) -> None:
+        self.stats["rejected"] += 1
+        logger.warning(
+            "Fila de importación rechazada",
+            file=path,
+            line=line_number,
+            error=error,
+        )
+
+    def _import_chunk(self, chunk: List[Tuple[str, List[Scan]]]) -> Tuple[int, int]:
+        """Construye y escribe en una transacción las unidades de un bloque"""
+        existing = {
+            tracking_id
+            for (tracking_id,) in db.session.query(UnitModel.tracking_id).filter(
+                UnitModel.tracking_id.in_([tracking_id for tracking_id, _ in chunk])
+            )
+        }
+
+        now = datetime.utcnow()
+        unit_rows = []
+        checkpoint_rows = []
+        for tracking_id, scans in chunk:
+            if tracking_id in existing:
+                self.stats["skipped_units"] += 1
+                continue
+
+            unit = self._build_unit(tracking_id, scans)
+            if not unit.checkpoints:
+                continue
+
+            first, last = unit.checkpoints[0], unit.checkpoints[-1]
+            unit_rows.append(
+                {
+                    "id": unit.id,
+                    "tracking_id": tracking_id,
+                    "current_status": unit.current_status.value,
+                    "version": 1,
+                    "created_at": first.timestamp,
+                    "updated_at": last.timestamp,
+                }
+            )
+            checkpoint_rows.extend(
+                {
+                    "id": str(uuid4()),
+                    "tracking_id": tracking_id,
+                    "status": checkpoint_data.status.value,
+                    "timestamp": checkpoint_data.timestamp,
+                    "location": checkpoint_data.location,
+                    "notes": checkpoint_data.notes,
+                    "operator_id": checkpoint_data.operator_id,
+                    "fingerprint": checkpoint_data.fingerprint(tracking_id),
+                    "unit_id": unit.id,
+                    "created_at": now,
+                }
+                for checkpoint_data in unit.checkpoints
+            )
+
+        if unit_rows:
+            try:
+                self._write(UnitModel, UNIT_COLUMNS, unit_rows)
+                self._write(CheckpointModel, CHECKPOINT_COLUMNS, checkpoint_rows)
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+
+        self.stats["units"] += len(unit_rows)
+        self.stats["rows"] += len(checkpoint_rows)
+        return len(unit_rows), len(checkpoint_rows)
+
+    def _build_unit(self, tracking_id: str, scans: List[Scan]) -> Unit:
+        """Aplica en orden cronológico los escaneos de una unidad"""
+        scans = sorted(scans, key=lambda scan: scan[2].timestamp)
+        first = scans[0][2]
+        unit = Unit.create_for_checkpoint(TrackingId(tracking_id), first)
+        if first.status == UnitStatus.CREATED:
+            # El historial legado puede incluir el escaneo de creación
+            unit.checkpoints.append(first)
+            scans = scans[1:]
+
+        # Escaneos repetidos en el archivo de origen
+        unique = []
+        previous = unit.get_last_checkpoint()
+        for scan in scans:
+            if scan[2] == previous:
+                self.stats["duplicates"] += 1
+                continue
+            unique.append(scan)
+            previous = scan[2]
+
+        errors = unit.add_checkpoints([scan[2] for scan in unique])
+        for position, error in errors.items():
+            path, line_number, _ = unique[position]
+            self._reject(path, line_number, error)
+        return unit
+
+    def _write(self, model, columns: Tuple[str, ...], rows: List[dict]) -> None:
+        """Escribe filas con COPY en PostgreSQL o executemany en otros motores"""
+        if db.session.get_bind().dialect.name != "postgresql":
+            db.session.execute(insert(model), rows)
+            return
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow(
+                [
+                    (
+                        row[column].isoformat()
+                        if isinstance(row[column], datetime)
+                        else row[column]
+                    )
+                    for column in columns
+                ]
+            )
+        buffer.seek(0)
+
+        # COPY corre sobre la conexión de la sesión, dentro de su transacción
+        raw_connection = db.session.connection().connection
+        with raw_connection.cursor() as cursor:
+            cursor.copy_expert(
+                f"COPY {model.__tablename__} ({', '.join(columns)}) "
+                "FROM STDIN WITH (FORMAT csv)",
+                buffer,
+            )
+
+
+def import_partition(
+    run_paths: List[str],
+    partition: int,
+    partitions: int,
+    units_per_chunk: int,
+    progress_path: Optional[str],
+) -> dict:
+    """
+    Importa las corridas ordenadas de una partición en un proceso worker
+
+    Cada proceso crea su propia aplicación mínima y sus conexiones.
+    """
+    app = Flask("tracking_import")
+    init_database(app)
+    with app.app_context():
+        importer = CheckpointImporter(
+            partition=partition,
+            partitions=partitions,
+            units_per_chunk=units_per_chunk,
+            progress_path=progress_path,
+        )
+        return importer.run_sorted(run_paths)
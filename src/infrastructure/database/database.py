@@ -2,6 +2,7 @@ import os
 
 from flask_migrate import Migrate
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import insert
 
 # Inicializar extensiones
 db = SQLAlchemy()
@@ -21,7 +22,27 @@ def init_database(app):
     migrate.init_app(app, db)
 
     # Importar modelos para que SQLAlchemy los registre
-    from .models import (CheckpointModel, ShipmentModel, ShipmentUnitModel,
-                         UnitModel)
+    from .models import (CheckpointModel, OutboxMessageModel, ShipmentModel,
+                         ShipmentUnitModel, UnitModel)
 
     return db
+
+
+def insert_ignoring_duplicates(model, *conflict_columns: str):
+    """
+    Construye un INSERT que omite las filas que violan una restricción única
+
+    Usa ON CONFLICT DO NOTHING en PostgreSQL y SQLite; en otros motores
+    retorna un INSERT normal.
+    """
+    dialect = db.session.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        return insert(model)
+
+    return dialect_insert(model).on_conflict_do_nothing(
+        index_elements=list(conflict_columns)
+    )
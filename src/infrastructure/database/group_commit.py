@@ -0,0 +1,145 @@
+import os
+import threading
+import time
+from typing import List, Optional
+
+import structlog
+
+from ...application.use_cases.register_checkpoint import \
+    RegisterCheckpointUseCase
+from ...domain.value_objects.checkpoint_data import CheckpointData
+from ...domain.value_objects.tracking_id import TrackingId
+from ..monitoring.metrics import metrics
+
+logger = structlog.get_logger(__name__)
+
+
+class _PendingCheckpoint:
+    """Checkpoint de un request que espera el commit de su grupo"""
+
+    __slots__ = ("tracking_id", "checkpoint_data", "outcome", "done")
+
+    def __init__(self, tracking_id: TrackingId, checkpoint_data: CheckpointData):
+        self.tracking_id = tracking_id
+        self.checkpoint_data = checkpoint_data
+        self.outcome = None
+        self.done = False
+
+
+class GroupCommitCoordinator:
+    """
+    Agrupa en una transacción los checkpoints que llegan casi a la vez
+
+    El primer request de un grupo es su líder: espera hasta window segundos
+    (o hasta juntar max_batch_size checkpoints), registra el grupo con
+    RegisterCheckpointUseCase.execute_group en su propia sesión y entrega a
+    cada request en espera su resultado o su error. El costo del commit
+    (fsync) se paga una vez por grupo en lugar de una vez por checkpoint.
+
+    El coordinador vive en memoria de cada worker; entre workers la
+    protección sigue siendo el control de concurrencia optimista.
+    """
+
+    def __init__(
+        self,
+        register_checkpoint_use_case: RegisterCheckpointUseCase,
+        window: float = 0.002,
+        max_batch_size: int = 64,
+    ):
+        self.register_checkpoint_use_case = register_checkpoint_use_case
+        self.window = window
+        self.max_batch_size = max_batch_size
+        self._condition = threading.Condition()
+        # Grupo abierto que aún acepta checkpoints
+        self._group: Optional[List[_PendingCheckpoint]] = None
+
+    def submit(self, tracking_id: TrackingId, checkpoint_data: CheckpointData) -> dict:
+        """
+        Registra un checkpoint dentro del próximo grupo y espera su resultado
+
+        Returns:
+            dict: Información del checkpoint registrado, como
+                RegisterCheckpointUseCase.execute
+
+        Raises:
+            ValueError: Si la transición o el timestamp no son válidos
+            ConcurrentModificationError: Si se agotan los reintentos del grupo
+        """
+        pending = _PendingCheckpoint(tracking_id, checkpoint_data)
+        with self._condition:
+            group = self._group
+            is_leader = group is None
+            if is_leader:
+                group = self._group = []
+            group.append(pending)
+
+            if is_leader:
+                deadline = time.monotonic() + self.window
+                while len(group) < self.max_batch_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+                if self._group is group:
+                    self._group = None
+            else:
+                if len(group) >= self.max_batch_size:
+                    # Grupo lleno: el líder confirma sin esperar la ventana
+                    self._group = None
+                    self._condition.notify_all()
+                while not pending.done:
+                    self._condition.wait()
+
+        if is_leader:
+            self._commit(group)
+
+        if isinstance(pending.outcome, Exception):
+            raise pending.outcome
+        return pending.outcome
+
+    def _commit(self, group: List[_PendingCheckpoint]) -> None:
+        """Registra el grupo y despierta a los requests en espera"""
+        started = time.perf_counter()
+        try:
+            outcomes = self.register_checkpoint_use_case.execute_group(
+                [(pending.tracking_id, pending.checkpoint_data) for pending in group]
+            )
+        except Exception as e:
+            logger.error(
+                "Error registrando grupo de checkpoints",
+                group_size=len(group),
+                error=str(e),
+            )
+            outcomes = [e] * len(group)
+
+        metrics.record_timing(
+            "checkpoint_group_commit_ms", (time.perf_counter() - started) * 1000
+        )
+        metrics.set_gauge("checkpoint_group_size", len(group))
+
+        with self._condition:
+            for pending, outcome in zip(group, outcomes):
+                pending.outcome = outcome
+                pending.done = True
+            self._condition.notify_all()
+
+
+def create_group_commit(
+    register_checkpoint_use_case: RegisterCheckpointUseCase,
+) -> Optional[GroupCommitCoordinator]:
+    """
+    Crea el coordinador de group commit si está habilitado
+
+    CHECKPOINT_GROUP_COMMIT_WINDOW_MS es la espera máxima del líder de un
+    grupo (0, el valor por defecto, lo deshabilita) y
+    CHECKPOINT_GROUP_COMMIT_MAX_BATCH el tamaño máximo de un grupo.
+    """
+    window_ms = float(os.getenv("CHECKPOINT_GROUP_COMMIT_WINDOW_MS", "0"))
+    if window_ms <= 0:
+        return None
+
+    return GroupCommitCoordinator(
+        register_checkpoint_use_case,
+        window=window_ms / 1000,
+        max_batch_size=int(os.getenv("CHECKPOINT_GROUP_COMMIT_MAX_BATCH", "64")),
+    )
@@ -1,7 +1,8 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy import (Column, DateTime, ForeignKey, Index, Integer, String,
+                        Text)
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
@@ -16,6 +17,8 @@ class UnitModel(db.Model):
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     tracking_id = Column(String(50), unique=True, nullable=False, index=True)
     current_status = Column(String(20), nullable=False, index=True)
+    # Se incrementa en cada escritura (compare-and-swap en UnitRepositoryImpl)
+    version = Column(Integer, nullable=False, default=1, server_default="1")
     created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
     updated_at = Column(
         DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow
@@ -23,7 +26,15 @@ class UnitModel(db.Model):
 
     # Relación con checkpoints
     checkpoints = relationship(
-        "CheckpointModel", back_populates="unit", cascade="all, delete-orphan"
+        "CheckpointModel",
+        back_populates="unit",
+        cascade="all, delete-orphan",
+        order_by="CheckpointModel.timestamp",
+    )
+
+    __table_args__ = (
+        # Páginas de unidades por estado en orden de creación
+        Index("ix_units_status_created_at", "current_status", "created_at", "id"),
     )
 
 
@@ -39,12 +50,19 @@ class CheckpointModel(db.Model):
     location = Column(String(200), nullable=True)
     notes = Column(Text, nullable=True)
     operator_id = Column(String(50), nullable=True)
+    # Huella del escaneo (ver checkpoint_fingerprint); NULL en filas previas al backfill
+    fingerprint = Column(String(64), nullable=True, unique=True)
     created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
 
     # Relación con unidad
-    unit_id = Column(String(36), ForeignKey("units.id"), nullable=True)
+    unit_id = Column(String(36), ForeignKey("units.id"), nullable=True, index=True)
     unit = relationship("UnitModel", back_populates="checkpoints")
 
+    __table_args__ = (
+        # Historial paginado de una unidad (más reciente primero) y su conteo
+        Index("ix_checkpoints_tracking_timestamp", "tracking_id", "timestamp", "id"),
+    )
+
 
 class ShipmentModel(db.Model):
     """Modelo SQLAlchemy para la entidad Shipment"""
@@ -77,3 +95,18 @@ class ShipmentUnitModel(db.Model):
     # Relaciones
     shipment = relationship("ShipmentModel", back_populates="units")
     unit = relationship("UnitModel")
+
+
+class OutboxMessageModel(db.Model):
+    """Modelo SQLAlchemy para las tareas pendientes de publicar en Celery"""
+
+    __tablename__ = "outbox_messages"
+
+    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    task_name = Column(String(200), nullable=False)
+    # JSON con "args" y "kwargs" de la tarea
+    payload = Column(Text, nullable=False)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
+    sent_at = Column(DateTime, nullable=True, index=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(Text, nullable=True)
@@ -0,0 +1,132 @@
+import os
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from typing import Iterator
+
+import structlog
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from ...application.interfaces.unit_lock import UnitLock
+from ...domain.value_objects.tracking_id import TrackingId
+from ..monitoring.metrics import metrics
+from .database import db
+
+logger = structlog.get_logger(__name__)
+
+# Espacio de nombres de los advisory locks de unidades (pg_advisory_xact_lock)
+ADVISORY_LOCK_NAMESPACE = 7301
+
+
+def _lock_key(tracking_id: TrackingId) -> int:
+    """Hash estable de 32 bits del tracking ID"""
+    return zlib.crc32(str(tracking_id).encode("utf-8"))
+
+
+def _record_wait(lock_type: str, started: float, acquired: bool) -> None:
+    """Reporta el tiempo de espera por el lock de una unidad"""
+    metrics.record_timing(
+        "unit_lock_wait_ms",
+        (time.perf_counter() - started) * 1000,
+        tags={"lock": lock_type},
+    )
+    if not acquired:
+        metrics.increment_counter("unit_lock_timeouts", tags={"lock": lock_type})
+
+
+class StripedUnitLock(UnitLock):
+    """
+    Locks en memoria del proceso repartidos en franjas por tracking ID
+
+    Serializa las escrituras de una misma unidad dentro del proceso; entre
+    procesos la protección sigue siendo el control de concurrencia optimista.
+    """
+
+    def __init__(self, stripes: int = 256, timeout: float = 2.0):
+        self.timeout = timeout
+        self._locks = [threading.Lock() for _ in range(stripes)]
+
+    @contextmanager
+    def hold(self, tracking_id: TrackingId) -> Iterator[None]:
+        lock = self._locks[_lock_key(tracking_id) % len(self._locks)]
+        started = time.perf_counter()
+        acquired = lock.acquire(timeout=self.timeout)
+        _record_wait("striped", started, acquired)
+        if not acquired:
+            logger.warning(
+                "Timeout esperando lock de unidad", tracking_id=str(tracking_id)
+            )
+
+        try:
+            yield
+        finally:
+            if acquired:
+                lock.release()
+
+
+class AdvisoryUnitLock(UnitLock):
+    """
+    Advisory locks de PostgreSQL por tracking ID
+
+    Usa pg_advisory_xact_lock dentro de la transacción de la sesión, por lo
+    que el lock cubre la lectura y la escritura de la unidad y se libera al
+    confirmar o revertir. Serializa las escrituras entre procesos.
+    """
+
+    def __init__(self, timeout: float = 2.0, session=None):
+        self.timeout = timeout
+        self._session = session
+
+    @property
+    def session(self):
+        return self._session or db.session
+
+    @contextmanager
+    def hold(self, tracking_id: TrackingId) -> Iterator[None]:
+        # Rango de int4 con signo que espera pg_advisory_xact_lock(int, int)
+        key = _lock_key(tracking_id) - 2**31
+        started = time.perf_counter()
+        try:
+            self.session.execute(
+                text(f"SET LOCAL lock_timeout = '{int(self.timeout * 1000)}ms'")
+            )
+            self.session.execute(
+                text("SELECT pg_advisory_xact_lock(:namespace, :key)"),
+                {"namespace": ADVISORY_LOCK_NAMESPACE, "key": key},
+            )
+            self.session.execute(text("SET LOCAL lock_timeout = DEFAULT"))
+            acquired = True
+        except OperationalError:
+            self.session.rollback()
+            acquired = False
+            logger.warning(
+                "Timeout esperando lock de unidad", tracking_id=str(tracking_id)
+            )
+        _record_wait("advisory", started, acquired)
+
+        try:
+            yield
+        except Exception:
+            # Liberar el lock si la escritura no llegó a confirmarse
+            self.session.rollback()
+            raise
+
+
+def create_unit_lock(database_url: str) -> UnitLock:
+    """
+    Crea el lock de unidades según el motor de base de datos
+
+    UNIT_LOCK_MODE puede ser auto (advisory en PostgreSQL, striped en otro
+    caso), advisory o striped.
+    """
+    timeout = int(os.getenv("UNIT_LOCK_TIMEOUT_MS", "2000")) / 1000
+    mode = os.getenv("UNIT_LOCK_MODE", "auto")
+
+    if mode == "advisory" or (mode == "auto" and database_url.startswith("postgres")):
+        return AdvisoryUnitLock(timeout=timeout)
+
+    return StripedUnitLock(
+        stripes=int(os.getenv("UNIT_LOCK_STRIPES", "256")), timeout=timeout
+    )
@@ -0,0 +1,139 @@
+import json
+import os
+import zlib
+from typing import List, Optional, Tuple
+from uuid import uuid4
+
+import structlog
+
+from ...domain.value_objects.checkpoint_data import CheckpointData
+from ...domain.value_objects.tracking_id import TrackingId
+from ..monitoring.metrics import metrics
+from .celery_config import celery
+from .checkpoint_stream import decode_checkpoint, encode_checkpoint
+
+logger = structlog.get_logger(__name__)
+
+BATCH_KEY_PREFIX = "checkpoints:batch"
+INGEST_TASK = "src.infrastructure.external.tasks.ingest_checkpoint_batch"
+
+# Item de un lote: índice en el lote original, tracking ID y checkpoint
+BatchItem = Tuple[int, TrackingId, CheckpointData]
+
+
+class CheckpointBatchStore:
+    """
+    Lotes de checkpoints comprimidos en Redis para la ingesta asíncrona
+
+    Cada lote se guarda como JSON comprimido con zlib bajo una referencia
+    propia; la tarea de ingesta recibe solo la referencia, no el lote.
+    """
+
+    def __init__(
+        self, redis_client, ttl: int = 24 * 3600, prefix: str = BATCH_KEY_PREFIX
+    ):
+        self.redis = redis_client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    @classmethod
+    def from_env(cls) -> "CheckpointBatchStore":
+        """Crea el almacén a partir de las variables de entorno"""
+        import redis
+
+        client = redis.Redis.from_url(
+            os.getenv("REDIS_URL", "redis://localhost:6379/0")
+        )
+        return cls(client, ttl=int(os.getenv("CHECKPOINT_BATCH_TTL_SECONDS", "86400")))
+
+    def _key(self, reference: str) -> str:
+        return f"{self.prefix}:{reference}"
+
+    def put(self, items: List[BatchItem]) -> str:
+        """
+        Guarda un lote comprimido
+
+        Returns:
+            str: Referencia del lote
+        """
+        reference = uuid4().hex
+        payload = json.dumps(
+            [
+                {"index": index, **encode_checkpoint(tracking_id, checkpoint_data)}
+                for index, tracking_id, checkpoint_data in items
+            ]
+        ).encode("utf-8")
+        self.redis.set(self._key(reference), zlib.compress(payload), ex=self.ttl)
+        return reference
+
+    def get(self, reference: str) -> List[BatchItem]:
+        """
+        Carga un lote guardado
+
+        Raises:
+            ValueError: Si el lote no existe o ya expiró
+        """
+        compressed = self.redis.get(self._key(reference))
+        if compressed is None:
+            raise ValueError(f"Lote no encontrado o expirado: {reference}")
+
+        items = []
+        for fields in json.loads(zlib.decompress(compressed)):
+            tracking_id, checkpoint_data = decode_checkpoint(fields)
+            items.append((fields["index"], tracking_id, checkpoint_data))
+        return items
+
+    def delete(self, reference: str) -> None:
+        """Elimina un lote ya procesado"""
+        self.redis.delete(self._key(reference))
+
+
+class CheckpointBatchJobs:
+    """Encola lotes de checkpoints para su ingesta en Celery y consulta su avance"""
+
+    def __init__(self, store: CheckpointBatchStore, publisher=None):
+        self.store = store
+        self.publisher = publisher or celery
+
+    @classmethod
+    def from_env(cls) -> "CheckpointBatchJobs":
+        """Crea el servicio de lotes a partir de las variables de entorno"""
+        return cls(CheckpointBatchStore.from_env())
+
+    def submit(self, items: List[BatchItem]) -> str:
+        """
+        Guarda el lote y encola su ingesta
+
+        Returns:
+            str: ID del trabajo, que es también la referencia del lote
+        """
+        reference = self.store.put(items)
+        self.publisher.send_task(INGEST_TASK, args=[reference], task_id=reference)
+        metrics.increment_counter("checkpoint_batch_jobs_submitted")
+
+        logger.info("Lote de checkpoints encolado", job_id=reference, items=len(items))
+        return reference
+
+    def status(self, job_id: str) -> dict:
+        """
+        Retorna el estado y el avance de un trabajo de ingesta
+
+        Los estados son los de Celery (PENDING, STARTED, PROGRESS, SUCCESS,
+        FAILURE); PENDING también corresponde a un trabajo desconocido.
+        """
+        result = self.publisher.AsyncResult(job_id)
+        status = {"job_id": job_id, "state": result.state}
+
+        if result.state == "FAILURE":
+            status["error"] = str(result.info)
+            return status
+
+        info: Optional[dict] = result.info if isinstance(result.info, dict) else None
+        if info:
+            status["progress"] = {
+                key: info.get(key, 0)
+                for key in ("total", "processed", "succeeded", "duplicates", "failed")
+            }
+            if "errors" in info:
+                status["errors"] = info["errors"]
+        return status
@@ -32,5 +32,9 @@ celery.conf.update(
         "src.infrastructure.external.tasks.send_notification": {
             "queue": "notifications"
         },
+        # Cola propia: los lotes grandes no retrasan checkpoints y notificaciones
+        "src.infrastructure.external.tasks.ingest_checkpoint_batch": {
+            "queue": "ingestion"
+        },
     },
 )
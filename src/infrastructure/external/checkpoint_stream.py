@@ -0,0 +1,304 @@
+import os
+import time
+import zlib
+from datetime import datetime
+from typing import Callable, Dict, List, Tuple
+
+import structlog
+
+from ...application.use_cases.register_checkpoint_batch import \
+    RegisterCheckpointBatchUseCase
+from ...domain.value_objects.checkpoint_data import CheckpointData, naive_utc
+from ...domain.value_objects.tracking_id import TrackingId
+from ...domain.value_objects.unit_status import UnitStatus
+from ..monitoring.metrics import metrics
+
+logger = structlog.get_logger(__name__)
+
+STREAM_PREFIX = "checkpoints:ingest"
+GROUP_NAME = "checkpoint-writers"
+OPTIONAL_FIELDS = ("location", "notes", "operator_id")
+
+
+def encode_checkpoint(tracking_id: TrackingId, checkpoint_data: CheckpointData) -> dict:
+    """
+    Serializa un checkpoint a un diccionario plano de strings
+
+    El timestamp se guarda en UTC sin zona, para que los checkpoints
+    decodificados puedan compararse y ordenarse entre sí.
+    """
+    fields = {
+        "tracking_id": str(tracking_id),
+        "status": checkpoint_data.status.value,
+        "timestamp": naive_utc(checkpoint_data.timestamp).isoformat(),
+    }
+    for name in OPTIONAL_FIELDS:
+        value = getattr(checkpoint_data, name)
+        if value is not None:
+            fields[name] = value
+    return fields
+
+
+def decode_checkpoint(fields: dict) -> Tuple[TrackingId, CheckpointData]:
+    """Reconstruye un checkpoint desde su diccionario plano"""
+    try:
+        return TrackingId(fields["tracking_id"]), CheckpointData(
+            status=UnitStatus(fields["status"]),
+            timestamp=datetime.fromisoformat(fields["timestamp"]),
+            **{name: fields.get(name) for name in OPTIONAL_FIELDS},
+        )
+    except KeyError as e:
+        raise ValueError(f"Campo requerido ausente en la entrada: {e}")
+
+
+class CheckpointStream:
+    """
+    Buffer de ingesta de checkpoints sobre Redis Streams
+
+    Los checkpoints se particionan por tracking ID en varios streams, de modo
+    que todos los checkpoints de una unidad quedan en el mismo stream y se
+    consumen en el orden en que fueron recibidos.
+    """
+
+    def __init__(
+        self,
+        redis_client,
+        partitions: int = 8,
+        prefix: str = STREAM_PREFIX,
+        group: str = GROUP_NAME,
+    ):
+        self.redis = redis_client
+        self.partitions = partitions
+        self.prefix = prefix
+        self.group = group
+
+    @classmethod
+    def from_env(cls) -> "CheckpointStream":
+        """Crea el stream a partir de las variables de entorno"""
+        import redis
+
+        client = redis.Redis.from_url(
+            os.getenv("REDIS_URL", "redis://localhost:6379/0"),
+            decode_responses=True,
+        )
+        return cls(
+            client, partitions=int(os.getenv("CHECKPOINT_STREAM_PARTITIONS", "8"))
+        )
+
+    def partition_for(self, tracking_id: TrackingId) -> int:
+        """Retorna la partición estable de un tracking ID"""
+        return zlib.crc32(str(tracking_id).encode("utf-8")) % self.partitions
+
+    def stream_name(self, partition: int) -> str:
+        """Retorna el nombre del stream de una partición"""
+        return f"{self.prefix}:{partition}"
+
+    def partitions_for_worker(self, worker_index: int, workers: int) -> List[int]:
+        """Retorna las particiones asignadas a un worker"""
+        return [p for p in range(self.partitions) if p % workers == worker_index]
+
+    def ensure_groups(self) -> None:
+        """Crea el consumer group en cada partición si no existe"""
+        import redis
+
+        for partition in range(self.partitions):
+            try:
+                self.redis.xgroup_create(
+                    self.stream_name(partition), self.group, id="0", mkstream=True
+                )
+            except redis.ResponseError as e:
+                if "BUSYGROUP" not in str(e):
+                    raise
+
+    def publish(self, tracking_id: TrackingId, checkpoint_data: CheckpointData) -> str:
+        """
+        Agrega un checkpoint al stream de su partición
+
+        Returns:
+            str: Recibo del checkpoint en formato "<partición>:<entry id>"
+        """
+        partition = self.partition_for(tracking_id)
+        entry_id = self.redis.xadd(
+            self.stream_name(partition), self.encode(tracking_id, checkpoint_data)
+        )
+        metrics.increment_counter("checkpoint_stream_published")
+        return f"{partition}:{entry_id}"
+
+    def encode(self, tracking_id: TrackingId, checkpoint_data: CheckpointData) -> dict:
+        """Serializa un checkpoint a los campos de una entrada del stream"""
+        return encode_checkpoint(tracking_id, checkpoint_data)
+
+    def decode(self, fields: dict) -> Tuple[TrackingId, CheckpointData]:
+        """Reconstruye un checkpoint desde una entrada del stream"""
+        return decode_checkpoint(fields)
+
+
+class CheckpointStreamConsumer:
+    """
+    Consumidor del buffer de ingesta de checkpoints
+
+    Drena las particiones asignadas por lotes, aplica la máquina de estados
+    de Unit a través de RegisterCheckpointBatchUseCase y confirma (XACK) las
+    entradas solo después de persistirlas, lo que da semántica at-least-once.
+    Cada partición debe tener un único consumidor activo para conservar el
+    orden por tracking ID.
+    """
+
+    def __init__(
+        self,
+        stream: CheckpointStream,
+        batch_use_case: RegisterCheckpointBatchUseCase,
+        consumer_name: str,
+        partitions: List[int],
+        batch_size: int = 500,
+        block_ms: int = 1000,
+        claim_idle_ms: int = 60000,
+    ):
+        self.stream = stream
+        self.redis = stream.redis
+        self.batch_use_case = batch_use_case
+        self.consumer_name = consumer_name
+        self.partitions = partitions
+        self.batch_size = batch_size
+        self.block_ms = block_ms
+        self.claim_idle_ms = claim_idle_ms
+        self.last_failed = 0
+
+    def drain_once(self) -> int:
+        """
+        Procesa un lote de cada partición asignada
+
+        Primero se reintentan las entradas pendientes (propias o abandonadas
+        por otro consumidor) y solo después se leen entradas nuevas, de modo
+        que un reintento nunca queda detrás de un checkpoint posterior.
+
+        Returns:
+            int: Número de entradas confirmadas
+        """
+        batches = {}
+        for partition in self.partitions:
+            entries = self._recover(self.stream.stream_name(partition))
+            if entries:
+                batches[self.stream.stream_name(partition)] = entries
+
+        if not batches:
+            response = self.redis.xreadgroup(
+                self.stream.group,
+                self.consumer_name,
+                {self.stream.stream_name(p): ">" for p in self.partitions},
+                count=self.batch_size,
+                block=self.block_ms,
+            )
+            for stream_name, entries in response or []:
+                if entries:
+                    batches[stream_name] = entries
+
+        self.last_failed = 0
+        acknowledged = 0
+        for stream_name, entries in batches.items():
+            acknowledged += self._process(stream_name, entries)
+
+        self.report_lag()
+        return acknowledged
+
+    def run(self, should_stop: Callable[[], bool] = lambda: False) -> None:
+        """Drena el buffer hasta que should_stop retorne True"""
+        self.stream.ensure_groups()
+        logger.info(
+            "Consumidor de checkpoints iniciado",
+            consumer=self.consumer_name,
+            partitions=self.partitions,
+        )
+        while not should_stop():
+            self.drain_once()
+            if self.last_failed:
+                # Esperar antes de reintentar entradas que fallaron al persistir
+                time.sleep(1)
+
+    def report_lag(self) -> Dict[int, int]:
+        """Publica el lag (entradas aún no entregadas) de cada partición"""
+        lags = {}
+        for partition in self.partitions:
+            stream_name = self.stream.stream_name(partition)
+            pending = self.redis.xpending(stream_name, self.stream.group)["pending"]
+            lags[partition] = max(self.redis.xlen(stream_name) - pending, 0)
+            metrics.set_gauge(
+                "checkpoint_stream_lag", lags[partition], tags={"partition": partition}
+            )
+            metrics.set_gauge(
+                "checkpoint_stream_pending", pending, tags={"partition": partition}
+            )
+        return lags
+
+    def _recover(self, stream_name: str) -> List[Tuple[str, dict]]:
+        """Obtiene entradas entregadas pero no confirmadas de una partición"""
+        response = self.redis.xreadgroup(
+            self.stream.group,
+            self.consumer_name,
+            {stream_name: "0"},
+            count=self.batch_size,
+        )
+        entries = [
+            entry for _, stream_entries in response or [] for entry in stream_entries
+        ]
+        if entries:
+            return entries
+
+        # Entradas abandonadas por un consumidor caído
+        claimed = self.redis.xautoclaim(
+            stream_name,
+            self.stream.group,
+            self.consumer_name,
+            min_idle_time=self.claim_idle_ms,
+            start_id="0-0",
+            count=self.batch_size,
+        )
+        return claimed[1]
+
+    def _process(self, stream_name: str, entries: List[Tuple[str, dict]]) -> int:
+        """Persiste un lote de entradas y confirma las que no deben reintentarse"""
+        items = []
+        item_ids = []
+        done_ids = []
+        for entry_id, fields in entries:
+            try:
+                items.append(self.stream.decode(fields))
+                item_ids.append(entry_id)
+            except ValueError as e:
+                # Una entrada inválida nunca podrá procesarse: se descarta
+                logger.error(
+                    "Entrada inválida en el stream de checkpoints",
+                    stream=stream_name,
+                    entry_id=entry_id,
+                    error=str(e),
+                )
+                metrics.increment_counter("checkpoint_stream_rejected")
+                done_ids.append(entry_id)
+
+        results = self.batch_use_case.execute(items)["results"] if items else []
+        for entry_id, result in zip(item_ids, results):
+            if result["status"] in ("success", "duplicate"):
+                # Un duplicado ya está registrado: no hay nada que reintentar
+                done_ids.append(entry_id)
+            elif result["error"] == "internal_error":
+                # Queda pendiente para reintentarse en la siguiente iteración
+                self.last_failed += 1
+            else:
+                logger.warning(
+                    "Checkpoint del stream rechazado",
+                    stream=stream_name,
+                    entry_id=entry_id,
+                    tracking_id=result["tracking_id"],
+                    error=result["message"],
+                )
+                metrics.increment_counter("checkpoint_stream_rejected")
+                done_ids.append(entry_id)
+
+        if done_ids:
+            self.redis.xack(stream_name, self.stream.group, *done_ids)
+            self.redis.xdel(stream_name, *done_ids)
+            metrics.increment_counter(
+                "checkpoint_stream_processed", value=len(done_ids)
+            )
+
+        return len(done_ids)
@@ -0,0 +1,164 @@
+import json
+import time
+from datetime import datetime, timedelta
+from typing import Callable, List
+from uuid import uuid4
+
+import structlog
+
+from ...domain.value_objects.checkpoint_data import CheckpointData
+from ...domain.value_objects.tracking_id import TrackingId
+from ...domain.value_objects.unit_status import UnitStatus
+from ..database.database import db
+from ..database.models import OutboxMessageModel
+from ..monitoring.metrics import metrics
+from .celery_config import celery
+
+logger = structlog.get_logger(__name__)
+
+PROCESS_CHECKPOINT_TASK = "src.infrastructure.external.tasks.process_checkpoint"
+SEND_NOTIFICATION_TASK = "src.infrastructure.external.tasks.send_notification"
+
+# Estados que notifican al cliente
+NOTIFIABLE_STATUSES = (UnitStatus.DELIVERED, UnitStatus.EXCEPTION)
+
+
+def _message(task_name: str, args: list, now: datetime) -> dict:
+    return {
+        "id": str(uuid4()),
+        "task_name": task_name,
+        "payload": json.dumps({"args": args, "kwargs": {}}),
+        "created_at": now,
+        "attempts": 0,
+    }
+
+
+def checkpoint_outbox_rows(
+    tracking_id: TrackingId, checkpoints: List[CheckpointData]
+) -> List[dict]:
+    """
+    Construye las filas de outbox de las tareas asíncronas de cada checkpoint
+
+    Se escriben en la misma transacción que los checkpoints; el relay las
+    publica en Celery después del commit.
+    """
+    now = datetime.utcnow()
+    rows = []
+    for checkpoint_data in checkpoints:
+        rows.append(
+            _message(
+                PROCESS_CHECKPOINT_TASK,
+                [str(tracking_id), checkpoint_data.to_dict()],
+                now,
+            )
+        )
+        if checkpoint_data.status in NOTIFIABLE_STATUSES:
+            rows.append(
+                _message(
+                    SEND_NOTIFICATION_TASK,
+                    [
+                        str(tracking_id),
+                        checkpoint_data.status.value,
+                        "customer@example.com",  # En producción esto vendría de la base de datos
+                    ],
+                    now,
+                )
+            )
+    return rows
+
+
+class OutboxRelay:
+    """
+    Publica en Celery las tareas registradas en la tabla outbox
+
+    Toma los mensajes pendientes por lotes (con SKIP LOCKED en PostgreSQL,
+    para permitir varios relays) y los marca como enviados. La entrega es
+    at-least-once: las tareas deben tolerar duplicados.
+    """
+
+    def __init__(self, batch_size: int = 100, publisher=None):
+        self.batch_size = batch_size
+        self.publisher = publisher or celery
+
+    def relay_once(self) -> int:
+        """
+        Publica un lote de mensajes pendientes
+
+        Returns:
+            int: Número de mensajes publicados
+        """
+        messages = (
+            db.session.query(OutboxMessageModel)
+            .filter(OutboxMessageModel.sent_at.is_(None))
+            .order_by(OutboxMessageModel.created_at)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+            .all()
+        )
+
+        published = 0
+        for message in messages:
+            payload = json.loads(message.payload)
+            try:
+                self.publisher.send_task(
+                    message.task_name, args=payload["args"], kwargs=payload["kwargs"]
+                )
+            except Exception as e:
+                # Broker no disponible: se reintenta el lote en la siguiente vuelta
+                message.attempts += 1
+                message.last_error = str(e)
+                logger.error(
+                    "Error publicando mensaje del outbox",
+                    message_id=message.id,
+                    task_name=message.task_name,
+                    error=str(e),
+                )
+                break
+
+            message.sent_at = datetime.utcnow()
+            message.attempts += 1
+            published += 1
+
+        db.session.commit()
+
+        if published:
+            metrics.increment_counter("outbox_published", value=published)
+        metrics.set_gauge("outbox_backlog", self.backlog())
+        return published
+
+    def backlog(self) -> int:
+        """Cuenta los mensajes pendientes de publicar"""
+        return (
+            db.session.query(OutboxMessageModel)
+            .filter(OutboxMessageModel.sent_at.is_(None))
+            .count()
+        )
+
+    def purge_sent(self, older_than: timedelta = timedelta(days=7)) -> int:
+        """Elimina los mensajes ya publicados más antiguos que older_than"""
+        deleted = (
+            db.session.query(OutboxMessageModel)
+            .filter(OutboxMessageModel.sent_at < datetime.utcnow() - older_than)
+            .delete(synchronize_session=False)
+        )
+        db.session.commit()
+        return deleted
+
+    def run(
+        self,
+        poll_interval: float = 1.0,
+        should_stop: Callable[[], bool] = lambda: False,
+    ) -> None:
+        """Publica mensajes hasta que should_stop retorne True"""
+        logger.info("Relay del outbox iniciado", batch_size=self.batch_size)
+        while not should_stop():
+            try:
+                published = self.relay_once()
+            except Exception as e:
+                db.session.rollback()
+                logger.error("Error en el relay del outbox", error=str(e))
+                published = 0
+
+            # Con un lote completo se continúa sin esperar
+            if published < self.batch_size:
+                time.sleep(poll_interval)
@@ -1,10 +1,37 @@
+import os
+from contextlib import nullcontext
+from datetime import timedelta
+
 import structlog
 from celery import current_task
+from flask import Flask, has_app_context
 
+from ..database.database import init_database
 from ..external.celery_config import celery
 
 logger = structlog.get_logger(__name__)
 
+_worker_app = None
+
+
+def database_context():
+    """
+    Retorna un contexto de aplicación con la base de datos inicializada
+
+    El worker de Celery no crea la aplicación Flask, por lo que las tareas
+    que acceden a la base de datos usan una aplicación mínima propia.
+    """
+    global _worker_app
+
+    if has_app_context():
+        return nullcontext()
+
+    if _worker_app is None:
+        _worker_app = Flask("tracking_worker")
+        init_database(_worker_app)
+
+    return _worker_app.app_context()
+
 
 @celery.task(bind=True, name="src.infrastructure.external.tasks.process_checkpoint")
 def process_checkpoint(self, tracking_id: str, checkpoint_data: dict):
@@ -118,11 +145,140 @@ def cleanup_old_data():
         # - Eliminar checkpoints muy antiguos
         # - Archivar unidades entregadas
         # - Limpiar logs antiguos
+        from .outbox import OutboxRelay
+
+        with database_context():
+            purged = OutboxRelay().purge_sent()
 
-        logger.info("Limpieza de datos completada")
+        logger.info("Limpieza de datos completada", outbox_purged=purged)
 
-        return {"status": "completed"}
+        return {"status": "completed", "outbox_purged": purged}
 
     except Exception as exc:
         logger.error("Error en limpieza de datos", error=str(exc))
         raise
+
+
+@celery.task(name="src.infrastructure.external.tasks.deduplicate_checkpoints")
+def deduplicate_checkpoints(chunk_size: int = 1000):
+    """
+    Tarea de backfill de huellas que elimina checkpoints duplicados
+
+    Procesa por bloques los checkpoints sin huella, cada bloque en su propia
+    transacción, hasta que no queden filas pendientes.
+
+    Args:
+        chunk_size: Número de checkpoints por bloque
+    """
+    from ..repositories.checkpoint_repository_impl import \
+        CheckpointRepositoryImpl
+
+    totals = {"processed": 0, "updated": 0, "deleted": 0}
+    try:
+        logger.info("Iniciando backfill de huellas de checkpoints")
+
+        with database_context():
+            repository = CheckpointRepositoryImpl()
+            while True:
+                chunk = repository.backfill_fingerprints(chunk_size)
+                if not chunk["processed"]:
+                    break
+
+                for key in totals:
+                    totals[key] += chunk[key]
+                logger.info("Bloque de huellas procesado", **chunk)
+
+        logger.info("Backfill de huellas completado", **totals)
+
+        return {"status": "completed", **totals}
+
+    except Exception as exc:
+        logger.error("Error en backfill de huellas", error=str(exc), **totals)
+        raise
+
+
+@celery.task(
+    bind=True, name="src.infrastructure.external.tasks.ingest_checkpoint_batch"
+)
+def ingest_checkpoint_batch(self, batch_reference: str, chunk_size: int = 500):
+    """
+    Tarea de ingesta asíncrona de un lote de checkpoints
+
+    Carga el lote comprimido guardado en Redis y lo registra por bloques
+    con RegisterCheckpointBatchUseCase (inserts masivos, un bloque de
+    unidades por transacción). Los checkpoints se aplican en orden
+    cronológico para que los de una unidad no dependan del bloque en que
+    caen. Tras cada bloque publica el avance en el estado PROGRESS, que el
+    escáner consulta por el ID del trabajo.
+
+    Args:
+        batch_reference: Referencia del lote en CheckpointBatchStore
+        chunk_size: Número de checkpoints por bloque
+    """
+    from ...application.use_cases.register_checkpoint_batch import \
+        RegisterCheckpointBatchUseCase
+    from ..repositories.unit_repository_impl import UnitRepositoryImpl
+    from .batch_jobs import CheckpointBatchStore
+    from .tracking_cache import create_tracking_history_cache
+
+    store = CheckpointBatchStore.from_env()
+    progress = {
+        "total": 0,
+        "processed": 0,
+        "succeeded": 0,
+        "duplicates": 0,
+        "failed": 0,
+    }
+    try:
+        items = store.get(batch_reference)
+        items.sort(key=lambda item: item[2].timestamp)
+        progress["total"] = len(items)
+        logger.info(
+            "Iniciando ingesta de lote de checkpoints",
+            batch_reference=batch_reference,
+            total=len(items),
+            task_id=self.request.id,
+        )
+
+        errors = []
+        with database_context():
+            use_case = RegisterCheckpointBatchUseCase(
+                UnitRepositoryImpl(),
+                reorder_window=timedelta(
+                    seconds=int(os.getenv("CHECKPOINT_REORDER_WINDOW_SECONDS", "0"))
+                ),
+                history_cache=create_tracking_history_cache(),
+            )
+            for start in range(0, len(items), chunk_size):
+                chunk = items[start : start + chunk_size]
+                result = use_case.execute(
+                    [(tracking_id, data) for _, tracking_id, data in chunk]
+                )
+                for (index, _, _), item_result in zip(chunk, result["results"]):
+                    if item_result["status"] == "error":
+                        errors.append({**item_result, "index": index})
+
+                progress["processed"] += len(chunk)
+                for key in ("succeeded", "duplicates", "failed"):
+                    progress[key] += result["summary"][key]
+                self.update_state(state="PROGRESS", meta=dict(progress))
+
+        store.delete(batch_reference)
+        logger.info(
+            "Lote de checkpoints ingerido",
+            batch_reference=batch_reference,
+            task_id=self.request.id,
+            **progress,
+        )
+
+        return {"status": "completed", **progress, "errors": errors}
+
+    except Exception as exc:
+        logger.error(
+            "Error en ingesta de lote de checkpoints",
+            batch_reference=batch_reference,
+            error=str(exc),
+            task_id=self.request.id,
+            **progress,
+        )
+        raise
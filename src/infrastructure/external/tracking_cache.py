@@ -0,0 +1,153 @@
+import json
+import os
+import time
+from typing import Iterable, Optional, Tuple
+
+import structlog
+
+from ...application.interfaces.tracking_history_cache import \
+    TrackingHistoryCache
+from ...domain.value_objects.tracking_id import TrackingId
+from ..monitoring.metrics import metrics
+
+logger = structlog.get_logger(__name__)
+
+CACHE_KEY_PREFIX = "tracking:history"
+
+
+class RedisTrackingHistoryCache(TrackingHistoryCache):
+    """
+    Caché read-through del historial de tracking en Redis
+
+    Cada unidad tiene una clave de versión; las respuestas se guardan bajo
+    <prefix>:<tracking_id>:<versión>:<variante>. Invalidar una unidad es
+    reemplazar su versión por una nueva (un solo SET, sin buscar variantes):
+    las respuestas de la versión anterior dejan de leerse y expiran por TTL.
+    Las versiones son únicas y duran al menos el TTL de las respuestas, por
+    lo que al expirar una versión no quedan respuestas anteriores a ella.
+
+    Un miss guarda su resultado bajo la versión leída antes de consultar la
+    base de datos: si una escritura invalida la unidad mientras tanto, la
+    respuesta queda bajo la versión anterior y no se sirve.
+
+    Los errores de Redis no fallan el request: una lectura fallida es un
+    miss y una escritura fallida se omite.
+    """
+
+    def __init__(
+        self,
+        redis_client,
+        ttl: int = 60,
+        final_ttl: int = 3600,
+        prefix: str = CACHE_KEY_PREFIX,
+    ):
+        self.redis = redis_client
+        # TTL de las unidades en curso y de las unidades en estado final
+        self.ttl = ttl
+        self.final_ttl = final_ttl
+        self.prefix = prefix
+
+    @classmethod
+    def from_env(cls, ttl: int) -> "RedisTrackingHistoryCache":
+        """Crea la caché a partir de las variables de entorno"""
+        import redis
+
+        client = redis.Redis.from_url(
+            os.getenv("REDIS_URL", "redis://localhost:6379/0"),
+            decode_responses=True,
+        )
+        return cls(
+            client,
+            ttl=ttl,
+            final_ttl=int(os.getenv("TRACKING_CACHE_FINAL_TTL_SECONDS", "3600")),
+        )
+
+    def _version_key(self, tracking_id: TrackingId) -> str:
+        return f"{self.prefix}:{tracking_id}:version"
+
+    def _entry_key(self, tracking_id: TrackingId, variant: str, version: str) -> str:
+        return f"{self.prefix}:{tracking_id}:{version}:{variant}"
+
+    def get(
+        self, tracking_id: TrackingId, variant: str
+    ) -> Tuple[Optional[dict], Optional[str]]:
+        """Retorna el historial guardado o None (miss) y la versión leída"""
+        try:
+            version = self.redis.get(self._version_key(tracking_id)) or "0"
+            cached = self.redis.get(self._entry_key(tracking_id, variant, version))
+        except Exception as e:
+            logger.warning(
+                "Error leyendo la caché de historial",
+                tracking_id=str(tracking_id),
+                error=str(e),
+            )
+            metrics.increment_counter("tracking_cache_errors")
+            return None, None
+
+        if cached is None:
+            metrics.increment_counter("tracking_cache_misses")
+            return None, version
+
+        metrics.increment_counter("tracking_cache_hits")
+        return json.loads(cached), version
+
+    def set(
+        self,
+        tracking_id: TrackingId,
+        variant: str,
+        history: dict,
+        version: Optional[str],
+        final: bool = False,
+    ) -> None:
+        """Guarda el historial serializado con el TTL que corresponde"""
+        # Sin versión leída no hay forma de saber si el resultado está vigente
+        if version is None:
+            return
+
+        try:
+            self.redis.set(
+                self._entry_key(tracking_id, variant, version),
+                json.dumps(history),
+                ex=self.final_ttl if final else self.ttl,
+            )
+        except Exception as e:
+            logger.warning(
+                "Error escribiendo la caché de historial",
+                tracking_id=str(tracking_id),
+                error=str(e),
+            )
+            metrics.increment_counter("tracking_cache_errors")
+
+    def invalidate(self, tracking_ids: Iterable[TrackingId]) -> None:
+        """Reemplaza la versión de cada unidad por una nueva"""
+        version_ttl = max(self.ttl, self.final_ttl)
+        for tracking_id in tracking_ids:
+            try:
+                self.redis.set(
+                    self._version_key(tracking_id),
+                    str(time.time_ns()),
+                    ex=version_ttl,
+                )
+                metrics.increment_counter("tracking_cache_invalidations")
+            except Exception as e:
+                logger.warning(
+                    "Error invalidando la caché de historial",
+                    tracking_id=str(tracking_id),
+                    error=str(e),
+                )
+                metrics.increment_counter("tracking_cache_errors")
+
+
+def create_tracking_history_cache() -> Optional[RedisTrackingHistoryCache]:
+    """
+    Crea la caché del historial de tracking si está habilitada
+
+    TRACKING_CACHE_TTL_SECONDS es el TTL de las respuestas de unidades en
+    curso (0, el valor por defecto, deshabilita la caché) y
+    TRACKING_CACHE_FINAL_TTL_SECONDS el de las unidades entregadas.
+    """
+    ttl = int(os.getenv("TRACKING_CACHE_TTL_SECONDS", "0"))
+    if ttl <= 0:
+        return None
+
+    return RedisTrackingHistoryCache.from_env(ttl)
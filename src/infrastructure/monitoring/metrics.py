@@ -2,7 +2,9 @@ import time
 from functools import wraps
 
 import structlog
-from flask import g, request
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
 
 logger = structlog.get_logger(__name__)
 
@@ -13,6 +15,7 @@ class SimpleMetrics:
     def __init__(self):
         self.counters = {}
         self.timers = {}
+        self.gauges = {}
 
     def increment_counter(self, name: str, value: int = 1, tags: dict = None):
         """Incrementa un contador"""
@@ -46,6 +49,13 @@ class SimpleMetrics:
             tags=tags or {},
         )
 
+    def set_gauge(self, name: str, value: float, tags: dict = None):
+        """Registra el valor actual de una métrica"""
+        key = self._build_key(name, tags)
+        self.gauges[key] = value
+
+        logger.info("metric_gauge", name=name, value=value, tags=tags or {})
+
     def _build_key(self, name: str, tags: dict = None) -> str:
         """Construye una clave única para la métrica"""
         if not tags:
@@ -59,6 +69,11 @@ class SimpleMetrics:
         key = self._build_key(name, tags)
         return self.counters.get(key, 0)
 
+    def get_gauge(self, name: str, tags: dict = None) -> float:
+        """Obtiene el valor actual de una métrica"""
+        key = self._build_key(name, tags)
+        return self.gauges.get(key, 0)
+
     def get_avg_timing(self, name: str, tags: dict = None) -> float:
         """Obtiene el tiempo promedio"""
         key = self._build_key(name, tags)
@@ -163,3 +178,30 @@ def track_business_metrics(metric_name: str, tags: dict = None):
         return decorated_function
 
     return decorator
+
+
+def _count_query(*args, **kwargs):
+    """Cuenta una consulta SQL ejecutada dentro del request actual"""
+    if has_request_context():
+        g.db_query_count = g.get("db_query_count", 0) + 1
+
+
+def init_query_metrics(app):
+    """Expone el número de consultas SQL ejecutadas por cada request"""
+    if not event.contains(Engine, "before_cursor_execute", _count_query):
+        event.listen(Engine, "before_cursor_execute", _count_query)
+
+    @app.before_request
+    def reset_query_count():
+        g.db_query_count = 0
+
+    @app.after_request
+    def report_query_count(response):
+        query_count = g.get("db_query_count", 0)
+        response.headers["X-DB-Query-Count"] = str(query_count)
+        metrics.increment_counter(
+            "db_queries_total",
+            value=query_count,
+            tags={"endpoint": request.endpoint or request.path},
+        )
+        return response
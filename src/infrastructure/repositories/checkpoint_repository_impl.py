@@ -1,11 +1,16 @@
-from typing import List, Optional
+from datetime import datetime
+from typing import Collection, List, Optional, Tuple
 
-from sqlalchemy import desc
+from sqlalchemy import desc, func, tuple_
 
 from ...domain.entities.checkpoint import Checkpoint
+from ...domain.read_models.checkpoint_view import (CHECKPOINT_VIEW_FIELDS,
+                                                   CheckpointView)
 from ...domain.repositories.checkpoint_repository import CheckpointRepository
-from ...domain.value_objects.checkpoint_data import CheckpointData
+from ...domain.value_objects.checkpoint_data import (CheckpointData,
+                                                     checkpoint_fingerprint)
 from ...domain.value_objects.tracking_id import TrackingId
+from ...domain.value_objects.unit_status import UnitStatus
 from ..database.database import db
 from ..database.models import CheckpointModel
 
@@ -47,6 +52,7 @@ class CheckpointRepositoryImpl(CheckpointRepository):
             location=entity.checkpoint_data.location,
             notes=entity.checkpoint_data.notes,
             operator_id=entity.checkpoint_data.operator_id,
+            fingerprint=entity.checkpoint_data.fingerprint(entity.tracking_id),
         )
 
     def save(self, checkpoint: Checkpoint) -> Checkpoint:
@@ -77,6 +83,52 @@ class CheckpointRepositoryImpl(CheckpointRepository):
 
         return [self._model_to_entity(model) for model in models]
 
+    def find_views_by_tracking_id(
+        self,
+        tracking_id: TrackingId,
+        fields: Optional[Collection[str]] = None,
+        limit: Optional[int] = None,
+        before: Optional[Tuple[datetime, str]] = None,
+        newest_first: bool = False,
+    ) -> List[CheckpointView]:
+        """
+        Busca los checkpoints de una unidad como proyecciones
+
+        Lee solo las columnas de los campos solicitados, más la clave de orden
+        (timestamp, id), sobre el índice ix_checkpoints_tracking_timestamp.
+        Con before solo retorna los checkpoints anteriores a esa clave, por
+        lo que las páginas del más reciente al más antiguo se leen por keyset.
+        """
+        fields = set(CHECKPOINT_VIEW_FIELDS if fields is None else fields)
+        fields.update(("id", "timestamp"))
+        columns = [
+            getattr(CheckpointModel, name)
+            for name in CHECKPOINT_VIEW_FIELDS
+            if name in fields
+        ]
+        key = tuple_(CheckpointModel.timestamp, CheckpointModel.id)
+        query = self.db.session.query(*columns).filter(
+            CheckpointModel.tracking_id == str(tracking_id)
+        )
+        if before is not None:
+            query = query.filter(key < tuple_(*before))
+        if newest_first:
+            query = query.order_by(
+                desc(CheckpointModel.timestamp), desc(CheckpointModel.id)
+            )
+        else:
+            query = query.order_by(CheckpointModel.timestamp, CheckpointModel.id)
+        if limit is not None:
+            query = query.limit(limit)
+
+        views = []
+        for row in query:
+            values = row._asdict()
+            if "status" in values:
+                values["status"] = UnitStatus(values["status"])
+            views.append(CheckpointView(**values))
+        return views
+
     def find_by_id(self, checkpoint_id: str) -> Optional[Checkpoint]:
         """Busca un checkpoint por su ID"""
         model = (
@@ -108,12 +160,75 @@ class CheckpointRepositoryImpl(CheckpointRepository):
 
     def count_by_tracking_id(self, tracking_id: TrackingId) -> int:
         """Cuenta el número de checkpoints de una unidad"""
+        # COUNT sobre el índice del historial, sin leer las filas
         return (
-            self.db.session.query(CheckpointModel)
-            .filter_by(tracking_id=str(tracking_id))
-            .count()
+            self.db.session.query(func.count())
+            .select_from(CheckpointModel)
+            .filter(CheckpointModel.tracking_id == str(tracking_id))
+            .scalar()
         )
 
+    def backfill_fingerprints(self, chunk_size: int = 1000) -> dict:
+        """
+        Calcula la huella de un bloque de checkpoints previos a la columna
+
+        Por cada escaneo repetido se conserva la fila más antigua y se
+        eliminan las demás. Antes del backfill cada escaneo se escribía dos
+        veces, una fila de la unidad y otra huérfana (unit_id NULL): si la
+        fila conservada es huérfana, toma el unit_id de la eliminada para que
+        el historial de la unidad no pierda el escaneo. Cada bloque se
+        confirma en su propia transacción; se debe invocar hasta que retorne
+        processed == 0.
+
+        Returns:
+            dict: Filas procesadas, actualizadas y eliminadas en el bloque
+        """
+        try:
+            models = (
+                self.db.session.query(CheckpointModel)
+                .filter(CheckpointModel.fingerprint.is_(None))
+                .order_by(CheckpointModel.created_at, CheckpointModel.id)
+                .limit(chunk_size)
+                .all()
+            )
+
+            fingerprints = {
+                model.id: checkpoint_fingerprint(
+                    model.tracking_id,
+                    model.status,
+                    model.timestamp,
+                    model.location,
+                    model.operator_id,
+                )
+                for model in models
+            }
+            kept = {
+                model.fingerprint: model
+                for model in self.db.session.query(CheckpointModel).filter(
+                    CheckpointModel.fingerprint.in_(set(fingerprints.values()))
+                )
+            }
+
+            updated = deleted = 0
+            for model in models:
+                fingerprint = fingerprints[model.id]
+                if fingerprint in kept:
+                    if kept[fingerprint].unit_id is None:
+                        kept[fingerprint].unit_id = model.unit_id
+                    self.db.session.delete(model)
+                    deleted += 1
+                else:
+                    model.fingerprint = fingerprint
+                    kept[fingerprint] = model
+                    updated += 1
+
+            self.db.session.commit()
+        except Exception as e:
+            self.db.session.rollback()
+            raise e
+
+        return {"processed": len(models), "updated": updated, "deleted": deleted}
+
     def delete(self, checkpoint_id: str) -> bool:
         """Elimina un checkpoint del repositorio"""
         with self.db.session.begin():
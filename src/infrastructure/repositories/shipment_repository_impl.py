@@ -0,0 +1,134 @@
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import insert
+from sqlalchemy.orm import selectinload
+
+from ...domain.entities.shipment import Shipment
+from ...domain.repositories.shipment_repository import ShipmentRepository
+from ...domain.value_objects.tracking_id import TrackingId
+from ..database.database import db
+from ..database.models import ShipmentModel, ShipmentUnitModel
+
+
+class ShipmentRepositoryImpl(ShipmentRepository):
+    """Implementación del repositorio de Shipment usando SQLAlchemy"""
+
+    def __init__(self):
+        self.db = db
+
+    def _model_to_entity(self, model: ShipmentModel) -> Shipment:
+        """Convierte un modelo SQLAlchemy a entidad de dominio"""
+        return Shipment(
+            id=model.id,
+            tracking_id=TrackingId(model.tracking_id),
+            units=[link.unit_id for link in model.units],
+            created_at=model.created_at,
+            updated_at=model.updated_at,
+        )
+
+    def save(self, shipment: Shipment) -> Shipment:
+        """
+        Guarda un envío y reemplaza sus unidades asociadas
+
+        Las asociaciones con unidades se escriben con un DELETE y un INSERT
+        masivo, sin cargar las filas existentes.
+        """
+        try:
+            model = self.db.session.get(ShipmentModel, shipment.id)
+            if model:
+                model.tracking_id = str(shipment.tracking_id)
+                model.updated_at = shipment.updated_at
+                self.db.session.query(ShipmentUnitModel).filter_by(
+                    shipment_id=shipment.id
+                ).delete(synchronize_session=False)
+            else:
+                self.db.session.add(
+                    ShipmentModel(
+                        id=shipment.id,
+                        tracking_id=str(shipment.tracking_id),
+                        created_at=shipment.created_at,
+                        updated_at=shipment.updated_at,
+                    )
+                )
+                self.db.session.flush()
+
+            if shipment.units:
+                now = datetime.utcnow()
+                self.db.session.execute(
+                    insert(ShipmentUnitModel),
+                    [
+                        {
+                            "shipment_id": shipment.id,
+                            "unit_id": unit_id,
+                            "created_at": now,
+                        }
+                        for unit_id in shipment.units
+                    ],
+                )
+
+            self.db.session.commit()
+            # Las asociaciones se escribieron fuera del ORM
+            self.db.session.expire_all()
+            return shipment
+        except Exception as e:
+            self.db.session.rollback()
+            raise e
+
+    def find_by_tracking_id(self, tracking_id: TrackingId) -> Optional[Shipment]:
+        """Busca un envío por su tracking ID"""
+        model = (
+            self.db.session.query(ShipmentModel)
+            .filter_by(tracking_id=str(tracking_id))
+            .options(selectinload(ShipmentModel.units))
+            .first()
+        )
+
+        return self._model_to_entity(model) if model else None
+
+    def find_by_id(self, shipment_id: str) -> Optional[Shipment]:
+        """Busca un envío por su ID"""
+        model = (
+            self.db.session.query(ShipmentModel)
+            .filter_by(id=shipment_id)
+            .options(selectinload(ShipmentModel.units))
+            .first()
+        )
+
+        return self._model_to_entity(model) if model else None
+
+    def find_all(self, limit: int = 100, offset: int = 0) -> List[Shipment]:
+        """Retorna todos los envíos con paginación"""
+        models = (
+            self.db.session.query(ShipmentModel)
+            .order_by(ShipmentModel.created_at)
+            .options(selectinload(ShipmentModel.units))
+            .offset(offset)
+            .limit(limit)
+            .all()
+        )
+
+        return [self._model_to_entity(model) for model in models]
+
+    def exists_by_tracking_id(self, tracking_id: TrackingId) -> bool:
+        """Verifica si existe un envío con el tracking ID dado"""
+        count = (
+            self.db.session.query(ShipmentModel)
+            .filter_by(tracking_id=str(tracking_id))
+            .count()
+        )
+
+        return count > 0
+
+    def delete(self, shipment_id: str) -> bool:
+        """Elimina un envío y sus asociaciones con unidades"""
+        try:
+            model = self.db.session.get(ShipmentModel, shipment_id)
+            if not model:
+                return False
+            self.db.session.delete(model)
+            self.db.session.commit()
+            return True
+        except Exception as e:
+            self.db.session.rollback()
+            raise e
@@ -1,35 +1,45 @@
-from typing import List, Optional
+from datetime import datetime
+from typing import Collection, Dict, List, Optional, Set, Tuple
+from uuid import uuid4
 
-from sqlalchemy import and_
-from sqlalchemy.orm import Session
+from sqlalchemy import (DateTime, Integer, String, and_, bindparam, column,
+                        func, insert, literal, select, tuple_, union_all,
+                        update, values)
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, selectinload
 
+from ...domain.entities.checkpoint import Checkpoint
 from ...domain.entities.unit import Unit
+from ...domain.exceptions import ConcurrentModificationError
+from ...domain.read_models.unit_summary import UNIT_SUMMARY_FIELDS, UnitSummary
 from ...domain.repositories.unit_repository import UnitRepository
 from ...domain.value_objects.checkpoint_data import CheckpointData
 from ...domain.value_objects.tracking_id import TrackingId
 from ...domain.value_objects.unit_status import UnitStatus
-from ..database.database import db
-from ..database.models import CheckpointModel, UnitModel
+from ..database.database import db, insert_ignoring_duplicates
+from ..database.models import (CheckpointModel, OutboxMessageModel,
+                               ShipmentUnitModel, UnitModel)
+from ..external.outbox import checkpoint_outbox_rows
 
 
 class UnitRepositoryImpl(UnitRepository):
     """Implementación del repositorio de Unit usando SQLAlchemy"""
 
-    def __init__(self):
+    def __init__(self, append_only: bool = True):
         self.db = db
+        # Si es False, cada save reescribe el historial completo (modo legado)
+        self.append_only = append_only
 
-    def _model_to_entity(self, model: UnitModel) -> Unit:
-        """Convierte un modelo SQLAlchemy a entidad de dominio"""
-        checkpoints = []
-        for cp_model in model.checkpoints:
-            checkpoint_data = CheckpointData(
-                status=UnitStatus(cp_model.status),
-                timestamp=cp_model.timestamp,
-                location=cp_model.location,
-                notes=cp_model.notes,
-                operator_id=cp_model.operator_id,
-            )
-            checkpoints.append(checkpoint_data)
+    def _model_to_entity(
+        self, model: UnitModel, checkpoints: Optional[List[CheckpointModel]] = None
+    ) -> Unit:
+        """
+        Convierte un modelo SQLAlchemy a entidad de dominio
+
+        Si no se indican checkpoints se usa el historial completo del modelo.
+        """
+        if checkpoints is None:
+            checkpoints = model.checkpoints
 
         return Unit(
             id=model.id,
@@ -37,13 +47,21 @@ class UnitRepositoryImpl(UnitRepository):
             current_status=UnitStatus(model.current_status),
             created_at=model.created_at,
             updated_at=model.updated_at,
-            checkpoints=checkpoints,
+            checkpoints=[
+                CheckpointData(
+                    status=UnitStatus(cp_model.status),
+                    timestamp=cp_model.timestamp,
+                    location=cp_model.location,
+                    notes=cp_model.notes,
+                    operator_id=cp_model.operator_id,
+                )
+                for cp_model in checkpoints
+            ],
+            version=model.version,
         )
 
     def _entity_to_model(self, entity: Unit) -> UnitModel:
         """Convierte una entidad de dominio a modelo SQLAlchemy"""
-        from uuid import uuid4
-
         return UnitModel(
             id=entity.id or str(uuid4()),
             tracking_id=str(entity.tracking_id),
@@ -52,8 +70,418 @@ class UnitRepositoryImpl(UnitRepository):
             updated_at=entity.updated_at,
         )
 
+    def _index_checkpoints(
+        self, checkpoints: List[Checkpoint]
+    ) -> Dict[Tuple[str, CheckpointData], Checkpoint]:
+        """Indexa entidades Checkpoint por tracking ID y datos del checkpoint"""
+        return {
+            (str(checkpoint.tracking_id), checkpoint.checkpoint_data): checkpoint
+            for checkpoint in checkpoints
+        }
+
+    def _checkpoint_rows(
+        self,
+        unit_id: str,
+        tracking_id: TrackingId,
+        checkpoints: List[CheckpointData],
+        entities: Optional[Dict[Tuple[str, CheckpointData], Checkpoint]] = None,
+    ) -> List[dict]:
+        """
+        Construye las filas de checkpoints para un insert masivo
+
+        Si existe la entidad Checkpoint correspondiente a uno de los datos,
+        su fila conserva el ID y la fecha de creación de la entidad. Cada fila
+        lleva la huella del escaneo para descartar duplicados al insertar.
+        """
+        now = datetime.utcnow()
+        rows = []
+        for checkpoint_data in checkpoints:
+            row = {
+                "id": str(uuid4()),
+                "tracking_id": str(tracking_id),
+                "status": checkpoint_data.status.value,
+                "timestamp": checkpoint_data.timestamp,
+                "location": checkpoint_data.location,
+                "notes": checkpoint_data.notes,
+                "operator_id": checkpoint_data.operator_id,
+                "fingerprint": checkpoint_data.fingerprint(tracking_id),
+                "unit_id": unit_id,
+                "created_at": now,
+            }
+            checkpoint = (entities or {}).get((str(tracking_id), checkpoint_data))
+            if checkpoint:
+                row["id"] = checkpoint.id
+                row["created_at"] = checkpoint.created_at
+            rows.append(row)
+        return rows
+
     def save(self, unit: Unit) -> Unit:
         """Guarda una unidad en el repositorio"""
+        if not self.append_only:
+            return self._save_full_rewrite(unit)
+
+        self._commit_append_only(unit)
+        return unit
+
+    def save_with_checkpoint(self, unit: Unit, checkpoint: Checkpoint) -> Set[str]:
+        """
+        Guarda una unidad y su nuevo checkpoint en una sola transacción
+
+        La fila del checkpoint conserva el ID de la entidad, por lo que la
+        respuesta puede construirse sin recargar la unidad.
+
+        Returns:
+            Set[str]: Huellas de los checkpoints omitidos por duplicados
+        """
+        return self._commit_append_only(unit, self._index_checkpoints([checkpoint]))
+
+    def _commit_append_only(
+        self,
+        unit: Unit,
+        entities: Optional[Dict[Tuple[str, CheckpointData], Checkpoint]] = None,
+    ) -> Set[str]:
+        """
+        Escribe la unidad en su propia transacción y avanza su versión
+
+        Returns:
+            Set[str]: Huellas de los checkpoints omitidos por duplicados
+        """
+        pending = unit.get_pending_checkpoints() if unit.version else unit.checkpoints
+        try:
+            duplicates = self._write_append_only(unit, entities)
+            self.db.session.commit()
+        except IntegrityError:
+            # Motores sin ON CONFLICT: otra escritura creó la misma unidad
+            self.db.session.rollback()
+            raise ConcurrentModificationError(str(unit.tracking_id))
+        except Exception as e:
+            self.db.session.rollback()
+            raise e
+
+        if self._advances(unit, pending, duplicates):
+            unit.version += 1
+        unit.mark_checkpoints_persisted()
+        return duplicates
+
+    def _advances(
+        self, unit: Unit, checkpoints: List[CheckpointData], duplicates: Set[str]
+    ) -> bool:
+        """
+        Indica si la escritura de la unidad cambia su fila
+
+        Una unidad existente cuyos checkpoints nuevos fueron todos omitidos
+        por duplicados conserva su estado y su versión.
+        """
+        return (
+            not unit.version
+            or not checkpoints
+            or bool(self._stored(unit, checkpoints, duplicates))
+        )
+
+    def _stored(
+        self, unit: Unit, checkpoints: List[CheckpointData], duplicates: Set[str]
+    ) -> List[CheckpointData]:
+        """Checkpoints de la unidad que no fueron omitidos por duplicados"""
+        return [
+            checkpoint
+            for checkpoint in checkpoints
+            if checkpoint.fingerprint(unit.tracking_id) not in duplicates
+        ]
+
+    def _insert_checkpoints(self, rows: List[dict]) -> Set[str]:
+        """
+        Inserta filas de checkpoints omitiendo los escaneos ya registrados
+
+        Usa INSERT ... ON CONFLICT (fingerprint) DO NOTHING RETURNING para
+        saber qué filas se insertaron. En motores sin RETURNING en inserts
+        masivos un duplicado lanza IntegrityError, por lo que toda fila que
+        llega al commit fue insertada.
+
+        Returns:
+            Set[str]: Huellas de las filas omitidas por duplicadas
+        """
+        statement = insert_ignoring_duplicates(CheckpointModel, "fingerprint")
+        if not self.db.session.get_bind().dialect.insert_executemany_returning:
+            self.db.session.execute(statement, rows)
+            return set()
+
+        result = self.db.session.execute(
+            statement.returning(CheckpointModel.fingerprint), rows
+        )
+        return {row["fingerprint"] for row in rows} - set(result.scalars())
+
+    def _write_append_only(
+        self,
+        unit: Unit,
+        entities: Optional[Dict[Tuple[str, CheckpointData], Checkpoint]] = None,
+    ) -> Set[str]:
+        """
+        Escribe la unidad insertando solo sus checkpoints pendientes
+
+        El costo de cada actualización es constante: un INSERT de los
+        checkpoints nuevos, un UPDATE de la fila de la unidad y otro INSERT de
+        sus mensajes de outbox, sin importar el tamaño del historial.
+
+        El UPDATE es un compare-and-swap sobre la versión leída: si otra
+        escritura la cambió, se lanza ConcurrentModificationError y la
+        transacción se revierte. Si todos los checkpoints nuevos ya estaban
+        registrados, la unidad no se actualiza.
+
+        Returns:
+            Set[str]: Huellas de los checkpoints omitidos por duplicados
+        """
+        if not unit.version:
+            # Unidad nueva: se insertan la fila y todo su historial
+            if not self._insert_units_if_absent([unit]):
+                raise ConcurrentModificationError(str(unit.tracking_id))
+            new_checkpoints = unit.checkpoints
+        else:
+            new_checkpoints = unit.get_pending_checkpoints()
+
+        duplicates = set()
+        if new_checkpoints:
+            duplicates = self._insert_checkpoints(
+                self._checkpoint_rows(
+                    unit.id, unit.tracking_id, new_checkpoints, entities
+                )
+            )
+
+        if unit.version and self._advances(unit, new_checkpoints, duplicates):
+            updated = (
+                self.db.session.query(UnitModel)
+                .filter_by(id=unit.id, version=unit.version)
+                .update(
+                    {
+                        UnitModel.current_status: unit.current_status.value,
+                        UnitModel.updated_at: unit.updated_at,
+                        UnitModel.version: unit.version + 1,
+                    },
+                    synchronize_session=False,
+                )
+            )
+            if not updated:
+                raise ConcurrentModificationError(str(unit.tracking_id))
+
+        stored = self._stored(unit, new_checkpoints, duplicates)
+        if stored:
+            self.db.session.execute(
+                insert(OutboxMessageModel),
+                checkpoint_outbox_rows(unit.tracking_id, stored),
+            )
+        return duplicates
+
+    def save_batch(
+        self,
+        new_units: List[Unit],
+        updated_units: List[Unit],
+        checkpoints: List[Checkpoint],
+    ) -> Set[str]:
+        """
+        Guarda un lote de unidades y sus checkpoints nuevos en una transacción
+
+        Usa un INSERT masivo para las unidades nuevas, un INSERT masivo para
+        todos los checkpoints pendientes del lote, omitiendo escaneos ya
+        registrados, y un UPDATE masivo por clave primaria para las unidades
+        existentes con algún checkpoint efectivamente insertado.
+
+        Returns:
+            Set[str]: Huellas de los checkpoints omitidos por duplicados
+        """
+        entities = self._index_checkpoints(checkpoints)
+        units = new_units + updated_units
+        try:
+            if new_units and len(self._insert_units_if_absent(new_units)) < len(
+                new_units
+            ):
+                raise ConcurrentModificationError(
+                    ", ".join(str(unit.tracking_id) for unit in new_units)
+                )
+
+            checkpoint_rows = []
+            for unit in units:
+                pending = unit.get_pending_checkpoints()
+                checkpoint_rows.extend(
+                    self._checkpoint_rows(unit.id, unit.tracking_id, pending, entities)
+                )
+            duplicates = (
+                self._insert_checkpoints(checkpoint_rows) if checkpoint_rows else set()
+            )
+
+            advanced = [
+                unit
+                for unit in updated_units
+                if self._advances(unit, unit.get_pending_checkpoints(), duplicates)
+            ]
+            if advanced:
+                self._compare_and_swap_units(advanced)
+
+            # Un escaneo omitido ya generó sus tareas cuando se registró
+            outbox_rows = []
+            for unit in units:
+                outbox_rows.extend(
+                    checkpoint_outbox_rows(
+                        unit.tracking_id,
+                        self._stored(unit, unit.get_pending_checkpoints(), duplicates),
+                    )
+                )
+            if outbox_rows:
+                self.db.session.execute(insert(OutboxMessageModel), outbox_rows)
+
+            self.db.session.commit()
+        except IntegrityError:
+            # Motores sin ON CONFLICT: otra escritura creó alguna unidad nueva
+            self.db.session.rollback()
+            raise ConcurrentModificationError(
+                ", ".join(str(unit.tracking_id) for unit in new_units)
+            )
+        except Exception as e:
+            self.db.session.rollback()
+            raise e
+
+        for unit in new_units + advanced:
+            unit.version += 1
+        for unit in units:
+            unit.mark_checkpoints_persisted()
+        return duplicates
+
+    def _insert_units_if_absent(self, units: List[Unit]) -> List[str]:
+        """
+        Inserta unidades nuevas omitiendo los tracking IDs que ya existen
+
+        Es el get-or-create de la creación automática de unidades: un solo
+        INSERT ... ON CONFLICT (tracking_id) DO NOTHING RETURNING, sin
+        consulta previa. Si otra escritura creó la misma unidad, su fila no
+        se inserta, la transacción sigue válida (no hay IntegrityError) y el
+        llamador decide cómo resolverlo.
+
+        Returns:
+            List[str]: Tracking IDs efectivamente insertados
+        """
+        result = self.db.session.execute(
+            insert_ignoring_duplicates(UnitModel, "tracking_id").returning(
+                UnitModel.tracking_id
+            ),
+            [
+                {
+                    "id": unit.id,
+                    "tracking_id": str(unit.tracking_id),
+                    "current_status": unit.current_status.value,
+                    "version": 1,
+                    "created_at": unit.created_at,
+                    "updated_at": unit.updated_at,
+                }
+                for unit in units
+            ],
+        )
+        return list(result.scalars())
+
+    def _compare_and_swap_units(self, units: List[Unit]) -> None:
+        """
+        Actualiza estado y versión de varias unidades si no cambió su versión
+
+        Con UPDATE ... RETURNING las versiones esperadas viajan en una tabla
+        derivada y un solo UPDATE ... FROM actualiza las unidades vigentes y
+        retorna sus IDs; las que faltan fueron modificadas por otra
+        escritura. Sin RETURNING usa un UPDATE con executemany si el driver
+        reporta el total de filas afectadas, o un UPDATE por unidad.
+        """
+        dialect = self.db.session.get_bind().dialect
+        table = UnitModel.__table__
+        if dialect.update_returning:
+            expected = self._expected_versions(units, dialect.name)
+            updated = set(
+                self.db.session.execute(
+                    update(table)
+                    .where(
+                        table.c.id == expected.c.unit_id,
+                        table.c.version == expected.c.expected_version,
+                    )
+                    .values(
+                        current_status=expected.c.new_status,
+                        updated_at=expected.c.new_updated_at,
+                        version=table.c.version + 1,
+                    )
+                    .returning(table.c.id)
+                ).scalars()
+            )
+            stale = [unit for unit in units if unit.id not in updated]
+            if stale:
+                raise ConcurrentModificationError(
+                    ", ".join(str(unit.tracking_id) for unit in stale)
+                )
+            return
+
+        statement = (
+            update(table)
+            .where(
+                and_(
+                    table.c.id == bindparam("unit_id"),
+                    table.c.version == bindparam("expected_version"),
+                )
+            )
+            .values(
+                current_status=bindparam("new_status"),
+                updated_at=bindparam("new_updated_at"),
+                version=table.c.version + 1,
+            )
+        )
+        params = [
+            {
+                "unit_id": unit.id,
+                "expected_version": unit.version,
+                "new_status": unit.current_status.value,
+                "new_updated_at": unit.updated_at,
+            }
+            for unit in units
+        ]
+
+        if dialect.supports_sane_multi_rowcount:
+            result = self.db.session.execute(statement, params)
+            if result.rowcount != len(units):
+                raise ConcurrentModificationError(
+                    ", ".join(str(unit.tracking_id) for unit in units)
+                )
+            return
+
+        for unit, unit_params in zip(units, params):
+            if not self.db.session.execute(statement, unit_params).rowcount:
+                raise ConcurrentModificationError(str(unit.tracking_id))
+
+    @staticmethod
+    def _expected_versions(units: List[Unit], dialect_name: str):
+        """
+        Tabla derivada con la versión esperada y el nuevo estado de cada unidad
+
+        PostgreSQL usa (VALUES ...) AS expected (...); SQLite no admite
+        nombres de columna en el alias, por lo que se arma con UNION ALL.
+        """
+        columns = (
+            column("unit_id", String),
+            column("expected_version", Integer),
+            column("new_status", String),
+            column("new_updated_at", DateTime),
+        )
+        rows = [
+            (unit.id, unit.version, unit.current_status.value, unit.updated_at)
+            for unit in units
+        ]
+        if dialect_name == "postgresql":
+            return values(*columns, name="expected").data(rows)
+
+        return union_all(
+            *(
+                select(
+                    *(
+                        literal(value, type_=col.type).label(col.name)
+                        for value, col in zip(row, columns)
+                    )
+                )
+                for row in rows
+            )
+        ).subquery("expected")
+
+    def _save_full_rewrite(self, unit: Unit) -> Unit:
+        """Guarda una unidad reescribiendo todo su historial de checkpoints"""
         try:
             # Buscar si ya existe
             existing_model = (
@@ -66,49 +494,31 @@ class UnitRepositoryImpl(UnitRepository):
                 # Actualizar existente
                 existing_model.current_status = unit.current_status.value
                 existing_model.updated_at = unit.updated_at
+                existing_model.version = existing_model.version + 1
 
                 # Actualizar checkpoints
                 self.db.session.query(CheckpointModel).filter_by(
                     unit_id=existing_model.id
                 ).delete()
 
-                for checkpoint_data in unit.checkpoints:
-                    checkpoint_model = CheckpointModel(
-                        id=None,  # Se generará automáticamente
-                        tracking_id=str(unit.tracking_id),
-                        status=checkpoint_data.status.value,
-                        timestamp=checkpoint_data.timestamp,
-                        location=checkpoint_data.location,
-                        notes=checkpoint_data.notes,
-                        operator_id=checkpoint_data.operator_id,
-                        unit_id=existing_model.id,
-                    )
-                    self.db.session.add(checkpoint_model)
-
                 saved_model = existing_model
             else:
                 # Crear nuevo
-                unit_model = self._entity_to_model(unit)
-                self.db.session.add(unit_model)
+                saved_model = self._entity_to_model(unit)
+                self.db.session.add(saved_model)
                 self.db.session.flush()  # Para obtener el ID
 
-                # Agregar checkpoints
-                for checkpoint_data in unit.checkpoints:
-                    checkpoint_model = CheckpointModel(
-                        id=None,
-                        tracking_id=str(unit.tracking_id),
-                        status=checkpoint_data.status.value,
-                        timestamp=checkpoint_data.timestamp,
-                        location=checkpoint_data.location,
-                        notes=checkpoint_data.notes,
-                        operator_id=checkpoint_data.operator_id,
-                        unit_id=unit_model.id,
-                    )
-                    self.db.session.add(checkpoint_model)
-
-                saved_model = unit_model
+            for checkpoint_row in self._checkpoint_rows(
+                saved_model.id, unit.tracking_id, unit.checkpoints
+            ):
+                self.db.session.add(CheckpointModel(**checkpoint_row))
+            for outbox_row in checkpoint_outbox_rows(
+                unit.tracking_id, unit.get_pending_checkpoints()
+            ):
+                self.db.session.add(OutboxMessageModel(**outbox_row))
 
             self.db.session.commit()
+            unit.mark_checkpoints_persisted()
 
             # Recargar con relaciones
             return self.find_by_id(saved_model.id)
@@ -126,25 +536,223 @@ class UnitRepositoryImpl(UnitRepository):
 
         return self._model_to_entity(model) if model else None
 
+    def find_by_tracking_ids(self, tracking_ids: List[TrackingId]) -> List[Unit]:
+        """Busca varias unidades por tracking ID cargando sus checkpoints"""
+        if not tracking_ids:
+            return []
+
+        models = (
+            self.db.session.query(UnitModel)
+            .filter(UnitModel.tracking_id.in_([str(tid) for tid in tracking_ids]))
+            .options(selectinload(UnitModel.checkpoints))
+            .all()
+        )
+
+        return [self._model_to_entity(model) for model in models]
+
+    def find_by_shipment_id(self, shipment_id: str) -> List[Unit]:
+        """
+        Busca las unidades de un envío cargando solo su último checkpoint
+
+        Usa dos consultas sin importar el tamaño del envío ni del historial:
+        las unidades asociadas y el checkpoint más reciente de cada una. Las
+        entidades retornadas sirven para validar y aplicar un checkpoint
+        nuevo, no para reconstruir el historial.
+        """
+        models = (
+            self.db.session.query(UnitModel)
+            .join(ShipmentUnitModel, ShipmentUnitModel.unit_id == UnitModel.id)
+            .filter(ShipmentUnitModel.shipment_id == shipment_id)
+            .all()
+        )
+        if not models:
+            return []
+
+        shipment_unit_ids = (
+            self.db.session.query(ShipmentUnitModel.unit_id)
+            .filter(ShipmentUnitModel.shipment_id == shipment_id)
+            .scalar_subquery()
+        )
+        latest = (
+            self.db.session.query(
+                CheckpointModel.unit_id,
+                func.max(CheckpointModel.timestamp).label("timestamp"),
+            )
+            .filter(CheckpointModel.unit_id.in_(shipment_unit_ids))
+            .group_by(CheckpointModel.unit_id)
+            .subquery()
+        )
+        last_checkpoints = {}
+        for cp_model in self.db.session.query(CheckpointModel).join(
+            latest,
+            and_(
+                CheckpointModel.unit_id == latest.c.unit_id,
+                CheckpointModel.timestamp == latest.c.timestamp,
+            ),
+        ):
+            last_checkpoints.setdefault(cp_model.unit_id, cp_model)
+
+        return [
+            self._model_to_entity(
+                model,
+                [last_checkpoints[model.id]] if model.id in last_checkpoints else [],
+            )
+            for model in models
+        ]
+
     def find_by_id(self, unit_id: str) -> Optional[Unit]:
         """Busca una unidad por su ID"""
         model = self.db.session.query(UnitModel).filter_by(id=unit_id).first()
 
         return self._model_to_entity(model) if model else None
 
-    def find_by_status(self, status: UnitStatus) -> List[Unit]:
-        """Busca todas las unidades con un estado específico"""
-        models = (
+    def find_by_status(
+        self,
+        status: UnitStatus,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        after: Optional[Tuple[datetime, str]] = None,
+    ) -> List[Unit]:
+        """
+        Busca las unidades con un estado específico
+
+        Las páginas se recortan en SQL sobre un orden estable (fecha de
+        creación e ID) cubierto por el índice ix_units_status_created_at:
+        con LIMIT/OFFSET, o por keyset con after, la clave de la última
+        unidad de la página anterior. El keyset lee solo las filas de la
+        página, por lo que una página profunda cuesta lo mismo que la
+        primera.
+
+        Los checkpoints de la página se cargan con una sola consulta IN
+        adicional en lugar de una por unidad.
+        """
+        query = (
             self.db.session.query(UnitModel)
+            .options(selectinload(UnitModel.checkpoints))
             .filter_by(current_status=status.value)
-            .all()
+            .order_by(UnitModel.created_at, UnitModel.id)
         )
+        if after is not None:
+            query = query.filter(
+                tuple_(UnitModel.created_at, UnitModel.id) > tuple_(*after)
+            )
+        if offset:
+            query = query.offset(offset)
+        if limit is not None:
+            query = query.limit(limit)
+        models = query.all()
 
         return [self._model_to_entity(model) for model in models]
 
+    def _summary_columns(
+        self, fields: Collection[str], status: Optional[UnitStatus] = None
+    ) -> dict:
+        """
+        Columnas a leer para los campos solicitados de UnitSummary
+
+        El ID se lee siempre. Si el estado ya es conocido (listado por
+        estado) no se lee, y el timestamp de entrega solo existe para las
+        unidades entregadas (estado final): se lee con una subconsulta
+        correlacionada.
+        """
+        fields = set(fields)
+        columns = {"id": UnitModel.id}
+        if "tracking_id" in fields:
+            columns["tracking_id"] = UnitModel.tracking_id
+        if status is None and fields & {
+            "current_status",
+            "is_delivered",
+            "has_exception",
+        }:
+            columns["current_status"] = UnitModel.current_status
+        if "created_at" in fields:
+            columns["created_at"] = UnitModel.created_at
+        if "updated_at" in fields:
+            columns["updated_at"] = UnitModel.updated_at
+        if "delivery_time" in fields and status in (None, UnitStatus.DELIVERED):
+            columns["delivered_at"] = (
+                select(func.max(CheckpointModel.timestamp))
+                .where(
+                    CheckpointModel.unit_id == UnitModel.id,
+                    CheckpointModel.status == UnitStatus.DELIVERED.value,
+                )
+                .scalar_subquery()
+            )
+        return columns
+
+    def _row_to_summary(self, row, status: Optional[UnitStatus] = None) -> UnitSummary:
+        """Convierte una fila de columnas de _summary_columns a UnitSummary"""
+        values = row._asdict()
+        if "current_status" in values:
+            values["current_status"] = UnitStatus(values["current_status"])
+        elif status is not None:
+            values["current_status"] = status
+        return UnitSummary(**values)
+
+    def find_summaries_by_status(
+        self,
+        status: UnitStatus,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        after: Optional[Tuple[datetime, str]] = None,
+        fields: Optional[Collection[str]] = None,
+    ) -> List[UnitSummary]:
+        """
+        Busca los resúmenes de las unidades con un estado específico
+
+        Una sola consulta de columnas sobre ix_units_status_created_at, sin
+        hidratar entidades ni checkpoints. Con fields solo se leen las
+        columnas de esos campos, más la clave de orden (created_at, id).
+        """
+        columns = self._summary_columns(
+            UNIT_SUMMARY_FIELDS if fields is None else fields, status
+        )
+        columns["created_at"] = UnitModel.created_at
+
+        query = (
+            self.db.session.query(
+                *(column.label(name) for name, column in columns.items())
+            )
+            .filter(UnitModel.current_status == status.value)
+            .order_by(UnitModel.created_at, UnitModel.id)
+        )
+        if after is not None:
+            query = query.filter(
+                tuple_(UnitModel.created_at, UnitModel.id) > tuple_(*after)
+            )
+        if offset:
+            query = query.offset(offset)
+        if limit is not None:
+            query = query.limit(limit)
+
+        return [self._row_to_summary(row, status) for row in query]
+
+    def find_summary_by_tracking_id(
+        self, tracking_id: TrackingId, fields: Optional[Collection[str]] = None
+    ) -> Optional[UnitSummary]:
+        """Busca el resumen de una unidad leyendo solo las columnas solicitadas"""
+        columns = self._summary_columns(
+            UNIT_SUMMARY_FIELDS if fields is None else fields
+        )
+        row = (
+            self.db.session.query(
+                *(column.label(name) for name, column in columns.items())
+            )
+            .filter(UnitModel.tracking_id == str(tracking_id))
+            .first()
+        )
+
+        return self._row_to_summary(row) if row else None
+
     def find_all(self, limit: int = 100, offset: int = 0) -> List[Unit]:
-        """Retorna todas las unidades con paginación"""
-        models = self.db.session.query(UnitModel).offset(offset).limit(limit).all()
+        """Retorna todas las unidades con paginación y sus checkpoints"""
+        models = (
+            self.db.session.query(UnitModel)
+            .options(selectinload(UnitModel.checkpoints))
+            .offset(offset)
+            .limit(limit)
+            .all()
+        )
 
         return [self._model_to_entity(model) for model in models]
 
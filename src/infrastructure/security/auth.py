@@ -118,20 +118,22 @@ def rate_limit(max_requests=100, window=3600):
     return decorator
 
 
-def validate_content_type(expected_type="application/json"):
-    """Decorador para validar content type"""
+def validate_content_type(*expected_types):
+    """Decorador para validar content type (por defecto application/json)"""
+    expected_types = expected_types or ("application/json",)
 
     def decorator(f):
         @wraps(f)
         def decorated_function(*args, **kwargs):
             if request.method in ["POST", "PUT", "PATCH"]:
                 content_type = request.headers.get("Content-Type", "")
-                if not content_type.startswith(expected_type):
+                if not content_type.startswith(expected_types):
                     return (
                         jsonify(
                             {
                                 "error": "invalid_content_type",
-                                "message": f"Content-Type debe ser {expected_type}",
+                                "message": "Content-Type debe ser "
+                                + " o ".join(expected_types),
                             }
                         ),
                         400,
@@ -0,0 +1,325 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from typing import Optional
+
+import structlog
+from flask import Response, jsonify, make_response, request
+
+from ..monitoring.metrics import metrics
+
+logger = structlog.get_logger(__name__)
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+MAX_KEY_LENGTH = 255
+# Fallas temporales: un reintento con la misma clave puede tener éxito, por
+# lo que no se guardan (igual que las respuestas 5xx)
+RETRYABLE_STATUS_CODES = frozenset({429})
+RETRYABLE_ERRORS = frozenset({"concurrent_modification"})
+
+
+class FingerprintingStream:
+    """
+    Envuelve el cuerpo del request y calcula su huella a medida que se lee
+
+    Permite comparar cuerpos de cualquier tamaño sin cargarlos en memoria,
+    incluso cuando el endpoint los consume en streaming.
+    """
+
+    CHUNK_SIZE = 64 * 1024
+
+    def __init__(self, stream):
+        self._stream = stream
+        self._digest = hashlib.sha256()
+
+    def read(self, size: int = -1) -> bytes:
+        data = self._stream.read(size)
+        self._digest.update(data)
+        return data
+
+    def readline(self, size: int = -1) -> bytes:
+        data = self._stream.readline(size)
+        self._digest.update(data)
+        return data
+
+    def __iter__(self):
+        return iter(self.readline, b"")
+
+    def hexdigest(self) -> str:
+        """Consume lo que quede del cuerpo y retorna su SHA-256"""
+        while self.read(self.CHUNK_SIZE):
+            pass
+        return self._digest.hexdigest()
+
+
+class InMemoryIdempotencyStore:
+    """
+    Almacén de respuestas idempotentes en memoria del proceso
+
+    Acotado a max_entries (se descartan primero las entradas más antiguas) y
+    con expiración por TTL. Solo sirve para despliegues de un único proceso;
+    con varios workers debe usarse RedisIdempotencyStore.
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl: int = 86400, lock_ttl: int = 30):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.lock_ttl = lock_ttl
+        self._entries = OrderedDict()
+        self._condition = threading.Condition()
+
+    def reserve(self, key: str) -> bool:
+        """Reserva la clave para el request actual si no existe"""
+        with self._condition:
+            self._evict_expired()
+            if key in self._entries:
+                return False
+
+            self._entries[key] = (time.monotonic() + self.lock_ttl, None)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return True
+
+    def complete(self, key: str, record: dict) -> None:
+        """Guarda la respuesta de la clave y despierta a los requests en espera"""
+        with self._condition:
+            self._entries[key] = (time.monotonic() + self.ttl, record)
+            self._entries.move_to_end(key)
+            self._condition.notify_all()
+
+    def release(self, key: str) -> None:
+        """Libera la reserva de la clave sin guardar respuesta"""
+        with self._condition:
+            self._entries.pop(key, None)
+            self._condition.notify_all()
+
+    def wait(self, key: str, timeout: float) -> Optional[dict]:
+        """
+        Espera a que el request que reservó la clave termine
+
+        Returns:
+            Optional[dict]: Respuesta guardada, o None si la reserva se liberó
+            o no terminó dentro del timeout
+        """
+        with self._condition:
+            self._condition.wait_for(
+                lambda: self._get(key) is not None or key not in self._entries,
+                timeout=timeout,
+            )
+            return self._get(key)
+
+    def _get(self, key: str) -> Optional[dict]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            return None
+        return entry[1]
+
+    def _evict_expired(self) -> None:
+        now = time.monotonic()
+        expired = [key for key, (expires, _) in self._entries.items() if expires <= now]
+        for key in expired:
+            del self._entries[key]
+
+
+class RedisIdempotencyStore:
+    """Almacén de respuestas idempotentes compartido entre procesos en Redis"""
+
+    IN_PROGRESS = "in_progress"
+
+    def __init__(
+        self,
+        redis_client,
+        ttl: int = 86400,
+        lock_ttl: int = 30,
+        prefix: str = "idempotency",
+        poll_interval: float = 0.05,
+    ):
+        self.redis = redis_client
+        self.ttl = ttl
+        self.lock_ttl = lock_ttl
+        self.prefix = prefix
+        self.poll_interval = poll_interval
+
+    def reserve(self, key: str) -> bool:
+        """Reserva la clave para el request actual si no existe"""
+        return bool(
+            self.redis.set(self._key(key), self.IN_PROGRESS, nx=True, ex=self.lock_ttl)
+        )
+
+    def complete(self, key: str, record: dict) -> None:
+        """Guarda la respuesta de la clave con expiración"""
+        self.redis.set(self._key(key), json.dumps(record), ex=self.ttl)
+
+    def release(self, key: str) -> None:
+        """Libera la reserva de la clave sin guardar respuesta"""
+        self.redis.delete(self._key(key))
+
+    def wait(self, key: str, timeout: float) -> Optional[dict]:
+        """
+        Espera a que el request que reservó la clave termine
+
+        Returns:
+            Optional[dict]: Respuesta guardada, o None si la reserva se liberó
+            o no terminó dentro del timeout
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            value = self.redis.get(self._key(key))
+            if value is None:
+                return None
+            if value != self.IN_PROGRESS:
+                return json.loads(value)
+            if time.monotonic() >= deadline:
+                return None
+            time.sleep(self.poll_interval)
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}:{key}"
+
+
+def create_idempotency_store():
+    """Crea el almacén de idempotencia según IDEMPOTENCY_STORE (memory o redis)"""
+    ttl = int(os.getenv("IDEMPOTENCY_TTL", "86400"))
+
+    if os.getenv("IDEMPOTENCY_STORE", "memory") == "redis":
+        import redis
+
+        client = redis.Redis.from_url(
+            os.getenv("REDIS_URL", "redis://localhost:6379/0"),
+            decode_responses=True,
+        )
+        return RedisIdempotencyStore(client, ttl=ttl)
+
+    return InMemoryIdempotencyStore(
+        max_entries=int(os.getenv("IDEMPOTENCY_MAX_ENTRIES", "10000")), ttl=ttl
+    )
+
+
+def _client_key(idempotency_key: str) -> str:
+    """
+    Clave del almacén para el cliente autenticado, la ruta y la clave
+
+    Dos clientes que elijan la misma Idempotency-Key no comparten
+    respuestas. La credencial se guarda como hash, nunca en claro.
+    """
+    credential = (
+        request.headers.get("X-API-Key") or request.headers.get("Authorization") or ""
+    )
+    client = hashlib.sha256(credential.encode("utf-8")).hexdigest()[:16]
+    return f"{client}:{request.path}:{idempotency_key}"
+
+
+def _is_final(response: Response) -> bool:
+    """Indica si la respuesta es un resultado final que debe reenviarse"""
+    if response.status_code >= 500 or response.status_code in RETRYABLE_STATUS_CODES:
+        return False
+    payload = response.get_json(silent=True)
+    return not (isinstance(payload, dict) and payload.get("error") in RETRYABLE_ERRORS)
+
+
+def idempotent(store, wait_timeout: float = 10.0):
+    """
+    Decorador para soportar el header Idempotency-Key
+
+    El primer request con una clave reserva la clave y guarda su respuesta;
+    los reintentos con la misma clave reciben la respuesta original sin
+    ejecutar el endpoint. Los duplicados concurrentes esperan a que el primer
+    request termine. Las respuestas 5xx y las fallas temporales (429 y 409
+    concurrent_modification) no se guardan para permitir reintentos. Las
+    claves son por cliente autenticado. La huella del cuerpo se calcula por bloques, sin cargarlo completo.
+    """
+
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            idempotency_key = request.headers.get(IDEMPOTENCY_HEADER)
+            if idempotency_key is None:
+                return f(*args, **kwargs)
+
+            if not idempotency_key or len(idempotency_key) > MAX_KEY_LENGTH:
+                return (
+                    jsonify(
+                        {
+                            "error": "invalid_idempotency_key",
+                            "message": f"{IDEMPOTENCY_HEADER} debe tener entre 1 y "
+                            f"{MAX_KEY_LENGTH} caracteres",
+                        }
+                    ),
+                    400,
+                )
+
+            key = _client_key(idempotency_key)
+            body = FingerprintingStream(request.stream)
+            request.stream = body
+
+            if store.reserve(key):
+                try:
+                    response = make_response(f(*args, **kwargs))
+                    # Genera la respuesta completa (las respuestas en streaming
+                    # consumen el cuerpo del request al generarse)
+                    response_body = response.get_data(as_text=True)
+                except Exception:
+                    store.release(key)
+                    raise
+
+                if not _is_final(response):
+                    store.release(key)
+                else:
+                    store.complete(
+                        key,
+                        {
+                            "fingerprint": body.hexdigest(),
+                            "status_code": response.status_code,
+                            "body": response_body,
+                            "mimetype": response.mimetype,
+                        },
+                    )
+                return response
+
+            record = store.wait(key, wait_timeout)
+            if record is None:
+                return (
+                    jsonify(
+                        {
+                            "error": "idempotency_request_in_progress",
+                            "message": "Un request con la misma Idempotency-Key "
+                            "sigue en proceso, reintente más tarde",
+                        }
+                    ),
+                    409,
+                )
+
+            if record["fingerprint"] != body.hexdigest():
+                return (
+                    jsonify(
+                        {
+                            "error": "idempotency_key_reused",
+                            "message": "La Idempotency-Key ya se usó con otro cuerpo",
+                        }
+                    ),
+                    422,
+                )
+
+            logger.info(
+                "Respuesta idempotente reenviada",
+                path=request.path,
+                idempotency_key=idempotency_key,
+            )
+            metrics.increment_counter(
+                "idempotent_replays", tags={"endpoint": request.endpoint}
+            )
+            replay = Response(
+                record["body"],
+                status=record["status_code"],
+                mimetype=record.get("mimetype", "application/json"),
+            )
+            replay.headers["Idempotent-Replayed"] = "true"
+            return replay
+
+        return decorated_function
+
+    return decorator
@@ -0,0 +1 @@
+# Presentation CLI
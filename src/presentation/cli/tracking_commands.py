@@ -0,0 +1,153 @@
+import os
+import socket
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import click
+import structlog
+from flask import current_app
+from flask.cli import AppGroup
+
+from ...application.use_cases.register_checkpoint_batch import \
+    RegisterCheckpointBatchUseCase
+from ...infrastructure.database.checkpoint_import import (CheckpointImporter,
+                                                          ImportProgress,
+                                                          import_partition,
+                                                          split_partitions)
+from ...infrastructure.external.checkpoint_stream import (
+    CheckpointStream, CheckpointStreamConsumer)
+from ...infrastructure.external.outbox import OutboxRelay
+from ...infrastructure.external.tasks import deduplicate_checkpoints
+from ...infrastructure.external.tracking_cache import \
+    create_tracking_history_cache
+from ...infrastructure.repositories.unit_repository_impl import \
+    UnitRepositoryImpl
+
+logger = structlog.get_logger(__name__)
+
+tracking_cli = AppGroup("tracking", help="Comandos operativos del tracking")
+
+
+@tracking_cli.command("consume-stream")
+@click.option("--worker-index", default=0, show_default=True, help="Índice del worker")
+@click.option("--workers", default=1, show_default=True, help="Total de workers")
+@click.option("--batch-size", default=500, show_default=True, help="Entradas por lote")
+@click.option("--consumer-name", default=None, help="Nombre en el consumer group")
+def consume_stream(worker_index, workers, batch_size, consumer_name):
+    """Drena el buffer de ingesta de checkpoints hacia la base de datos"""
+    stream = CheckpointStream.from_env()
+    partitions = stream.partitions_for_worker(worker_index, workers)
+    consumer = CheckpointStreamConsumer(
+        stream=stream,
+        batch_use_case=RegisterCheckpointBatchUseCase(
+            UnitRepositoryImpl(),
+            reorder_window=current_app.config["CHECKPOINT_REORDER_WINDOW"],
+            history_cache=create_tracking_history_cache(),
+        ),
+        # Un nombre estable permite recuperar las entradas pendientes al reiniciar
+        consumer_name=consumer_name or f"{socket.gethostname()}-{worker_index}",
+        partitions=partitions,
+        batch_size=batch_size,
+    )
+
+    click.echo(f"Consumiendo particiones {partitions} como {consumer.consumer_name}")
+    try:
+        consumer.run()
+    except KeyboardInterrupt:
+        logger.info("Consumidor de checkpoints detenido", partitions=partitions)
+
+
+@tracking_cli.command("dedupe-checkpoints")
+@click.option("--chunk-size", default=1000, show_default=True, help="Filas por bloque")
+def dedupe_checkpoints(chunk_size):
+    """Calcula huellas faltantes y elimina checkpoints duplicados"""
+    result = deduplicate_checkpoints.apply(kwargs={"chunk_size": chunk_size}).get()
+    click.echo(
+        f"Procesados {result['processed']} checkpoints: "
+        f"{result['updated']} actualizados, {result['deleted']} duplicados eliminados"
+    )
+
+
+@tracking_cli.command("relay-outbox")
+@click.option("--batch-size", default=100, show_default=True, help="Mensajes por lote")
+@click.option("--poll-interval", default=1.0, show_default=True, help="Segundos")
+def relay_outbox(batch_size, poll_interval):
+    """Publica en Celery las tareas pendientes del outbox"""
+    relay = OutboxRelay(batch_size=batch_size)
+    click.echo(f"Publicando outbox en lotes de {batch_size}")
+    try:
+        relay.run(poll_interval=poll_interval)
+    except KeyboardInterrupt:
+        logger.info("Relay del outbox detenido")
+
+
+@tracking_cli.command("import")
+@click.argument("paths", nargs=-1, required=True, type=click.Path(exists=True))
+@click.option("--workers", default=1, show_default=True, help="Procesos worker")
+@click.option(
+    "--chunk-size", default=1000, show_default=True, help="Unidades por bloque"
+)
+@click.option(
+    "--resume-file",
+    default=None,
+    help="Archivo de progreso; se crea uno por partición (<archivo>.<partición>)",
+)
+def import_checkpoints(paths, workers, chunk_size, resume_file):
+    """Importa checkpoints históricos desde archivos CSV o NDJSON"""
+    started = time.perf_counter()
+    progress_paths = [
+        f"{resume_file}.{partition}" if resume_file else None
+        for partition in range(workers)
+    ]
+
+    try:
+        # Un progreso de otra cantidad de workers se rechaza antes de leer
+        for progress_path in progress_paths:
+            ImportProgress(progress_path, workers)
+        results = _run_import(list(paths), workers, chunk_size, progress_paths)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+
+    elapsed = time.perf_counter() - started
+    totals = {
+        key: sum(result[key] for result in results)
+        for key in ("rows", "units", "rejected", "duplicates", "skipped_units")
+    }
+    click.echo(
+        f"Importados {totals['rows']} checkpoints de {totals['units']} unidades "
+        f"en {elapsed:.1f}s ({totals['rows'] / elapsed:.0f} filas/s); "
+        f"{totals['rejected']} filas rechazadas, {totals['duplicates']} duplicadas, "
+        f"{totals['skipped_units']} unidades existentes omitidas"
+    )
+
+
+def _run_import(paths, workers, chunk_size, progress_paths):
+    """Importa en este proceso o con un proceso worker por partición"""
+    if workers == 1:
+        return [
+            CheckpointImporter(
+                units_per_chunk=chunk_size, progress_path=progress_paths[0]
+            ).run(paths)
+        ]
+
+    # Los archivos se ordenan y reparten una sola vez; cada proceso, dueño de
+    # una partición de tracking IDs, lee solo sus corridas
+    with tempfile.TemporaryDirectory() as directory:
+        runs = split_partitions(paths, workers, directory)
+        with ProcessPoolExecutor(
+            max_workers=workers, mp_context=get_context("spawn")
+        ) as executor:
+            futures = [
+                executor.submit(
+                    import_partition,
+                    runs[partition],
+                    partition,
+                    workers,
+                    chunk_size,
+                    progress_paths[partition],
+                )
+                for partition in range(workers)
+            ]
+            return [future.result() for future in futures]
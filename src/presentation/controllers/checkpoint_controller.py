@@ -1,23 +1,38 @@
+import json
+from typing import Iterator, List, Optional, Tuple, Union
+
 import structlog
-from flask import jsonify, request
+from flask import Response, jsonify, request, stream_with_context
 from marshmallow import ValidationError
 
-from ...application.use_cases.get_tracking_history import \
-    GetTrackingHistoryUseCase
+from ...application.use_cases.get_tracking_history import (
+    CachedGetTrackingHistoryUseCase, GetTrackingHistoryUseCase)
 from ...application.use_cases.list_units_by_status import \
     ListUnitsByStatusUseCase
 from ...application.use_cases.register_checkpoint import \
     RegisterCheckpointUseCase
+from ...application.use_cases.register_checkpoint_batch import (
+    RESULT_SUMMARY_KEYS, RegisterCheckpointBatchUseCase, summarize_results)
+from ...application.use_cases.register_shipment_checkpoint import \
+    RegisterShipmentCheckpointUseCase
+from ...domain.exceptions import (ConcurrentModificationError,
+                                  DuplicateCheckpointError)
 from ...domain.value_objects.checkpoint_data import CheckpointData
 from ...domain.value_objects.tracking_id import TrackingId
 from ...domain.value_objects.unit_status import UnitStatus
-# Las tareas de Celery se importan dinámicamente para evitar problemas de contexto
-from ..schemas.checkpoint_schemas import (ErrorResponseSchema,
-                                          ListUnitsByStatusSchema,
-                                          ListUnitsResponseSchema,
-                                          RegisterCheckpointResponseSchema,
-                                          RegisterCheckpointSchema,
-                                          TrackingHistoryResponseSchema)
+from ...infrastructure.database.group_commit import GroupCommitCoordinator
+from ...infrastructure.external.batch_jobs import CheckpointBatchJobs
+from ...infrastructure.external.checkpoint_stream import CheckpointStream
+from ..schemas.checkpoint_schemas import (
+    MAX_BATCH_JOB_SIZE, NDJSON_MIMETYPE, BatchItemResultSchema,
+    CheckpointBatchJobSchema, CheckpointBatchJobStatusSchema,
+    CheckpointReceiptSchema, ErrorResponseSchema, ListUnitsByStatusSchema,
+    ListUnitsResponseSchema, RegisterCheckpointBatchResponseSchema,
+    RegisterCheckpointBatchSchema, RegisterCheckpointResponseSchema,
+    RegisterShipmentCheckpointResponseSchema, RegisterShipmentCheckpointSchema,
+    TrackingHistoryQuerySchema, TrackingHistoryResponseSchema)
+from ..schemas.checkpoint_validator import (CheckpointPayloadValidator,
+                                            build_checkpoint, loads)
 
 logger = structlog.get_logger(__name__)
 
@@ -28,88 +43,66 @@ class CheckpointController:
     def __init__(
         self,
         register_checkpoint_use_case: RegisterCheckpointUseCase,
-        get_tracking_history_use_case: GetTrackingHistoryUseCase,
+        get_tracking_history_use_case: Union[
+            GetTrackingHistoryUseCase, CachedGetTrackingHistoryUseCase
+        ],
         list_units_by_status_use_case: ListUnitsByStatusUseCase,
+        register_checkpoint_batch_use_case: RegisterCheckpointBatchUseCase,
+        checkpoint_stream: Optional[CheckpointStream] = None,
+        register_shipment_checkpoint_use_case: Optional[
+            RegisterShipmentCheckpointUseCase
+        ] = None,
+        stream_chunk_size: int = 500,
+        group_commit: Optional[GroupCommitCoordinator] = None,
+        batch_jobs: Optional[CheckpointBatchJobs] = None,
     ):
         self.register_checkpoint_use_case = register_checkpoint_use_case
         self.get_tracking_history_use_case = get_tracking_history_use_case
         self.list_units_by_status_use_case = list_units_by_status_use_case
+        self.register_checkpoint_batch_use_case = register_checkpoint_batch_use_case
+        # Si hay stream configurado, el registro individual es write-behind
+        self.checkpoint_stream = checkpoint_stream
+        self.register_shipment_checkpoint_use_case = (
+            register_shipment_checkpoint_use_case
+        )
+        # Items por bloque al registrar un lote NDJSON en streaming
+        self.stream_chunk_size = stream_chunk_size
+        # Si hay group commit, los registros concurrentes comparten transacción
+        self.group_commit = group_commit
+        # Lotes de escáneres desconectados que se ingieren en Celery
+        self.batch_jobs = batch_jobs
+        self.payload_validator = CheckpointPayloadValidator()
+
+    def _json_body(self):
+        """
+        Decodifica el cuerpo JSON con el decodificador rápido
+
+        Si el cuerpo no es JSON válido se delega en request.json para
+        conservar su manejo de errores.
+        """
+        try:
+            return loads(request.get_data())
+        except ValueError:
+            return request.json
 
     def register_checkpoint(self):
         """POST /api/v1/checkpoints - Registrar checkpoint"""
         try:
-            # Validar datos de entrada
-            schema = RegisterCheckpointSchema()
-            data = schema.load(request.json)
-
-            # Crear objetos de dominio
-            tracking_id = TrackingId(data["tracking_id"])
-            checkpoint_data = CheckpointData(
-                status=UnitStatus(data["checkpoint_data"]["status"]),
-                timestamp=data["checkpoint_data"]["timestamp"],
-                location=data["checkpoint_data"].get("location"),
-                notes=data["checkpoint_data"].get("notes"),
-                operator_id=data["checkpoint_data"].get("operator_id"),
-            )
-
-            # Ejecutar caso de uso
-            result = self.register_checkpoint_use_case.execute(
-                tracking_id, checkpoint_data
+            # Validar datos de entrada y crear objetos de dominio
+            tracking_id, checkpoint_data = self.payload_validator.load(
+                self._json_body()
             )
 
-            # Ejecutar tareas asíncronas
-            try:
-                # Importar tareas dinámicamente para evitar problemas de contexto
-                from ...infrastructure.external.tasks import (
-                    process_checkpoint, send_notification)
-
-                # Procesar checkpoint de forma asíncrona
-                process_task = process_checkpoint.delay(
-                    str(tracking_id),
-                    {
-                        "status": checkpoint_data.status.value,
-                        "timestamp": (
-                            checkpoint_data.timestamp.isoformat()
-                            if checkpoint_data.timestamp
-                            else None
-                        ),
-                        "location": checkpoint_data.location,
-                        "notes": checkpoint_data.notes,
-                        "operator_id": checkpoint_data.operator_id,
-                    },
-                )
-
-                # Enviar notificación si es un estado importante
-                if checkpoint_data.status in [
-                    UnitStatus.DELIVERED,
-                    UnitStatus.EXCEPTION,
-                ]:
-                    notification_task = send_notification.delay(
-                        str(tracking_id),
-                        checkpoint_data.status.value,
-                        "customer@example.com",  # En producción esto vendría de la base de datos
-                    )
-                    logger.info(
-                        "Tareas asíncronas iniciadas",
-                        tracking_id=str(tracking_id),
-                        process_task_id=process_task.id,
-                        notification_task_id=notification_task.id,
-                    )
-                else:
-                    logger.info(
-                        "Tarea de procesamiento iniciada",
-                        tracking_id=str(tracking_id),
-                        process_task_id=process_task.id,
-                    )
+            if self.checkpoint_stream:
+                return self._enqueue_checkpoint(tracking_id, checkpoint_data)
 
-            except Exception as e:
-                # No fallar la respuesta principal si las tareas asíncronas fallan
-                logger.error(
-                    "Error iniciando tareas asíncronas",
-                    tracking_id=str(tracking_id),
-                    error=str(e),
-                    error_type=str(type(e)),
-                    error_args=str(e.args) if hasattr(e, "args") else None,
+            # Ejecutar caso de uso; las tareas asíncronas (procesamiento y
+            # notificación) quedan en el outbox y las publica el relay
+            if self.group_commit:
+                result = self.group_commit.submit(tracking_id, checkpoint_data)
+            else:
+                result = self.register_checkpoint_use_case.execute(
+                    tracking_id, checkpoint_data
                 )
 
             # Preparar respuesta
@@ -139,10 +132,18 @@ class CheckpointController:
                 400,
             )
 
+        except DuplicateCheckpointError as e:
+            logger.info("Checkpoint duplicado en registro", error=str(e))
+            return jsonify({"error": "duplicate_checkpoint", "message": str(e)}), 409
+
         except ValueError as e:
             logger.warning("Error de negocio en registro de checkpoint", error=str(e))
             return jsonify({"error": "business_error", "message": str(e)}), 400
 
+        except ConcurrentModificationError as e:
+            logger.warning("Conflicto de concurrencia en registro", error=str(e))
+            return jsonify({"error": "concurrent_modification", "message": str(e)}), 409
+
         except Exception as e:
             logger.error("Error interno en registro de checkpoint", error=str(e))
             return (
@@ -152,6 +153,373 @@ class CheckpointController:
                 500,
             )
 
+    def _enqueue_checkpoint(
+        self, tracking_id: TrackingId, checkpoint_data: CheckpointData
+    ):
+        """Agrega el checkpoint al buffer de ingesta y responde con un recibo"""
+        receipt = self.checkpoint_stream.publish(tracking_id, checkpoint_data)
+
+        logger.info(
+            "Checkpoint encolado para registro",
+            tracking_id=str(tracking_id),
+            status=checkpoint_data.status.value,
+            receipt=receipt,
+        )
+
+        response_data = CheckpointReceiptSchema().dump(
+            {
+                "receipt": receipt,
+                "status": "accepted",
+                "tracking_id": str(tracking_id),
+                "checkpoint_status": checkpoint_data.status.value,
+            }
+        )
+        return jsonify(response_data), 202
+
+    def register_checkpoint_batch(self):
+        """POST /api/v1/checkpoints/batch - Registrar un lote de checkpoints"""
+        if request.mimetype == NDJSON_MIMETYPE:
+            return self._register_checkpoint_stream()
+
+        try:
+            schema = RegisterCheckpointBatchSchema()
+            data = schema.load(self._json_body())
+
+            # Validar cada item por separado para reportar errores por item
+            raw_items = data["checkpoints"]
+            results = [None] * len(raw_items)
+            valid_indexes = []
+            valid_items = []
+            for index, raw_item in enumerate(raw_items):
+                try:
+                    valid_items.append(self.payload_validator.load(raw_item))
+                    valid_indexes.append(index)
+                except ValidationError as e:
+                    results[index] = {
+                        "index": index,
+                        "tracking_id": raw_item.get("tracking_id"),
+                        "status": "error",
+                        "error": "validation_error",
+                        "message": "Datos de entrada inválidos",
+                        "details": e.messages,
+                    }
+                except ValueError as e:
+                    results[index] = {
+                        "index": index,
+                        "tracking_id": raw_item.get("tracking_id"),
+                        "status": "error",
+                        "error": "validation_error",
+                        "message": str(e),
+                    }
+
+            # Ejecutar caso de uso con los items válidos
+            result = self.register_checkpoint_batch_use_case.execute(valid_items)
+            for index, item_result in zip(valid_indexes, result["results"]):
+                results[index] = {**item_result, "index": index}
+
+            summary = summarize_results(results)
+            response_data = RegisterCheckpointBatchResponseSchema().dump(
+                {"results": results, "summary": summary}
+            )
+
+            logger.info("Lote de checkpoints procesado", **summary)
+
+            return jsonify(response_data), 200
+
+        except ValidationError as e:
+            logger.warning(
+                "Error de validación en lote de checkpoints", errors=e.messages
+            )
+            return (
+                jsonify(
+                    {
+                        "error": "validation_error",
+                        "message": "Datos de entrada inválidos",
+                        "details": e.messages,
+                    }
+                ),
+                400,
+            )
+
+        except Exception as e:
+            logger.error("Error interno en lote de checkpoints", error=str(e))
+            return (
+                jsonify(
+                    {"error": "internal_error", "message": "Error interno del servidor"}
+                ),
+                500,
+            )
+
+    def submit_checkpoint_batch_job(self):
+        """POST /api/v1/checkpoints/batch/jobs - Encolar un lote para ingesta"""
+        try:
+            if request.mimetype == NDJSON_MIMETYPE:
+                raw_items = (line for line in request.stream if line.strip())
+            else:
+                data = RegisterCheckpointBatchSchema().load(self._json_body())
+                raw_items = iter(data["checkpoints"])
+
+            # Los items inválidos se reportan de inmediato; el resto se encola
+            items, rejected = [], []
+            for index, raw_item in enumerate(raw_items):
+                if index >= MAX_BATCH_JOB_SIZE:
+                    raise ValidationError(
+                        {"checkpoints": [f"Máximo {MAX_BATCH_JOB_SIZE} checkpoints"]}
+                    )
+                try:
+                    if request.mimetype == NDJSON_MIMETYPE:
+                        raw_item = loads(raw_item)
+                    items.append((index, *self.payload_validator.load(raw_item)))
+                except ValidationError as e:
+                    rejected.append(self._stream_error(index, raw_item, e.messages))
+                except ValueError as e:
+                    rejected.append(self._stream_error(index, raw_item, str(e)))
+
+            if not items:
+                return (
+                    jsonify(
+                        {
+                            "error": "validation_error",
+                            "message": "Ningún checkpoint del lote es válido",
+                            "details": {"rejected": len(rejected)},
+                        }
+                    ),
+                    400,
+                )
+
+            job_id = self.batch_jobs.submit(items)
+            response_data = CheckpointBatchJobSchema().dump(
+                {
+                    "job_id": job_id,
+                    "state": "PENDING",
+                    "status_url": f"/api/v1/checkpoints/batch/jobs/{job_id}",
+                    "accepted": len(items),
+                    "rejected": rejected,
+                }
+            )
+
+            logger.info(
+                "Lote de checkpoints encolado para ingesta",
+                job_id=job_id,
+                accepted=len(items),
+                rejected=len(rejected),
+            )
+
+            return jsonify(response_data), 202
+
+        except ValidationError as e:
+            logger.warning(
+                "Error de validación en lote para ingesta", errors=e.messages
+            )
+            return (
+                jsonify(
+                    {
+                        "error": "validation_error",
+                        "message": "Datos de entrada inválidos",
+                        "details": e.messages,
+                    }
+                ),
+                400,
+            )
+
+        except Exception as e:
+            logger.error("Error interno encolando lote de checkpoints", error=str(e))
+            return (
+                jsonify(
+                    {"error": "internal_error", "message": "Error interno del servidor"}
+                ),
+                500,
+            )
+
+    def get_checkpoint_batch_job(self, job_id: str):
+        """GET /api/v1/checkpoints/batch/jobs/:jobId - Avance de una ingesta"""
+        try:
+            status = self.batch_jobs.status(job_id)
+            return jsonify(CheckpointBatchJobStatusSchema().dump(status)), 200
+
+        except Exception as e:
+            logger.error(
+                "Error interno consultando lote de checkpoints",
+                job_id=job_id,
+                error=str(e),
+            )
+            return (
+                jsonify(
+                    {"error": "internal_error", "message": "Error interno del servidor"}
+                ),
+                500,
+            )
+
+    def register_shipment_checkpoint(self, tracking_id: str):
+        """POST /api/v1/shipments/:trackingId/checkpoints - Checkpoint de envío"""
+        try:
+            data = RegisterShipmentCheckpointSchema().load(request.json)
+
+            try:
+                shipment_tracking_id = TrackingId(tracking_id)
+            except ValueError as e:
+                return jsonify({"error": "validation_error", "message": str(e)}), 400
+
+            _, checkpoint_data = build_checkpoint({"tracking_id": tracking_id, **data})
+
+            result = self.register_shipment_checkpoint_use_case.execute(
+                shipment_tracking_id, checkpoint_data
+            )
+            response_data = RegisterShipmentCheckpointResponseSchema().dump(result)
+
+            logger.info(
+                "Checkpoint de envío procesado",
+                tracking_id=tracking_id,
+                total=result["summary"]["total"],
+                succeeded=result["summary"]["succeeded"],
+            )
+
+            return jsonify(response_data), 200
+
+        except ValidationError as e:
+            logger.warning(
+                "Error de validación en checkpoint de envío", errors=e.messages
+            )
+            return (
+                jsonify(
+                    {
+                        "error": "validation_error",
+                        "message": "Datos de entrada inválidos",
+                        "details": e.messages,
+                    }
+                ),
+                400,
+            )
+
+        except ValueError as e:
+            logger.warning(
+                "Error de negocio en checkpoint de envío",
+                tracking_id=tracking_id,
+                error=str(e),
+            )
+            return jsonify({"error": "business_error", "message": str(e)}), 404
+
+        except ConcurrentModificationError as e:
+            logger.warning("Conflicto de concurrencia en envío", error=str(e))
+            return jsonify({"error": "concurrent_modification", "message": str(e)}), 409
+
+        except Exception as e:
+            logger.error(
+                "Error interno en checkpoint de envío",
+                tracking_id=tracking_id,
+                error=str(e),
+            )
+            return (
+                jsonify(
+                    {"error": "internal_error", "message": "Error interno del servidor"}
+                ),
+                500,
+            )
+
+    def _register_checkpoint_stream(self):
+        """
+        Registra un lote NDJSON por bloques de tamaño fijo
+
+        El cuerpo se lee línea por línea y cada bloque de items válidos se
+        persiste con el caso de uso de lote antes de leer el siguiente, por
+        lo que la memoria no depende del tamaño del cuerpo. La respuesta
+        también es NDJSON: un resultado por línea a medida que se procesa
+        (los errores de validación se emiten de inmediato, por lo que el
+        orden puede diferir; cada resultado lleva su índice) y una última
+        línea con el resumen.
+        """
+        return Response(
+            stream_with_context(
+                self._serialize_stream_results(self._stream_results(request.stream))
+            ),
+            status=200,
+            mimetype=NDJSON_MIMETYPE,
+        )
+
+    def _stream_results(self, body) -> Iterator[dict]:
+        """Valida las líneas del cuerpo y registra los items por bloques"""
+        chunk, indexes = [], []
+        index = 0
+        for line in body:
+            if not line.strip():
+                continue
+            item, error = self._parse_stream_line(index, line)
+            if error:
+                yield error
+            else:
+                chunk.append(item)
+                indexes.append(index)
+            index += 1
+
+            if len(chunk) >= self.stream_chunk_size:
+                yield from self._register_stream_chunk(chunk, indexes)
+                chunk, indexes = [], []
+
+        if chunk:
+            yield from self._register_stream_chunk(chunk, indexes)
+
+    def _parse_stream_line(
+        self, index: int, line: bytes
+    ) -> Tuple[Optional[dict], Optional[dict]]:
+        """
+        Decodifica y valida una línea NDJSON
+
+        Returns:
+            Tuple: El item validado, o el resultado de error de la línea
+        """
+        raw_item = None
+        try:
+            raw_item = loads(line)
+            return self.payload_validator.load(raw_item), None
+        except ValidationError as e:
+            return None, self._stream_error(index, raw_item, e.messages)
+        except ValueError as e:
+            return None, self._stream_error(index, raw_item, str(e))
+
+    def _register_stream_chunk(
+        self, chunk: List[dict], indexes: List[int]
+    ) -> Iterator[dict]:
+        """Registra un bloque de items y retorna sus resultados con su índice"""
+        result = self.register_checkpoint_batch_use_case.execute(chunk)
+        for index, item_result in zip(indexes, result["results"]):
+            yield {**item_result, "index": index}
+
+    def _serialize_stream_results(self, results: Iterator[dict]) -> Iterator[str]:
+        """Serializa los resultados como líneas NDJSON y agrega el resumen"""
+        result_schema = BatchItemResultSchema()
+        summary = summarize_results([])
+        try:
+            for item_result in results:
+                summary["total"] += 1
+                summary[RESULT_SUMMARY_KEYS[item_result["status"]]] += 1
+                yield json.dumps(result_schema.dump(item_result)) + "\n"
+        except Exception as e:
+            logger.error("Error interno en lote NDJSON", error=str(e))
+            yield json.dumps(
+                {"error": "internal_error", "message": "Error interno del servidor"}
+            ) + "\n"
+            return
+
+        logger.info("Lote NDJSON procesado", **summary)
+        yield json.dumps({"summary": summary}) + "\n"
+
+    def _stream_error(self, index: int, raw_item, error) -> dict:
+        """Resultado de un item NDJSON que no pasó la validación"""
+        result = {
+            "index": index,
+            "tracking_id": (
+                raw_item.get("tracking_id") if isinstance(raw_item, dict) else None
+            ),
+            "status": "error",
+            "error": "validation_error",
+        }
+        if isinstance(error, str):
+            result["message"] = error
+        else:
+            result["message"] = "Datos de entrada inválidos"
+            result["details"] = error
+        return result
+
     def get_tracking_history(self, tracking_id: str):
         """GET /api/v1/tracking/:trackingId - Obtener historial"""
         try:
@@ -161,8 +529,17 @@ class CheckpointController:
             except ValueError as e:
                 return jsonify({"error": "validation_error", "message": str(e)}), 400
 
+            # Validar parámetros de consulta
+            query = TrackingHistoryQuerySchema().load(request.args)
+
             # Ejecutar caso de uso
-            result = self.get_tracking_history_use_case.execute(tracking_id_obj)
+            result = self.get_tracking_history_use_case.execute(
+                tracking_id_obj,
+                fields=query.get("field_set"),
+                limit=query["limit"],
+                before=query.get("before"),
+                cursor=query.get("cursor"),
+            )
 
             # Preparar respuesta
             response_schema = TrackingHistoryResponseSchema()
@@ -172,6 +549,21 @@ class CheckpointController:
 
             return jsonify(response_data), 200
 
+        except ValidationError as e:
+            logger.warning(
+                "Error de validación al obtener historial", errors=e.messages
+            )
+            return (
+                jsonify(
+                    {
+                        "error": "validation_error",
+                        "message": "Parámetros de consulta inválidos",
+                        "details": e.messages,
+                    }
+                ),
+                400,
+            )
+
         except ValueError as e:
             logger.warning(
                 "Error de negocio al obtener historial",
@@ -205,6 +597,8 @@ class CheckpointController:
                 status=UnitStatus(data["status"]),
                 limit=data["limit"],
                 offset=data["offset"],
+                cursor=data.get("cursor"),
+                fields=data.get("field_set"),
             )
 
             # Preparar respuesta
@@ -232,6 +626,10 @@ class CheckpointController:
                 400,
             )
 
+        except ValueError as e:
+            logger.warning("Cursor inválido al listar unidades", error=str(e))
+            return jsonify({"error": "validation_error", "message": str(e)}), 400
+
         except Exception as e:
             logger.error("Error interno al listar unidades", error=str(e))
             return (
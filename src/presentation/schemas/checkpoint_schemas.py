@@ -1,11 +1,47 @@
 from datetime import datetime
 from typing import Optional
 
-from marshmallow import (Schema, ValidationError, fields, validate,
+from marshmallow import (Schema, ValidationError, fields, validate, validates,
                          validates_schema)
 
+from ...application.use_cases.get_tracking_history import \
+    TRACKING_HISTORY_FIELDS
+from ...application.use_cases.pagination import decode_cursor
+from ...domain.read_models.unit_summary import UNIT_SUMMARY_FIELDS
+from ...domain.value_objects.checkpoint_data import naive_utc
 from ...domain.value_objects.unit_status import UnitStatus
 
+# Máximo de checkpoints aceptados en un lote
+MAX_BATCH_SIZE = 5000
+# Máximo de checkpoints de un lote encolado para ingesta asíncrona
+MAX_BATCH_JOB_SIZE = 50000
+
+# Lotes en streaming: un checkpoint JSON por línea, sin máximo de items
+NDJSON_MIMETYPE = "application/x-ndjson"
+
+
+class FieldSetField(fields.Field):
+    """Lista de campos separados por coma (parámetro fields=) como tupla"""
+
+    def __init__(self, choices, **kwargs):
+        super().__init__(**kwargs)
+        self.choices = tuple(choices)
+
+    def _deserialize(self, value, attr, data, **kwargs):
+        if not isinstance(value, str):
+            raise ValidationError("Fields debe ser una lista separada por comas")
+
+        names = tuple(
+            dict.fromkeys(name.strip() for name in value.split(",") if name.strip())
+        )
+        unknown = [name for name in names if name not in self.choices]
+        if not names or unknown:
+            raise ValidationError(
+                f"Campos inválidos: {', '.join(unknown) or value!r}. "
+                f"Campos válidos: {', '.join(self.choices)}"
+            )
+        return names
+
 
 class CheckpointDataSchema(Schema):
     """Schema para validar datos de checkpoint"""
@@ -47,13 +83,9 @@ class CheckpointDataSchema(Schema):
     def validate_timestamp(self, data, **kwargs):
         """Valida que el timestamp no sea futuro"""
         timestamp = data.get("timestamp")
-        if timestamp:
-            # Convertir a UTC si no tiene timezone
-            if timestamp.tzinfo is None:
-                timestamp = timestamp.replace(tzinfo=None)
-            now = datetime.utcnow()
-            if timestamp > now:
-                raise ValidationError("Timestamp no puede ser futuro", "timestamp")
+        # Con timezone se compara en UTC naive
+        if timestamp and naive_utc(timestamp) > datetime.utcnow():
+            raise ValidationError("Timestamp no puede ser futuro", "timestamp")
 
 
 class RegisterCheckpointSchema(Schema):
@@ -78,6 +110,28 @@ class RegisterCheckpointSchema(Schema):
     )
 
 
+class RegisterCheckpointBatchSchema(Schema):
+    """Schema para registrar un lote de checkpoints"""
+
+    # Cada item se valida individualmente con RegisterCheckpointSchema
+    checkpoints = fields.List(
+        fields.Dict(),
+        required=True,
+        validate=validate.Length(min=1, max=MAX_BATCH_SIZE),
+        error_messages={"required": "Checkpoints es requerido"},
+    )
+
+
+class RegisterShipmentCheckpointSchema(Schema):
+    """Schema para aplicar un checkpoint a todas las unidades de un envío"""
+
+    checkpoint_data = fields.Nested(
+        CheckpointDataSchema,
+        required=True,
+        error_messages={"required": "Checkpoint data es requerido"},
+    )
+
+
 class CheckpointResponseSchema(Schema):
     """Schema para respuesta de checkpoint"""
 
@@ -111,11 +165,99 @@ class RegisterCheckpointResponseSchema(Schema):
     unit = fields.Nested(UnitResponseSchema)
 
 
+class CheckpointReceiptSchema(Schema):
+    """Schema para el recibo de un checkpoint aceptado para registro diferido"""
+
+    receipt = fields.Str()
+    status = fields.Str()
+    tracking_id = fields.Str()
+    checkpoint_status = fields.Str()
+
+
+class BatchItemResultSchema(Schema):
+    """Schema para el resultado de un item de un lote de checkpoints"""
+
+    index = fields.Int()
+    tracking_id = fields.Str(allow_none=True)
+    status = fields.Str()
+    checkpoint_id = fields.Str()
+    unit_status = fields.Str()
+    error = fields.Str()
+    message = fields.Str()
+    details = fields.Dict(allow_none=True)
+
+
+class BatchSummarySchema(Schema):
+    """Schema para el resumen de un lote de checkpoints"""
+
+    total = fields.Int()
+    succeeded = fields.Int()
+    duplicates = fields.Int()
+    failed = fields.Int()
+
+
+class RegisterCheckpointBatchResponseSchema(Schema):
+    """Schema para respuesta de registro de un lote de checkpoints"""
+
+    results = fields.List(fields.Nested(BatchItemResultSchema))
+    summary = fields.Nested(BatchSummarySchema)
+
+
+class CheckpointBatchJobSchema(Schema):
+    """Schema para la respuesta de un lote encolado para ingesta asíncrona"""
+
+    job_id = fields.Str()
+    state = fields.Str()
+    status_url = fields.Str()
+    accepted = fields.Int()
+    rejected = fields.List(fields.Nested(BatchItemResultSchema))
+
+
+class BatchJobProgressSchema(Schema):
+    """Schema para el avance de un trabajo de ingesta"""
+
+    total = fields.Int()
+    processed = fields.Int()
+    succeeded = fields.Int()
+    duplicates = fields.Int()
+    failed = fields.Int()
+
+
+class CheckpointBatchJobStatusSchema(Schema):
+    """Schema para el estado de un trabajo de ingesta"""
+
+    job_id = fields.Str()
+    state = fields.Str()
+    progress = fields.Nested(BatchJobProgressSchema)
+    errors = fields.List(fields.Nested(BatchItemResultSchema))
+    error = fields.Str()
+
+
+class RegisterShipmentCheckpointResponseSchema(Schema):
+    """Schema para respuesta de un checkpoint aplicado a un envío"""
+
+    shipment_tracking_id = fields.Str()
+    results = fields.List(fields.Nested(BatchItemResultSchema))
+    summary = fields.Nested(BatchSummarySchema)
+
+
+class PaginationSchema(Schema):
+    """Schema para información de paginación"""
+
+    # Sin total ni offset en la paginación por cursor
+    total = fields.Int(allow_none=True)
+    limit = fields.Int()
+    offset = fields.Int(allow_none=True)
+    has_more = fields.Bool()
+
+
 class TrackingHistoryResponseSchema(Schema):
     """Schema para respuesta de historial de tracking"""
 
     unit = fields.Nested(UnitResponseSchema)
     checkpoints = fields.List(fields.Nested(CheckpointResponseSchema))
+    pagination = fields.Nested(PaginationSchema)
+    next_cursor = fields.Str(allow_none=True)
     total_checkpoints = fields.Int()
 
 
@@ -142,14 +284,45 @@ class ListUnitsByStatusSchema(Schema):
         error_messages={"invalid": "Offset debe ser mayor o igual a 0"},
     )
 
+    # Cursor opaco next_cursor de la página anterior (paginación por keyset)
+    cursor = fields.Str(required=False, validate=validate.Length(min=1, max=200))
 
-class PaginationSchema(Schema):
-    """Schema para información de paginación"""
+    # Campos de cada unidad a incluir (por defecto, todos)
+    field_set = FieldSetField(UNIT_SUMMARY_FIELDS, required=False, data_key="fields")
 
-    total = fields.Int()
-    limit = fields.Int()
-    offset = fields.Int()
-    has_more = fields.Bool()
+
+class TrackingHistoryQuerySchema(Schema):
+    """Schema para los parámetros de consulta del historial de tracking"""
+
+    # Secciones (unit, checkpoints, total_checkpoints) o campos de una
+    # sección (unit.current_status, checkpoints.status) a incluir
+    field_set = FieldSetField(
+        TRACKING_HISTORY_FIELDS, required=False, data_key="fields"
+    )
+
+    limit = fields.Int(
+        required=False,
+        missing=100,
+        validate=validate.Range(min=1, max=1000),
+        error_messages={"invalid": "Limit debe estar entre 1 y 1000"},
+    )
+
+    # Solo checkpoints anteriores a este timestamp
+    before = fields.DateTime(
+        required=False,
+        error_messages={"invalid": "Before debe ser una fecha válida"},
+    )
+
+    # Cursor opaco next_cursor de la página anterior
+    cursor = fields.Str(required=False, validate=validate.Length(min=1, max=200))
+
+    @validates("cursor")
+    def validate_cursor(self, value):
+        """Valida que el cursor haya sido emitido por la API"""
+        try:
+            decode_cursor(value)
+        except ValueError as e:
+            raise ValidationError(str(e))
 
 
 class ListUnitsResponseSchema(Schema):
@@ -157,6 +330,7 @@ class ListUnitsResponseSchema(Schema):
 
     units = fields.List(fields.Nested(UnitResponseSchema))
     pagination = fields.Nested(PaginationSchema)
+    next_cursor = fields.Str(allow_none=True)
     status = fields.Str()
 
 
@@ -0,0 +1,110 @@
+import json
+import re
+from datetime import datetime
+from typing import Tuple
+
+from ...domain.value_objects.checkpoint_data import CheckpointData
+from ...domain.value_objects.tracking_id import TrackingId
+from ...domain.value_objects.unit_status import UnitStatus
+from .checkpoint_schemas import RegisterCheckpointSchema
+
+try:
+    # orjson está en requirements.txt; el módulo estándar queda como respaldo
+    # para entornos que no lo instalan
+    import orjson
+
+    _loads = orjson.loads
+except ImportError:  # pragma: no cover - depende del entorno
+    _loads = json.loads
+
+# Única forma de timestamp aceptada por el camino rápido (ISO 8601 sin zona)
+_TIMESTAMP_PATTERN = re.compile(r"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(\.\d{1,6})?")
+_PAYLOAD_FIELDS = frozenset({"tracking_id", "checkpoint_data"})
+_CHECKPOINT_FIELDS = frozenset(
+    {"status", "timestamp", "location", "notes", "operator_id"}
+)
+_OPTIONAL_TEXT_FIELDS = ("location", "notes", "operator_id")
+
+
+def loads(data):
+    """Decodifica JSON con orjson si está instalado"""
+    return _loads(data)
+
+
+def build_checkpoint(data: dict) -> Tuple[TrackingId, CheckpointData]:
+    """Crea los objetos de dominio a partir de un payload validado"""
+    tracking_id = TrackingId(data["tracking_id"])
+    checkpoint_data = CheckpointData(
+        status=UnitStatus(data["checkpoint_data"]["status"]),
+        timestamp=data["checkpoint_data"]["timestamp"],
+        location=data["checkpoint_data"].get("location"),
+        notes=data["checkpoint_data"].get("notes"),
+        operator_id=data["checkpoint_data"].get("operator_id"),
+    )
+    return tracking_id, checkpoint_data
+
+
+class CheckpointPayloadValidator:
+    """
+    Validador precompilado del payload de registro de checkpoint
+
+    El camino rápido solo verifica la forma del payload (campos conocidos,
+    tipos y formato del timestamp) y deja las reglas de cada campo a
+    TrackingId, UnitStatus y CheckpointData, que las validan una sola vez.
+    Cualquier payload que no pase el camino rápido se valida con
+    RegisterCheckpointSchema, de modo que los errores y los casos borde son
+    idénticos a los del schema.
+    """
+
+    def __init__(self):
+        self.schema = RegisterCheckpointSchema()
+
+    def load(self, payload) -> Tuple[TrackingId, CheckpointData]:
+        """
+        Valida el payload y retorna el tracking ID y los datos del checkpoint
+
+        Raises:
+            ValidationError: Si el payload no cumple RegisterCheckpointSchema
+            ValueError: Si los datos validados no cumplen las reglas de dominio
+        """
+        try:
+            return self._load_fast(payload)
+        except (KeyError, TypeError, ValueError):
+            return build_checkpoint(self.schema.load(payload))
+
+    def _load_fast(self, payload) -> Tuple[TrackingId, CheckpointData]:
+        if type(payload) is not dict or payload.keys() - _PAYLOAD_FIELDS:
+            raise TypeError("Forma de payload no soportada")
+
+        tracking_id = payload["tracking_id"]
+        checkpoint = payload["checkpoint_data"]
+        if type(tracking_id) is not str or type(checkpoint) is not dict:
+            raise TypeError("Forma de payload no soportada")
+        if checkpoint.keys() - _CHECKPOINT_FIELDS:
+            raise TypeError("Forma de payload no soportada")
+        for field in _OPTIONAL_TEXT_FIELDS:
+            value = checkpoint.get(field)
+            if value is not None and type(value) is not str:
+                raise TypeError("Forma de payload no soportada")
+
+        if "timestamp" not in checkpoint:
+            timestamp = datetime.utcnow()
+        else:
+            timestamp = checkpoint["timestamp"]
+            if type(timestamp) is not str or not _TIMESTAMP_PATTERN.fullmatch(
+                timestamp
+            ):
+                raise TypeError("Forma de timestamp no soportada")
+            timestamp = datetime.fromisoformat(timestamp)
+
+        status = checkpoint["status"]
+        if type(status) is not str:
+            raise TypeError("Forma de payload no soportada")
+
+        return TrackingId(tracking_id), CheckpointData(
+            status=UnitStatus(status),
+            timestamp=timestamp,
+            location=checkpoint.get("location"),
+            notes=checkpoint.get("notes"),
+            operator_id=checkpoint.get("operator_id"),
+        )
@@ -0,0 +1,113 @@
+import time
+from collections import OrderedDict
+
+import redis
+
+
+class FakeRedis:
+    """Sustituto en memoria de Redis para tests (subconjunto de comandos)"""
+
+    def __init__(self):
+        self.streams = {}
+        self.groups = {}
+        self.values = {}
+        self._sequence = 0
+
+    # Claves
+
+    def _live(self, name):
+        entry = self.values.get(name)
+        if entry and entry[1] is not None and entry[1] <= time.monotonic():
+            del self.values[name]
+            return None
+        return entry
+
+    def get(self, name):
+        entry = self._live(name)
+        return entry[0] if entry else None
+
+    def set(self, name, value, ex=None, nx=False):
+        if nx and self._live(name):
+            return None
+        expires = time.monotonic() + ex if ex else None
+        self.values[name] = (value, expires)
+        return True
+
+    def delete(self, *names):
+        return sum(1 for name in names if self.values.pop(name, None) is not None)
+
+    # Streams
+
+    def _parse_id(self, entry_id: str):
+        ms, _, seq = entry_id.partition("-")
+        return int(ms), int(seq or 0)
+
+    def xadd(self, name, fields):
+        self._sequence += 1
+        entry_id = f"{self._sequence}-0"
+        self.streams.setdefault(name, OrderedDict())[entry_id] = dict(fields)
+        return entry_id
+
+    def xlen(self, name):
+        return len(self.streams.get(name, {}))
+
+    def xdel(self, name, *ids):
+        stream = self.streams.get(name, {})
+        return sum(1 for entry_id in ids if stream.pop(entry_id, None) is not None)
+
+    def xgroup_create(self, name, group, id="0", mkstream=False):
+        if (name, group) in self.groups:
+            raise redis.ResponseError("BUSYGROUP Consumer Group name already exists")
+        if mkstream:
+            self.streams.setdefault(name, OrderedDict())
+        self.groups[(name, group)] = {"last": self._parse_id(id), "pending": {}}
+        return True
+
+    def xreadgroup(self, group, consumer, streams, count=None, block=None):
+        response = []
+        for name, start in streams.items():
+            state = self.groups[(name, group)]
+            stream = self.streams.get(name, OrderedDict())
+            entries = []
+            if start == ">":
+                for entry_id, fields in stream.items():
+                    if self._parse_id(entry_id) <= state["last"]:
+                        continue
+                    entries.append((entry_id, fields))
+                    state["last"] = self._parse_id(entry_id)
+                    state["pending"][entry_id] = [consumer, time.monotonic()]
+                    if count and len(entries) >= count:
+                        break
+            else:
+                for entry_id, (owner, _) in sorted(
+                    state["pending"].items(), key=lambda item: self._parse_id(item[0])
+                ):
+                    if owner == consumer and entry_id in stream:
+                        entries.append((entry_id, stream[entry_id]))
+                        if count and len(entries) >= count:
+                            break
+            if entries or start != ">":
+                response.append([name, entries])
+        return response
+
+    def xack(self, name, group, *ids):
+        pending = self.groups[(name, group)]["pending"]
+        return sum(1 for entry_id in ids if pending.pop(entry_id, None) is not None)
+
+    def xpending(self, name, group):
+        return {"pending": len(self.groups[(name, group)]["pending"])}
+
+    def xautoclaim(
+        self, name, group, consumer, min_idle_time, start_id="0-0", count=None
+    ):
+        pending = self.groups[(name, group)]["pending"]
+        stream = self.streams.get(name, {})
+        now = time.monotonic()
+        claimed = []
+        for entry_id, state in pending.items():
+            if (now - state[1]) * 1000 >= min_idle_time and entry_id in stream:
+                state[0], state[1] = consumer, now
+                claimed.append((entry_id, stream[entry_id]))
+                if count and len(claimed) >= count:
+                    break
+        return ["0-0", claimed, []]
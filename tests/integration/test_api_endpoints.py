@@ -1,10 +1,12 @@
 import json
-from datetime import datetime
+from datetime import datetime, timedelta
 
 import pytest
+from sqlalchemy import event
 
 from src.domain.value_objects.tracking_id import TrackingId
 from src.domain.value_objects.unit_status import UnitStatus
+from src.infrastructure.database.database import db
 
 
 class TestCheckpointAPI:
@@ -95,6 +97,384 @@ class TestCheckpointAPI:
         assert "checkpoint" in data
         assert "unit" in data
 
+    def test_register_checkpoint_reports_query_count(
+        self, client, auth_headers, sample_checkpoint_data
+    ):
+        """Test que el registro expone y acota las consultas SQL por request"""
+        payload = {
+            "tracking_id": "QUERYCOUNT123",
+            "checkpoint_data": sample_checkpoint_data,
+        }
+        client.post(
+            "/api/v1/checkpoints", data=json.dumps(payload), headers=auth_headers
+        )
+
+        payload["checkpoint_data"] = {"status": "IN_TRANSIT"}
+        response = client.post(
+            "/api/v1/checkpoints", data=json.dumps(payload), headers=auth_headers
+        )
+
+        # Assert - Carga de unidad + historial, UPDATE, INSERT del checkpoint e
+        # INSERT del outbox en una transacción
+        assert response.status_code == 201
+        assert int(response.headers["X-DB-Query-Count"]) <= 5
+
+    def test_get_tracking_history_with_fields(self, client, auth_headers):
+        """Test que fields= limita las columnas consultadas y la respuesta"""
+        client.post(
+            "/api/v1/checkpoints",
+            json={
+                "tracking_id": "SPARSE0001",
+                "checkpoint_data": {
+                    "status": "PICKED_UP",
+                    "notes": "Nota extensa del operador",
+                    "operator_id": "OP001",
+                },
+            },
+            headers=auth_headers,
+        )
+        statements = []
+
+        def on_execute(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(db.engine, "before_cursor_execute", on_execute)
+        try:
+            response = client.get(
+                "/api/v1/tracking/SPARSE0001"
+                "?fields=unit.current_status,checkpoints.status",
+                headers=auth_headers,
+            )
+        finally:
+            event.remove(db.engine, "before_cursor_execute", on_execute)
+        full = client.get("/api/v1/tracking/SPARSE0001", headers=auth_headers)
+
+        assert response.status_code == 200
+        assert response.get_json() == {
+            "unit": {"current_status": "PICKED_UP"},
+            "checkpoints": [{"status": "PICKED_UP"}],
+            "pagination": {"limit": 100, "has_more": False},
+            "next_cursor": None,
+        }
+        assert not any("notes" in statement for statement in statements)
+        assert full.get_json()["checkpoints"][0]["notes"] == "Nota extensa del operador"
+        assert full.get_json()["total_checkpoints"] == 1
+        assert len(response.data) < len(full.data)
+
+    def test_get_tracking_history_pages_newest_first(self, client, auth_headers):
+        """Test para recorrer el historial con limit, before y next_cursor"""
+        start = datetime.utcnow() - timedelta(hours=2)
+        statuses = ["PICKED_UP"] + ["IN_TRANSIT", "AT_FACILITY"] * 2
+        client.post(
+            "/api/v1/checkpoints/batch",
+            json={
+                "checkpoints": [
+                    {
+                        "tracking_id": "HISTPAGE01",
+                        "checkpoint_data": {
+                            "status": status,
+                            "timestamp": (start + timedelta(minutes=step)).isoformat(),
+                        },
+                    }
+                    for step, status in enumerate(statuses)
+                ]
+            },
+            headers=auth_headers,
+        )
+
+        timestamps = []
+        url = "/api/v1/tracking/HISTPAGE01?limit=2"
+        while url:
+            data = client.get(url, headers=auth_headers).get_json()
+            # El total solo viene en la primera página
+            assert data.get("total_checkpoints") == (None if timestamps else 5)
+            assert len(data["checkpoints"]) <= 2
+            timestamps.extend(cp["timestamp"] for cp in data["checkpoints"])
+            url = data["next_cursor"] and (
+                "/api/v1/tracking/HISTPAGE01?limit=2&cursor=" + data["next_cursor"]
+            )
+        before = client.get(
+            "/api/v1/tracking/HISTPAGE01?before="
+            + (start + timedelta(minutes=2)).isoformat(),
+            headers=auth_headers,
+        ).get_json()
+        invalid = client.get(
+            "/api/v1/tracking/HISTPAGE01?cursor=basura", headers=auth_headers
+        )
+
+        assert timestamps == sorted(timestamps, reverse=True)
+        assert len(timestamps) == 5
+        assert [cp["status"] for cp in before["checkpoints"]] == [
+            "IN_TRANSIT",
+            "PICKED_UP",
+        ]
+        assert invalid.status_code == 400
+        assert invalid.get_json()["error"] == "validation_error"
+
+    def test_get_tracking_history_invalid_fields(self, client, auth_headers):
+        """Test para error con un campo desconocido en fields="""
+        response = client.get(
+            "/api/v1/tracking/SPARSE0001?fields=unit.password", headers=auth_headers
+        )
+
+        assert response.status_code == 400
+        data = response.get_json()
+        assert data["error"] == "validation_error"
+        assert "fields" in data["details"]
+
+    def test_register_checkpoint_batch(self, client, auth_headers):
+        """Test para registro de un lote con resultado por item"""
+        # Arrange
+        payload = {
+            "checkpoints": [
+                {
+                    "tracking_id": "BATCH0001",
+                    "checkpoint_data": {"status": "PICKED_UP"},
+                },
+                {
+                    "tracking_id": "BATCH0002",
+                    "checkpoint_data": {"status": "DELIVERED"},
+                },
+                {"tracking_id": "AB", "checkpoint_data": {"status": "PICKED_UP"}},
+            ]
+        }
+
+        # Act
+        response = client.post(
+            "/api/v1/checkpoints/batch", data=json.dumps(payload), headers=auth_headers
+        )
+
+        # Assert
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data["summary"] == {
+            "total": 3,
+            "succeeded": 1,
+            "duplicates": 0,
+            "failed": 2,
+        }
+        statuses = [(r["index"], r["status"]) for r in data["results"]]
+        assert statuses == [(0, "success"), (1, "error"), (2, "error")]
+        assert data["results"][1]["error"] == "business_error"
+        assert data["results"][2]["error"] == "validation_error"
+
+        history = client.get("/api/v1/tracking/BATCH0001", headers=auth_headers)
+        assert history.get_json()["unit"]["current_status"] == "PICKED_UP"
+
+    def test_register_checkpoint_batch_rejects_empty_batch(self, client, auth_headers):
+        """Test para error con un lote vacío"""
+        response = client.post(
+            "/api/v1/checkpoints/batch",
+            data=json.dumps({"checkpoints": []}),
+            headers=auth_headers,
+        )
+
+        assert response.status_code == 400
+        assert response.get_json()["error"] == "validation_error"
+
+    def test_register_checkpoint_batch_is_idempotent(self, client, auth_headers):
+        """Test que un reintento con Idempotency-Key reenvía la respuesta original"""
+        headers = {**auth_headers, "Idempotency-Key": "scanner-42-retry"}
+        payload = {
+            "checkpoints": [
+                {"tracking_id": "IDEMP0001", "checkpoint_data": {"status": "PICKED_UP"}}
+            ]
+        }
+
+        first = client.post(
+            "/api/v1/checkpoints/batch", data=json.dumps(payload), headers=headers
+        )
+        replay = client.post(
+            "/api/v1/checkpoints/batch", data=json.dumps(payload), headers=headers
+        )
+
+        assert replay.status_code == first.status_code == 200
+        assert replay.get_json() == first.get_json()
+        assert replay.headers["Idempotent-Replayed"] == "true"
+        assert replay.headers["X-DB-Query-Count"] == "0"
+
+        payload["checkpoints"][0]["checkpoint_data"]["status"] = "IN_TRANSIT"
+        reused = client.post(
+            "/api/v1/checkpoints/batch", data=json.dumps(payload), headers=headers
+        )
+        assert reused.status_code == 422
+        assert reused.get_json()["error"] == "idempotency_key_reused"
+
+    def test_register_checkpoint_batch_ndjson(self, client, auth_headers):
+        """Test para un lote NDJSON procesado y respondido en streaming"""
+        lines = [
+            json.dumps(
+                {"tracking_id": "NDJSON001", "checkpoint_data": {"status": "PICKED_UP"}}
+            ),
+            "",
+            "{not json",
+            json.dumps(
+                {"tracking_id": "AB", "checkpoint_data": {"status": "PICKED_UP"}}
+            ),
+            json.dumps(
+                {"tracking_id": "NDJSON002", "checkpoint_data": {"status": "DELIVERED"}}
+            ),
+        ]
+        headers = {**auth_headers, "Content-Type": "application/x-ndjson"}
+
+        response = client.post(
+            "/api/v1/checkpoints/batch", data="\n".join(lines), headers=headers
+        )
+
+        assert response.status_code == 200
+        assert response.mimetype == "application/x-ndjson"
+        *results, last = [json.loads(line) for line in response.data.splitlines()]
+        assert last["summary"] == {
+            "total": 4,
+            "succeeded": 1,
+            "duplicates": 0,
+            "failed": 3,
+        }
+        by_index = {result["index"]: result for result in results}
+        assert by_index[0]["status"] == "success"
+        assert by_index[1]["error"] == "validation_error"
+        assert by_index[2]["error"] == "validation_error"
+        assert by_index[3]["error"] == "business_error"
+
+    def test_register_checkpoint_batch_ndjson_is_idempotent(self, client, auth_headers):
+        """Test que un lote NDJSON reintentado reenvía la respuesta original"""
+        headers = {
+            **auth_headers,
+            "Content-Type": "application/x-ndjson",
+            "Idempotency-Key": "ndjson-retry",
+        }
+        body = json.dumps(
+            {"tracking_id": "NDJSON003", "checkpoint_data": {"status": "PICKED_UP"}}
+        )
+
+        first = client.post("/api/v1/checkpoints/batch", data=body, headers=headers)
+        replay = client.post("/api/v1/checkpoints/batch", data=body, headers=headers)
+        reused = client.post(
+            "/api/v1/checkpoints/batch", data=body + "\n" + body, headers=headers
+        )
+
+        assert replay.data == first.data
+        assert replay.mimetype == "application/x-ndjson"
+        assert replay.headers["Idempotent-Replayed"] == "true"
+        assert reused.status_code == 422
+
+    def test_ndjson_batch_is_persisted_in_fixed_size_chunks(self, app):
+        """Test que el lote NDJSON se entrega al caso de uso por bloques"""
+        from unittest.mock import Mock
+
+        from src.presentation.controllers.checkpoint_controller import \
+            CheckpointController
+
+        batch_use_case = Mock()
+        batch_use_case.execute.side_effect = lambda items: {
+            "results": [
+                {"tracking_id": str(tid), "status": "success"} for tid, _ in items
+            ]
+        }
+        controller = CheckpointController(
+            register_checkpoint_use_case=Mock(),
+            get_tracking_history_use_case=Mock(),
+            list_units_by_status_use_case=Mock(),
+            register_checkpoint_batch_use_case=batch_use_case,
+            stream_chunk_size=2,
+        )
+        body = "\n".join(
+            json.dumps(
+                {
+                    "tracking_id": f"CHUNK{i:04d}",
+                    "checkpoint_data": {"status": "PICKED_UP"},
+                }
+            )
+            for i in range(5)
+        )
+
+        with app.test_request_context(
+            method="POST", data=body, content_type="application/x-ndjson"
+        ):
+            response = controller.register_checkpoint_batch()
+            lines = list(response.response)
+
+        assert [len(c.args[0]) for c in batch_use_case.execute.call_args_list] == [
+            2,
+            2,
+            1,
+        ]
+        assert json.loads(lines[-1])["summary"]["succeeded"] == 5
+
+    def test_register_shipment_checkpoint(self, app, client, auth_headers):
+        """Test que un checkpoint de envío se aplica a todas sus unidades"""
+        from src.domain.entities.shipment import Shipment
+        from src.infrastructure.repositories.shipment_repository_impl import \
+            ShipmentRepositoryImpl
+        from src.infrastructure.repositories.unit_repository_impl import \
+            UnitRepositoryImpl
+
+        picked_up = "2024-01-15T10:00:00"
+        payload = {
+            "checkpoints": [
+                {
+                    "tracking_id": tracking_id,
+                    "checkpoint_data": {"status": "PICKED_UP", "timestamp": picked_up},
+                }
+                for tracking_id in ("SHIPU001", "SHIPU002", "SHIPU003")
+            ]
+            + [
+                {
+                    "tracking_id": "SHIPU003",
+                    "checkpoint_data": {
+                        "status": "IN_TRANSIT",
+                        "timestamp": "2024-01-15T11:00:00",
+                    },
+                }
+            ]
+        }
+        client.post(
+            "/api/v1/checkpoints/batch", data=json.dumps(payload), headers=auth_headers
+        )
+        with app.app_context():
+            units = UnitRepositoryImpl().find_by_tracking_ids(
+                [TrackingId(f"SHIPU00{n}") for n in (1, 2, 3)]
+            )
+            ShipmentRepositoryImpl().save(
+                Shipment.create(TrackingId("GUIA0001"), [unit.id for unit in units])
+            )
+
+        response = client.post(
+            "/api/v1/shipments/GUIA0001/checkpoints",
+            data=json.dumps({"checkpoint_data": {"status": "IN_TRANSIT"}}),
+            headers=auth_headers,
+        )
+
+        # Assert - SHIPU003 ya estaba en tránsito y se reporta sin afectar al resto
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data["shipment_tracking_id"] == "GUIA0001"
+        assert data["summary"] == {
+            "total": 3,
+            "succeeded": 2,
+            "duplicates": 0,
+            "failed": 1,
+        }
+        failed = [r for r in data["results"] if r["status"] == "error"]
+        assert [r["tracking_id"] for r in failed] == ["SHIPU003"]
+        # Envío, unidades, últimos checkpoints, UPDATE e INSERTs masivos: el
+        # número de sentencias no depende del número de unidades
+        assert int(response.headers["X-DB-Query-Count"]) <= 7
+        history = client.get("/api/v1/tracking/SHIPU001", headers=auth_headers)
+        assert history.get_json()["unit"]["current_status"] == "IN_TRANSIT"
+        assert history.get_json()["total_checkpoints"] == 2
+
+    def test_register_shipment_checkpoint_not_found(self, client, auth_headers):
+        """Test para error cuando el envío no existe"""
+        response = client.post(
+            "/api/v1/shipments/GUIA9999/checkpoints",
+            data=json.dumps({"checkpoint_data": {"status": "IN_TRANSIT"}}),
+            headers=auth_headers,
+        )
+
+        assert response.status_code == 404
+        assert response.get_json()["error"] == "business_error"
+
     def test_get_tracking_history_success(
         self, client, auth_headers, sample_checkpoint_data
     ):
@@ -173,6 +553,60 @@ class TestCheckpointAPI:
         assert data["pagination"]["limit"] == 10
         assert data["pagination"]["offset"] == 0
 
+    def test_list_units_by_status_with_cursor(self, client, auth_headers):
+        """Test para recorrer unidades con next_cursor"""
+        for index in range(3):
+            client.post(
+                "/api/v1/checkpoints",
+                json={
+                    "tracking_id": f"CURSORAPI{index}",
+                    "checkpoint_data": {"status": "PICKED_UP"},
+                },
+                headers=auth_headers,
+            )
+        expected = client.get(
+            "/api/v1/shipments?status=PICKED_UP&limit=1000", headers=auth_headers
+        ).get_json()["units"]
+
+        seen = []
+        url = "/api/v1/shipments?status=PICKED_UP&limit=2&cursor="
+        response = client.get(url.rstrip("&cursor="), headers=auth_headers)
+        while True:
+            data = response.get_json()
+            assert response.status_code == 200
+            seen.extend(unit["tracking_id"] for unit in data["units"])
+            if data["next_cursor"] is None:
+                break
+            response = client.get(url + data["next_cursor"], headers=auth_headers)
+
+        assert seen == [unit["tracking_id"] for unit in expected]
+
+    def test_list_units_by_status_invalid_cursor(self, client, auth_headers):
+        """Test para error con cursor inválido"""
+        response = client.get(
+            "/api/v1/shipments?status=CREATED&cursor=basura", headers=auth_headers
+        )
+
+        assert response.status_code == 400
+        assert response.get_json()["error"] == "validation_error"
+
+    def test_list_units_by_status_with_fields(self, client, auth_headers):
+        """Test para listar solo los campos solicitados de cada unidad"""
+        response = client.get(
+            "/api/v1/shipments?status=CREATED&fields=tracking_id,current_status",
+            headers=auth_headers,
+        )
+        invalid = client.get(
+            "/api/v1/shipments?status=CREATED&fields=checkpoints", headers=auth_headers
+        )
+
+        assert response.status_code == 200
+        assert all(
+            set(unit) == {"tracking_id", "current_status"}
+            for unit in response.get_json()["units"]
+        )
+        assert invalid.status_code == 400
+
     def test_list_units_by_status_invalid_status(self, client, auth_headers):
         """Test para error con estado inválido"""
         # Act
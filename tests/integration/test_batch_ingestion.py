@@ -0,0 +1,176 @@
+import json
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+from src.domain.value_objects.checkpoint_data import CheckpointData
+from src.domain.value_objects.tracking_id import TrackingId
+from src.domain.value_objects.unit_status import UnitStatus
+from src.infrastructure.external.batch_jobs import (CheckpointBatchJobs,
+                                                    CheckpointBatchStore)
+from src.infrastructure.external.tasks import ingest_checkpoint_batch
+from src.infrastructure.repositories.unit_repository_impl import \
+    UnitRepositoryImpl
+from tests.fakes import FakeRedis
+
+
+class TestCheckpointBatchIngestion:
+    """Tests de integración para la ingesta asíncrona de lotes de escáneres"""
+
+    def test_task_ingests_batch_in_chunks(self, app):
+        """Test que la tarea registra el lote por bloques y publica su avance"""
+        start = datetime.utcnow() - timedelta(hours=8)
+        statuses = [
+            UnitStatus.PICKED_UP,
+            UnitStatus.IN_TRANSIT,
+            UnitStatus.AT_FACILITY,
+            UnitStatus.DELIVERED,
+        ]
+        # Orden de llegada distinto del cronológico
+        items = [
+            (
+                index,
+                TrackingId("BACKLOG001"),
+                CheckpointData(
+                    status=status, timestamp=start + timedelta(minutes=minutes)
+                ),
+            )
+            for index, (minutes, status) in enumerate(
+                [(30, statuses[1]), (0, statuses[0]), (60, statuses[2])]
+            )
+        ]
+        items.append(
+            (
+                3,
+                TrackingId("BACKLOG001"),
+                CheckpointData(
+                    status=statuses[3], timestamp=start + timedelta(minutes=90)
+                ),
+            )
+        )
+        store = CheckpointBatchStore(FakeRedis())
+        reference = store.put(items)
+
+        with patch.object(
+            CheckpointBatchStore, "from_env", return_value=store
+        ), patch.object(ingest_checkpoint_batch, "update_state") as update_state:
+            result = ingest_checkpoint_batch.apply(
+                args=[reference], kwargs={"chunk_size": 2}
+            ).get()
+
+        assert result["status"] == "completed"
+        assert (result["total"], result["succeeded"], result["failed"]) == (4, 3, 1)
+        assert result["errors"][0]["index"] == 3
+        assert result["errors"][0]["message"] == (
+            "No se puede cambiar de AT_FACILITY a DELIVERED"
+        )
+        assert [
+            call.kwargs["meta"]["processed"] for call in update_state.mock_calls
+        ] == [
+            2,
+            4,
+        ]
+        unit = UnitRepositoryImpl().find_by_tracking_id(TrackingId("BACKLOG001"))
+        assert unit.current_status == UnitStatus.AT_FACILITY
+        assert len(unit.checkpoints) == 3
+        # El lote procesado se elimina del almacén
+        assert store.redis.values == {}
+
+    def test_task_sorts_mixed_timezone_timestamps(self, app):
+        """Test que un lote con timestamps con y sin zona se ordena en UTC"""
+        start = datetime.utcnow() - timedelta(hours=8)
+        items = [
+            (
+                0,
+                TrackingId("BACKLOGTZ1"),
+                CheckpointData(
+                    status=UnitStatus.IN_TRANSIT,
+                    # 30 minutos después del primero, expresado en UTC-5
+                    timestamp=(start + timedelta(minutes=30))
+                    .replace(tzinfo=timezone.utc)
+                    .astimezone(timezone(timedelta(hours=-5))),
+                ),
+            ),
+            (
+                1,
+                TrackingId("BACKLOGTZ1"),
+                CheckpointData(status=UnitStatus.PICKED_UP, timestamp=start),
+            ),
+        ]
+        store = CheckpointBatchStore(FakeRedis())
+        reference = store.put(items)
+
+        with patch.object(
+            CheckpointBatchStore, "from_env", return_value=store
+        ), patch.object(ingest_checkpoint_batch, "update_state"):
+            result = ingest_checkpoint_batch.apply(args=[reference]).get()
+
+        assert result["status"] == "completed"
+        assert (result["succeeded"], result["failed"]) == (2, 0)
+        unit = UnitRepositoryImpl().find_by_tracking_id(TrackingId("BACKLOGTZ1"))
+        assert unit.current_status == UnitStatus.IN_TRANSIT
+        assert unit.checkpoints[-1].timestamp == start + timedelta(minutes=30)
+
+    def test_submit_job_endpoint(self, client, auth_headers):
+        """Test que el endpoint encola los items válidos y reporta los inválidos"""
+        timestamp = (datetime.utcnow() - timedelta(hours=1)).isoformat()
+        body = "\n".join(
+            [
+                json.dumps(
+                    {
+                        "tracking_id": "BACKLOG002",
+                        "checkpoint_data": {
+                            "status": "PICKED_UP",
+                            "timestamp": timestamp,
+                        },
+                    }
+                ),
+                "{no es json",
+                json.dumps(
+                    {
+                        "tracking_id": "BACKLOG003",
+                        "checkpoint_data": {"status": "LOST"},
+                    }
+                ),
+            ]
+        )
+        headers = {**auth_headers, "Content-Type": "application/x-ndjson"}
+
+        with patch.object(
+            CheckpointBatchJobs, "submit", return_value="job-123"
+        ) as submit:
+            response = client.post(
+                "/api/v1/checkpoints/batch/jobs", data=body, headers=headers
+            )
+
+        assert response.status_code == 202
+        data = response.get_json()
+        assert data["job_id"] == "job-123"
+        assert data["status_url"] == "/api/v1/checkpoints/batch/jobs/job-123"
+        assert data["accepted"] == 1
+        assert [item["index"] for item in data["rejected"]] == [1, 2]
+        (items,) = submit.call_args.args
+        assert [(index, str(tracking_id)) for index, tracking_id, _ in items] == [
+            (0, "BACKLOG002")
+        ]
+
+    def test_job_status_endpoint(self, client, auth_headers):
+        """Test que el escáner consulta el avance de su lote"""
+        status = {
+            "job_id": "job-123",
+            "state": "PROGRESS",
+            "progress": {
+                "total": 10,
+                "processed": 5,
+                "succeeded": 5,
+                "duplicates": 0,
+                "failed": 0,
+            },
+        }
+
+        with patch.object(CheckpointBatchJobs, "status", return_value=status):
+            response = client.get(
+                "/api/v1/checkpoints/batch/jobs/job-123", headers=auth_headers
+            )
+
+        assert response.status_code == 200
+        assert response.get_json() == status
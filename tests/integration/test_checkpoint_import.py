@@ -0,0 +1,222 @@
+import json
+
+import pytest
+
+from src.domain.value_objects.tracking_id import TrackingId
+from src.domain.value_objects.unit_status import UnitStatus
+from src.infrastructure.database.checkpoint_import import (CheckpointImporter,
+                                                           ImportProgress,
+                                                           partition_for,
+                                                           split_partitions)
+from src.infrastructure.database.database import db
+from src.infrastructure.database.models import CheckpointModel
+from src.infrastructure.repositories.unit_repository_impl import \
+    UnitRepositoryImpl
+
+CSV_HEADER = "tracking_id,status,timestamp,location,notes,operator_id\n"
+
+
+def write_csv(path, rows):
+    path.write_text(CSV_HEADER + "".join(f"{row}\n" for row in rows))
+    return str(path)
+
+
+class TestCheckpointImport:
+    """Tests de integración para la importación masiva de checkpoints"""
+
+    def test_import_csv_and_ndjson(self, app, tmp_path):
+        """Test que la importación aplica las reglas de dominio por unidad"""
+        csv_path = write_csv(
+            tmp_path / "legacy.csv",
+            [
+                # Fuera de orden en el archivo: se aplican por timestamp
+                "IMPORT001,IN_TRANSIT,2023-05-01T12:00:00,Bogotá,,OP1",
+                "IMPORT001,PICKED_UP,2023-05-01T10:00:00,Bogotá,,OP1",
+                "IMPORT001,PICKED_UP,2023-05-01T10:00:00,Bogotá,,OP1",
+                # Transición inválida y estado desconocido
+                "IMPORT002,DELIVERED,2023-05-01T10:00:00,,,",
+                "IMPORT002,LOST,2023-05-01T11:00:00,,,",
+            ],
+        )
+        ndjson_path = tmp_path / "legacy.ndjson"
+        ndjson_path.write_text(
+            json.dumps(
+                {
+                    "tracking_id": "IMPORT003",
+                    "status": "CREATED",
+                    "timestamp": "2023-05-01T09:00:00Z",
+                }
+            )
+            + "\n"
+            + json.dumps(
+                {
+                    "tracking_id": "IMPORT003",
+                    "status": "PICKED_UP",
+                    "timestamp": "2023-05-01T10:00:00Z",
+                }
+            )
+            + "\n"
+        )
+
+        stats = CheckpointImporter(units_per_chunk=2).run([csv_path, str(ndjson_path)])
+
+        assert stats["units"] == 2
+        assert stats["rows"] == 4
+        assert stats["rejected"] == 2
+        assert stats["duplicates"] == 1
+        repository = UnitRepositoryImpl()
+        unit = repository.find_by_tracking_id(TrackingId("IMPORT001"))
+        assert unit.current_status == UnitStatus.IN_TRANSIT
+        assert unit.version == 1
+        assert [cp.status for cp in unit.checkpoints] == [
+            UnitStatus.PICKED_UP,
+            UnitStatus.IN_TRANSIT,
+        ]
+        assert repository.find_by_tracking_id(TrackingId("IMPORT002")) is None
+        assert (
+            repository.find_by_tracking_id(TrackingId("IMPORT003")).current_status
+            == UnitStatus.PICKED_UP
+        )
+
+    def test_resume_skips_committed_units(self, app, tmp_path):
+        """Test que al reanudar se omiten las unidades ya confirmadas"""
+        csv_path = write_csv(
+            tmp_path / "resume.csv",
+            [
+                f"RESUME00{index},PICKED_UP,2023-05-01T10:00:00,,,"
+                for index in range(1, 5)
+            ],
+        )
+        progress_path = str(tmp_path / "import.state")
+        ImportProgress(progress_path).advance("RESUME002", 2, 2)
+
+        stats = CheckpointImporter(units_per_chunk=1, progress_path=progress_path).run(
+            [csv_path]
+        )
+
+        assert stats["units"] == 2
+        assert ImportProgress(progress_path).state == {
+            "last_tracking_id": "RESUME004",
+            "units": 4,
+            "rows": 4,
+            "partitions": 1,
+        }
+        imported = {
+            row.tracking_id
+            for row in db.session.query(CheckpointModel).filter(
+                CheckpointModel.tracking_id.like("RESUME%")
+            )
+        }
+        assert imported == {"RESUME003", "RESUME004"}
+
+    def test_split_partitions_feeds_each_worker(self, app, tmp_path):
+        """Test que cada partición se importa leyendo solo su archivo"""
+        tracking_ids = [f"SPLIT00{index}" for index in range(1, 7)]
+        csv_path = write_csv(
+            tmp_path / "split.csv",
+            [
+                f"{tracking_id},PICKED_UP,2023-05-01T10:00:00,,,"
+                for tracking_id in tracking_ids
+            ]
+            + ["SPLIT007,LOST,2023-05-01T10:00:00,,,"],
+        )
+
+        runs = split_partitions([csv_path], 2, str(tmp_path), rows_per_run=3)
+        results = [
+            CheckpointImporter(partition=partition, partitions=2).run_sorted(
+                runs[partition]
+            )
+            for partition in range(2)
+        ]
+
+        for partition, result in enumerate(results):
+            assert result["units"] == sum(
+                1
+                for tracking_id in tracking_ids
+                if partition_for(tracking_id, 2) == partition
+            )
+        assert sum(result["rejected"] for result in results) == 1
+        imported = {
+            row.tracking_id
+            for row in db.session.query(CheckpointModel).filter(
+                CheckpointModel.tracking_id.like("SPLIT%")
+            )
+        }
+        assert imported == set(tracking_ids)
+
+    def test_time_ordered_input_is_sorted_externally(self, app, tmp_path):
+        """Test que un export ordenado por tiempo se importa por unidad"""
+        csv_path = write_csv(
+            tmp_path / "by_time.csv",
+            [
+                "BYTIME2,PICKED_UP,2023-05-01T10:00:00,,,",
+                "BYTIME1,PICKED_UP,2023-05-01T10:05:00,,,",
+                "BYTIME2,IN_TRANSIT,2023-05-01T11:00:00,,,",
+                "BYTIME1,IN_TRANSIT,2023-05-01T11:05:00,,,",
+                "BYTIME2,AT_FACILITY,2023-05-01T12:00:00,,,",
+            ],
+        )
+
+        # Corridas de dos filas: las filas de cada unidad quedan repartidas
+        stats = CheckpointImporter(units_per_chunk=1, rows_per_run=2).run([csv_path])
+
+        assert stats["units"] == 2
+        assert stats["rows"] == 5
+        assert stats["rejected"] == 0
+        unit = UnitRepositoryImpl().find_by_tracking_id(TrackingId("BYTIME2"))
+        assert [cp.status for cp in unit.checkpoints] == [
+            UnitStatus.PICKED_UP,
+            UnitStatus.IN_TRANSIT,
+            UnitStatus.AT_FACILITY,
+        ]
+
+    def test_resume_requires_same_workers(self, app, tmp_path):
+        """Test que no se reanuda con otro número de workers"""
+        progress_path = str(tmp_path / "workers.state")
+        ImportProgress(progress_path, partitions=4).advance("RESUME001", 1, 1)
+
+        with pytest.raises(ValueError, match="--workers 4"):
+            CheckpointImporter(partitions=2, progress_path=progress_path)
+        assert ImportProgress(progress_path, partitions=4).last_tracking_id == (
+            "RESUME001"
+        )
+
+    def test_import_command_skips_existing_units(self, app, tmp_path):
+        """Test del comando CLI y de la omisión de unidades existentes"""
+        csv_path = write_csv(
+            tmp_path / "cli.csv",
+            ["CLIIMPORT1,PICKED_UP,2023-05-01T10:00:00,,,"],
+        )
+        runner = app.test_cli_runner()
+
+        first = runner.invoke(args=["tracking", "import", csv_path])
+        second = runner.invoke(args=["tracking", "import", csv_path])
+
+        assert first.exit_code == 0, first.output
+        assert "Importados 1 checkpoints de 1 unidades" in first.output
+        assert "filas/s" in first.output
+        assert "1 unidades existentes omitidas" in second.output
+
+    def test_import_command_rejects_resume_with_other_workers(self, app, tmp_path):
+        """Test que el comando CLI valida el progreso antes de importar"""
+        csv_path = write_csv(
+            tmp_path / "cli-resume.csv",
+            ["CLIRESUME1,PICKED_UP,2023-05-01T10:00:00,,,"],
+        )
+        resume_file = str(tmp_path / "cli.state")
+        ImportProgress(f"{resume_file}.0").advance("CLIRESUME0", 1, 1)
+
+        result = app.test_cli_runner().invoke(
+            args=[
+                "tracking",
+                "import",
+                csv_path,
+                "--workers",
+                "2",
+                "--resume-file",
+                resume_file,
+            ]
+        )
+
+        assert result.exit_code != 0
+        assert "--workers 1" in result.output
@@ -0,0 +1,694 @@
+from datetime import datetime, timedelta
+from unittest.mock import Mock
+
+import pytest
+from sqlalchemy import event, text
+
+from src.application.use_cases.register_checkpoint import \
+    RegisterCheckpointUseCase
+from src.domain.entities.checkpoint import Checkpoint
+from src.domain.entities.unit import Unit
+from src.domain.exceptions import ConcurrentModificationError
+from src.domain.value_objects.checkpoint_data import CheckpointData
+from src.domain.value_objects.tracking_id import TrackingId
+from src.domain.value_objects.unit_status import UnitStatus
+from src.infrastructure.database.database import db, insert_ignoring_duplicates
+from src.infrastructure.database.models import (CheckpointModel,
+                                                OutboxMessageModel)
+from src.infrastructure.external.outbox import (SEND_NOTIFICATION_TASK,
+                                                OutboxRelay)
+from src.infrastructure.external.tasks import deduplicate_checkpoints
+from src.infrastructure.repositories.checkpoint_repository_impl import \
+    CheckpointRepositoryImpl
+from src.infrastructure.repositories.unit_repository_impl import \
+    UnitRepositoryImpl
+
+CYCLE = [UnitStatus.IN_TRANSIT, UnitStatus.AT_FACILITY]
+
+
+def build_unit(tracking_id: str, start: datetime) -> Unit:
+    """Crea una unidad recogida con timestamp controlado"""
+    unit = Unit(
+        tracking_id=TrackingId(tracking_id),
+        current_status=UnitStatus.CREATED,
+        created_at=start,
+        updated_at=start,
+        checkpoints=[],
+    )
+    unit.add_checkpoint(CheckpointData(status=UnitStatus.PICKED_UP, timestamp=start))
+    return unit
+
+
+def grow_history(unit: Unit, start: datetime, count: int) -> None:
+    """Agrega checkpoints alternando IN_TRANSIT y AT_FACILITY"""
+    offset = len(unit.checkpoints)
+    for step in range(offset, offset + count):
+        unit.add_checkpoint(
+            CheckpointData(
+                status=CYCLE[step % 2], timestamp=start + timedelta(seconds=step)
+            )
+        )
+
+
+def count_statements(callback):
+    """Ejecuta el callback y retorna el número de sentencias SQL emitidas"""
+    statements = []
+
+    def on_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", on_execute)
+    try:
+        callback()
+    finally:
+        event.remove(db.engine, "before_cursor_execute", on_execute)
+    return len(statements)
+
+
+class TestUnitRepositoryAppendOnly:
+    """Tests de integración para la escritura append-only de unidades"""
+
+    def test_save_inserts_only_pending_checkpoints(self, app):
+        """Test que save solo inserta los checkpoints nuevos"""
+        repository = UnitRepositoryImpl()
+        start = datetime.utcnow() - timedelta(hours=1)
+        unit = repository.save(build_unit("APPEND001", start))
+
+        grow_history(unit, start, 1)
+        repository.save(unit)
+
+        rows = (
+            db.session.query(CheckpointModel).filter_by(tracking_id="APPEND001").all()
+        )
+        assert len(rows) == 2
+        assert unit.get_pending_checkpoints() == []
+
+        reloaded = repository.find_by_tracking_id(TrackingId("APPEND001"))
+        assert reloaded.current_status == UnitStatus.AT_FACILITY
+        assert [cp.status for cp in reloaded.checkpoints] == [
+            UnitStatus.PICKED_UP,
+            UnitStatus.AT_FACILITY,
+        ]
+
+    def test_append_cost_is_independent_of_history(self, app):
+        """Test que el número de sentencias por append no crece con el historial"""
+        repository = UnitRepositoryImpl()
+        start = datetime.utcnow() - timedelta(hours=1)
+
+        short_unit = repository.save(build_unit("APPEND-SHORT", start))
+        grow_history(short_unit, start, 2)
+        repository.save(short_unit)
+
+        long_unit = repository.save(build_unit("APPEND-LONG", start))
+        grow_history(long_unit, start, 50)
+        repository.save(long_unit)
+
+        grow_history(short_unit, start, 1)
+        grow_history(long_unit, start, 1)
+
+        assert count_statements(
+            lambda: repository.save(short_unit)
+        ) == count_statements(lambda: repository.save(long_unit))
+
+    def test_concurrent_writers_are_detected(self, app):
+        """Test que una escritura sobre una versión obsoleta se rechaza"""
+        repository = UnitRepositoryImpl()
+        start = datetime.utcnow() - timedelta(hours=1)
+        repository.save(build_unit("CAS001", start))
+
+        # Dos requests cargan la unidad antes de que el otro escriba
+        first = repository.find_by_tracking_id(TrackingId("CAS001"))
+        second = repository.find_by_tracking_id(TrackingId("CAS001"))
+        grow_history(first, start, 1)
+        grow_history(second, start + timedelta(milliseconds=500), 1)
+
+        repository.save(first)
+        with pytest.raises(ConcurrentModificationError):
+            repository.save(second)
+
+        reloaded = repository.find_by_tracking_id(TrackingId("CAS001"))
+        assert reloaded.version == first.version == 2
+        assert len(reloaded.checkpoints) == 2
+
+    def test_duplicate_unit_creation_does_not_abort_transaction(self, app):
+        """Test que crear una unidad ya existente no produce IntegrityError"""
+        repository = UnitRepositoryImpl()
+        start = datetime.utcnow() - timedelta(hours=1)
+        winner = repository.save(build_unit("RACE001", start))
+
+        with pytest.raises(ConcurrentModificationError):
+            repository.save(build_unit("RACE001", start))
+
+        reloaded = repository.find_by_tracking_id(TrackingId("RACE001"))
+        assert reloaded.id == winner.id
+        assert len(reloaded.checkpoints) == 1
+
+    def test_first_scan_race_applies_on_existing_unit(self, app):
+        """Test que dos primeros escaneos concurrentes terminan en una unidad"""
+        start = datetime.utcnow() - timedelta(hours=1)
+
+        class RacingRepository(UnitRepositoryImpl):
+            """Otro escáner crea la unidad entre la lectura y la escritura"""
+
+            reads = 0
+
+            def find_by_tracking_id(self, tracking_id):
+                self.reads += 1
+                if self.reads == 1:
+                    UnitRepositoryImpl().save(build_unit("RACE002", start))
+                    return None
+                return super().find_by_tracking_id(tracking_id)
+
+        repository = RacingRepository()
+        use_case = RegisterCheckpointUseCase(
+            unit_repository=repository,
+            retry_backoff=0,
+        )
+
+        result = use_case.execute(
+            TrackingId("RACE002"),
+            CheckpointData(
+                status=UnitStatus.EXCEPTION, timestamp=start + timedelta(minutes=1)
+            ),
+        )
+
+        assert result["unit"]["current_status"] == "EXCEPTION"
+        assert repository.reads == 2
+        assert (
+            db.session.query(CheckpointModel).filter_by(tracking_id="RACE002").count()
+            == 2
+        )
+
+    def test_group_registers_checkpoints_in_one_transaction(self, app):
+        """Test que un grupo de requests se confirma con un solo commit"""
+        repository = UnitRepositoryImpl()
+        start = datetime.utcnow() - timedelta(hours=1)
+        repository.save(build_unit("GROUPCOMMIT1", start))
+        use_case = RegisterCheckpointUseCase(
+            unit_repository=repository,
+        )
+        commits = []
+
+        def on_commit(conn):
+            commits.append(conn)
+
+        event.listen(db.engine, "commit", on_commit)
+        try:
+            outcomes = use_case.execute_group(
+                [
+                    (
+                        TrackingId("GROUPCOMMIT1"),
+                        CheckpointData(
+                            status=UnitStatus.IN_TRANSIT,
+                            timestamp=start + timedelta(minutes=1),
+                        ),
+                    ),
+                    (
+                        TrackingId("GROUPCOMMIT2"),
+                        CheckpointData(
+                            status=UnitStatus.DELIVERED,
+                            timestamp=start + timedelta(minutes=1),
+                        ),
+                    ),
+                    (
+                        TrackingId("GROUPCOMMIT1"),
+                        CheckpointData(
+                            status=UnitStatus.AT_FACILITY,
+                            timestamp=start + timedelta(minutes=2),
+                        ),
+                    ),
+                ]
+            )
+        finally:
+            event.remove(db.engine, "commit", on_commit)
+
+        assert len(commits) == 1
+        assert outcomes[0]["unit"]["current_status"] == "IN_TRANSIT"
+        assert str(outcomes[1]) == "No se puede cambiar de CREATED a DELIVERED"
+        assert outcomes[2]["unit"]["current_status"] == "AT_FACILITY"
+        reloaded = repository.find_by_tracking_id(TrackingId("GROUPCOMMIT1"))
+        assert reloaded.version == 2
+        assert len(reloaded.checkpoints) == 3
+        assert repository.find_by_tracking_id(TrackingId("GROUPCOMMIT2")) is None
+
+    def test_find_by_status_paginates_in_sql(self, app):
+        """Test que las páginas por estado se recortan con LIMIT/OFFSET"""
+        repository = UnitRepositoryImpl()
+        start = datetime.utcnow() - timedelta(hours=1)
+        for index in range(5):
+            repository.save(
+                build_unit(f"PAGE{index:03d}", start + timedelta(seconds=index))
+            )
+
+        total = repository.count_by_status(UnitStatus.PICKED_UP)
+        everything = [
+            str(unit.tracking_id)
+            for unit in repository.find_by_status(UnitStatus.PICKED_UP)
+        ]
+        statements = []
+
+        def on_execute(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(db.engine, "before_cursor_execute", on_execute)
+        try:
+            pages = [
+                repository.find_by_status(UnitStatus.PICKED_UP, limit=2, offset=offset)
+                for offset in range(0, total, 2)
+            ]
+        finally:
+            event.remove(db.engine, "before_cursor_execute", on_execute)
+
+        assert len(everything) == total >= 5
+        assert [str(unit.tracking_id) for page in pages for unit in page] == everything
+        assert all(len(page) <= 2 for page in pages)
+        assert "LIMIT" in statements[0]
+
+    def test_list_queries_load_checkpoints_in_batch(self, app):
+        """Test que una página carga sus checkpoints sin una consulta por unidad"""
+        repository = UnitRepositoryImpl()
+        start = datetime.utcnow() - timedelta(hours=1)
+        for index in range(100):
+            unit = build_unit(f"NPLUS{index:03d}", start + timedelta(seconds=index))
+            grow_history(unit, start + timedelta(seconds=index), 2)
+            repository.save(unit)
+        pages = {}
+
+        def load(name, page):
+            db.session.expunge_all()
+            pages[name] = page()
+
+        counts = [
+            count_statements(
+                lambda: load(
+                    "small",
+                    lambda: repository.find_by_status(UnitStatus.IN_TRANSIT, limit=10),
+                )
+            ),
+            count_statements(
+                lambda: load(
+                    "page",
+                    lambda: repository.find_by_status(UnitStatus.IN_TRANSIT, limit=100),
+                )
+            ),
+            count_statements(
+                lambda: load("all", lambda: repository.find_all(limit=100))
+            ),
+        ]
+
+        assert len(pages["page"]) == 100
+        assert all(
+            len(unit.checkpoints) == 3
+            for unit in pages["page"]
+            if str(unit.tracking_id).startswith("NPLUS")
+        )
+        assert counts == [2, 2, 2]
+
+    def test_summaries_match_entities_in_one_query(self, app):
+        """Test que los resúmenes coinciden con las entidades en una consulta"""
+        repository = UnitRepositoryImpl()
+        start = datetime.utcnow() - timedelta(hours=1)
+        unit = build_unit("SUMMARY001", start)
+        for step, status in enumerate(
+            [
+                UnitStatus.IN_TRANSIT,
+                UnitStatus.AT_FACILITY,
+                UnitStatus.OUT_FOR_DELIVERY,
+                UnitStatus.DELIVERED,
+            ],
+            start=1,
+        ):
+            unit.add_checkpoint(
+                CheckpointData(status=status, timestamp=start + timedelta(minutes=step))
+            )
+        repository.save(unit)
+
+        for status in (UnitStatus.PICKED_UP, UnitStatus.DELIVERED):
+            entities = repository.find_by_status(status, limit=50)
+            pages = {}
+            statements = count_statements(
+                lambda: pages.setdefault(
+                    "summaries", repository.find_summaries_by_status(status, limit=50)
+                )
+            )
+
+            assert statements == 1
+            assert [summary.to_dict() for summary in pages["summaries"]] == [
+                {key: entity.to_dict()[key] for key in pages["summaries"][0].to_dict()}
+                for entity in entities
+            ]
+
+        (delivered,) = [
+            summary
+            for summary in repository.find_summaries_by_status(UnitStatus.DELIVERED)
+            if summary.tracking_id == "SUMMARY001"
+        ]
+        assert delivered.delivered_at == start + timedelta(minutes=4)
+
+    def test_find_by_status_after_key_is_stable(self, app):
+        """Test que el keyset no repite ni salta unidades ante inserciones"""
+        repository = UnitRepositoryImpl()
+        start = datetime.utcnow() - timedelta(hours=1)
+        for index in range(4):
+            repository.save(
+                build_unit(f"KEYSET{index:03d}", start + timedelta(seconds=index))
+            )
+        everything = repository.find_by_status(UnitStatus.PICKED_UP)
+
+        first_page = repository.find_by_status(UnitStatus.PICKED_UP, limit=2)
+        # Una unidad nueva al inicio desplazaría las páginas por offset
+        repository.save(
+            build_unit("KEYSET-NEW", first_page[0].created_at - timedelta(seconds=1))
+        )
+        last = first_page[-1]
+        rest = repository.find_by_status(
+            UnitStatus.PICKED_UP, after=(last.created_at, last.id)
+        )
+
+        assert [unit.id for unit in first_page + rest] == [
+            unit.id for unit in everything
+        ]
+
+    def test_batch_update_detects_stale_versions(self, app):
+        """Test que el UPDATE masivo del lote también es compare-and-swap"""
+        repository = UnitRepositoryImpl()
+        start = datetime.utcnow() - timedelta(hours=1)
+        repository.save(build_unit("CAS002", start))
+
+        stale = repository.find_by_tracking_id(TrackingId("CAS002"))
+        current = repository.find_by_tracking_id(TrackingId("CAS002"))
+        grow_history(current, start, 1)
+        repository.save(current)
+
+        grow_history(stale, start + timedelta(milliseconds=500), 1)
+        with pytest.raises(ConcurrentModificationError):
+            repository.save_batch([], [stale], [])
+
+        assert (
+            db.session.query(CheckpointModel).filter_by(tracking_id="CAS002").count()
+            == 2
+        )
+
+    def test_batch_update_is_one_statement_without_multi_rowcount(
+        self, app, monkeypatch
+    ):
+        """Test que el compare-and-swap del lote no depende del rowcount"""
+        repository = UnitRepositoryImpl()
+        start = datetime.utcnow() - timedelta(hours=1)
+        units = []
+        for index in range(3):
+            repository.save(build_unit(f"CASBULK{index}", start))
+            unit = repository.find_by_tracking_id(TrackingId(f"CASBULK{index}"))
+            grow_history(unit, start, 1)
+            units.append(unit)
+        # psycopg2 no reporta el total de filas de un executemany
+        monkeypatch.setattr(
+            db.engine.dialect, "supports_sane_multi_rowcount", False, raising=False
+        )
+        updates = []
+
+        def on_execute(conn, cursor, statement, *args):
+            if statement.startswith("UPDATE units"):
+                updates.append(statement)
+
+        event.listen(db.engine, "before_cursor_execute", on_execute)
+        try:
+            repository.save_batch([], units, [])
+        finally:
+            event.remove(db.engine, "before_cursor_execute", on_execute)
+
+        assert len(updates) == 1
+        assert [
+            repository.find_by_tracking_id(TrackingId(f"CASBULK{index}")).version
+            for index in range(3)
+        ] == [2, 2, 2]
+
+        # Solo la unidad modificada por otra escritura se reporta
+        stale = [
+            repository.find_by_tracking_id(TrackingId(f"CASBULK{index}"))
+            for index in range(3)
+        ]
+        concurrent = repository.find_by_tracking_id(TrackingId("CASBULK1"))
+        grow_history(concurrent, start + timedelta(minutes=1), 1)
+        repository.save(concurrent)
+        for unit in stale:
+            grow_history(unit, start + timedelta(minutes=2), 1)
+        with pytest.raises(ConcurrentModificationError, match="CASBULK1$"):
+            repository.save_batch([], stale, [])
+
+    def test_full_rewrite_mode_keeps_history(self, app):
+        """Test que el modo legado sigue reescribiendo el historial completo"""
+        repository = UnitRepositoryImpl(append_only=False)
+        start = datetime.utcnow() - timedelta(hours=1)
+        unit = repository.save(build_unit("REWRITE001", start))
+
+        grow_history(unit, start, 3)
+        saved = repository.save(unit)
+
+        assert len(saved.checkpoints) == 4
+        assert (
+            db.session.query(CheckpointModel)
+            .filter_by(tracking_id="REWRITE001")
+            .count()
+            == 4
+        )
+
+
+class TestCheckpointHistory:
+    """Tests de integración para el historial paginado de checkpoints"""
+
+    def test_history_pages_newest_first_from_index(self, app):
+        """Test que el historial se pagina por keyset sobre su índice"""
+        start = datetime.utcnow() - timedelta(hours=1)
+        unit = build_unit("HISTORY001", start)
+        grow_history(unit, start, 8)
+        UnitRepositoryImpl().save(unit)
+        repository = CheckpointRepositoryImpl()
+        tracking_id = TrackingId("HISTORY001")
+
+        pages, before = [], None
+        while True:
+            page = repository.find_views_by_tracking_id(
+                tracking_id,
+                fields=("status",),
+                limit=4,
+                before=before,
+                newest_first=True,
+            )
+            if not page:
+                break
+            pages.append(page)
+            before = (page[-1].timestamp, page[-1].id)
+        plan = db.session.execute(
+            text(
+                "EXPLAIN QUERY PLAN SELECT id, timestamp FROM checkpoints "
+                "WHERE tracking_id = 'HISTORY001' ORDER BY timestamp DESC, id DESC"
+            )
+        ).all()
+
+        history = [view for page in pages for view in page]
+        assert [len(page) for page in pages] == [4, 4, 1]
+        assert [view.timestamp for view in history] == sorted(
+            (cp.timestamp for cp in unit.checkpoints), reverse=True
+        )
+        assert history[0].location is None
+        assert repository.count_by_tracking_id(tracking_id) == 9
+        assert "ix_checkpoints_tracking_timestamp" in str(plan)
+
+
+class TestCheckpointDeduplication:
+    """Tests de integración para la deduplicación de checkpoints por huella"""
+
+    def test_duplicate_scans_are_skipped_on_insert(self, app):
+        """Test que un escaneo repetido no genera una segunda fila"""
+        repository = UnitRepositoryImpl()
+        start = datetime.utcnow() - timedelta(hours=1)
+        unit = repository.save(build_unit("DEDUP001", start))
+        scan = unit.checkpoints[0]
+
+        # Reenvío de un escaneo ya persistido (p. ej. entrega at-least-once)
+        rows = repository._checkpoint_rows(unit.id, unit.tracking_id, [scan])
+        db.session.execute(
+            insert_ignoring_duplicates(CheckpointModel, "fingerprint"), rows
+        )
+        db.session.commit()
+
+        rows = db.session.query(CheckpointModel).filter_by(tracking_id="DEDUP001")
+        assert rows.count() == 1
+        assert rows.first().fingerprint == scan.fingerprint("DEDUP001")
+
+    def test_duplicate_write_does_not_advance_unit(self, app):
+        """Test que una escritura con solo escaneos registrados no cambia la unidad"""
+        repository = UnitRepositoryImpl()
+        start = datetime.utcnow() - timedelta(hours=1)
+        repository.save(build_unit("DEDUP003", start))
+
+        # Dos requests aplican el mismo escaneo sobre la misma versión
+        first = repository.find_by_tracking_id(TrackingId("DEDUP003"))
+        second = repository.find_by_tracking_id(TrackingId("DEDUP003"))
+        grow_history(first, start, 1)
+        grow_history(second, start, 1)
+        scan = second.checkpoints[-1]
+        checkpoint = Checkpoint.create(second.tracking_id, scan)
+
+        assert repository.save_batch([], [first], []) == set()
+        duplicates = repository.save_with_checkpoint(second, checkpoint)
+
+        assert duplicates == {scan.fingerprint("DEDUP003")}
+        assert second.version == 1
+        reloaded = repository.find_by_tracking_id(TrackingId("DEDUP003"))
+        assert reloaded.version == 2
+        assert len(reloaded.checkpoints) == 2
+        assert (
+            db.session.query(CheckpointModel).filter_by(id=checkpoint.id).count() == 0
+        )
+
+    def test_backfill_removes_existing_duplicates(self, app):
+        """Test que el backfill calcula huellas y elimina duplicados por bloques"""
+        timestamp = datetime.utcnow() - timedelta(hours=1)
+        for index in range(5):
+            db.session.add(
+                CheckpointModel(
+                    id=f"legacy-{index}",
+                    tracking_id="DEDUP002",
+                    status="PICKED_UP",
+                    # Tres escaneos repetidos y dos distintos
+                    timestamp=timestamp + timedelta(minutes=max(index - 2, 0)),
+                    created_at=timestamp + timedelta(seconds=index),
+                )
+            )
+        db.session.commit()
+
+        result = deduplicate_checkpoints.apply(kwargs={"chunk_size": 2}).get()
+
+        assert result["deleted"] == 2
+        rows = (
+            db.session.query(CheckpointModel)
+            .filter_by(tracking_id="DEDUP002")
+            .order_by(CheckpointModel.timestamp)
+            .all()
+        )
+        assert [row.id for row in rows] == ["legacy-0", "legacy-3", "legacy-4"]
+        assert all(row.fingerprint for row in rows)
+
+    def test_backfill_keeps_unit_link_of_double_written_scans(self, app):
+        """Test que el backfill no quita escaneos del historial de la unidad"""
+        repository = UnitRepositoryImpl()
+        start = datetime.utcnow() - timedelta(hours=1)
+        unit = repository.save(build_unit("DEDUP004", start))
+        unit_id = unit.id
+        # Filas legadas: la huérfana se escribió antes que la de la unidad
+        db.session.query(CheckpointModel).filter_by(tracking_id="DEDUP004").delete()
+        for index, status in enumerate(["PICKED_UP", "IN_TRANSIT"]):
+            timestamp = start + timedelta(minutes=index)
+            for owner in (None, unit_id):
+                db.session.add(
+                    CheckpointModel(
+                        tracking_id="DEDUP004",
+                        status=status,
+                        timestamp=timestamp,
+                        unit_id=owner,
+                        created_at=timestamp + timedelta(seconds=owner is not None),
+                    )
+                )
+        db.session.commit()
+
+        result = deduplicate_checkpoints.apply(kwargs={"chunk_size": 1}).get()
+
+        assert result["deleted"] >= 2
+        rows = (
+            db.session.query(CheckpointModel)
+            .filter_by(tracking_id="DEDUP004")
+            .order_by(CheckpointModel.timestamp)
+            .all()
+        )
+        assert [row.status for row in rows] == ["PICKED_UP", "IN_TRANSIT"]
+        assert all(row.unit_id == unit_id for row in rows)
+        history = repository.find_by_tracking_id(TrackingId("DEDUP004"))
+        assert [cp.status for cp in history.checkpoints] == [
+            UnitStatus.PICKED_UP,
+            UnitStatus.IN_TRANSIT,
+        ]
+
+
+class TestCheckpointOutbox:
+    """Tests de integración para el outbox de tareas asíncronas"""
+
+    def setup_method(self):
+        self.published = []
+
+    def send_task(self, name, args=None, kwargs=None):
+        self.published.append((name, args))
+
+    def test_save_writes_outbox_in_same_transaction(self, app):
+        """Test que cada checkpoint nuevo deja sus tareas en el outbox"""
+        db.session.query(OutboxMessageModel).delete()
+        repository = UnitRepositoryImpl()
+        start = datetime.utcnow() - timedelta(hours=1)
+        unit = repository.save(build_unit("OUTBOX001", start))
+
+        unit.add_checkpoint(
+            CheckpointData(
+                status=UnitStatus.EXCEPTION, timestamp=start + timedelta(minutes=1)
+            )
+        )
+        repository.save(unit)
+
+        task_names = [
+            message.task_name for message in db.session.query(OutboxMessageModel)
+        ]
+        # process_checkpoint por cada checkpoint y una notificación por EXCEPTION
+        assert len(task_names) == 3
+        assert task_names.count(SEND_NOTIFICATION_TASK) == 1
+
+    def test_duplicate_scans_write_no_outbox(self, app):
+        """Test que un escaneo omitido por duplicado no vuelve a notificarse"""
+        db.session.query(OutboxMessageModel).delete()
+        repository = UnitRepositoryImpl()
+        start = datetime.utcnow() - timedelta(hours=1)
+        repository.save(build_unit("OUTBOX004", start))
+        scan = CheckpointData(
+            status=UnitStatus.EXCEPTION, timestamp=start + timedelta(minutes=1)
+        )
+        # Tres requests aplican el mismo escaneo sobre la misma versión
+        first, second, third = (
+            repository.find_by_tracking_id(TrackingId("OUTBOX004")) for _ in range(3)
+        )
+        for unit in (first, second, third):
+            unit.add_checkpoint(scan)
+        repository.save(first)
+        before = db.session.query(OutboxMessageModel).count()
+
+        repository.save_batch([], [second], [])
+        repository.save_with_checkpoint(
+            third, Checkpoint.create(third.tracking_id, scan)
+        )
+
+        assert db.session.query(OutboxMessageModel).count() == before
+
+    def test_relay_publishes_and_marks_sent(self, app):
+        """Test que el relay publica los pendientes y los marca como enviados"""
+        db.session.query(OutboxMessageModel).delete()
+        repository = UnitRepositoryImpl()
+        repository.save(build_unit("OUTBOX002", datetime.utcnow()))
+        relay = OutboxRelay(batch_size=10, publisher=self)
+
+        assert relay.relay_once() == 1
+        assert self.published[0][1][0] == "OUTBOX002"
+        assert relay.backlog() == 0
+        assert relay.relay_once() == 0
+
+    def test_relay_keeps_messages_when_broker_fails(self, app):
+        """Test que un error del broker deja el mensaje pendiente"""
+        db.session.query(OutboxMessageModel).delete()
+        repository = UnitRepositoryImpl()
+        repository.save(build_unit("OUTBOX003", datetime.utcnow()))
+        broker = Mock()
+        broker.send_task.side_effect = ConnectionError("redis down")
+
+        assert OutboxRelay(publisher=broker).relay_once() == 0
+
+        message = db.session.query(OutboxMessageModel).one()
+        assert message.sent_at is None
+        assert message.attempts == 1
+        assert "redis down" in message.last_error
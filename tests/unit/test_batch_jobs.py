@@ -0,0 +1,82 @@
+import zlib
+from datetime import datetime, timedelta
+from unittest.mock import Mock
+
+import pytest
+
+from src.domain.value_objects.checkpoint_data import CheckpointData
+from src.domain.value_objects.tracking_id import TrackingId
+from src.domain.value_objects.unit_status import UnitStatus
+from src.infrastructure.external.batch_jobs import (INGEST_TASK,
+                                                    CheckpointBatchJobs,
+                                                    CheckpointBatchStore)
+from tests.fakes import FakeRedis
+
+
+class TestCheckpointBatchJobs:
+    """Tests para el almacén y la cola de lotes de ingesta asíncrona"""
+
+    def setup_method(self):
+        """Setup para cada test"""
+        self.redis = FakeRedis()
+        self.store = CheckpointBatchStore(self.redis)
+        self.publisher = Mock()
+        self.jobs = CheckpointBatchJobs(self.store, publisher=self.publisher)
+        self.items = [
+            (
+                index,
+                TrackingId(f"BACKLOG{index:03d}"),
+                CheckpointData(
+                    status=UnitStatus.PICKED_UP,
+                    timestamp=datetime.utcnow() - timedelta(hours=1),
+                    location="Bogotá",
+                ),
+            )
+            for index in range(3)
+        ]
+
+    def test_store_roundtrip_is_compressed(self):
+        """Test que el lote se guarda comprimido y se reconstruye igual"""
+        reference = self.store.put(self.items)
+
+        stored = self.redis.get(f"checkpoints:batch:{reference}")
+        assert zlib.decompress(stored).startswith(b"[")
+        assert self.store.get(reference) == self.items
+
+        self.store.delete(reference)
+        with pytest.raises(ValueError, match="Lote no encontrado"):
+            self.store.get(reference)
+
+    def test_submit_enqueues_reference_only(self):
+        """Test que la tarea recibe la referencia del lote, no sus items"""
+        job_id = self.jobs.submit(self.items)
+
+        self.publisher.send_task.assert_called_once_with(
+            INGEST_TASK, args=[job_id], task_id=job_id
+        )
+        assert len(self.store.get(job_id)) == 3
+
+    def test_status_reports_progress(self):
+        """Test del estado de un trabajo en curso y de uno fallido"""
+        self.publisher.AsyncResult.return_value = Mock(
+            state="PROGRESS",
+            info={"total": 10, "processed": 4, "succeeded": 3, "failed": 1},
+        )
+        assert self.jobs.status("job-1") == {
+            "job_id": "job-1",
+            "state": "PROGRESS",
+            "progress": {
+                "total": 10,
+                "processed": 4,
+                "succeeded": 3,
+                "duplicates": 0,
+                "failed": 1,
+            },
+        }
+
+        self.publisher.AsyncResult.return_value = Mock(
+            state="FAILURE", info=ValueError("Lote no encontrado o expirado: job-2")
+        )
+        assert self.jobs.status("job-2")["error"] == (
+            "Lote no encontrado o expirado: job-2"
+        )
@@ -0,0 +1,188 @@
+from datetime import datetime, timedelta
+from unittest.mock import Mock
+
+import pytest
+
+from src.domain.value_objects.checkpoint_data import CheckpointData
+from src.domain.value_objects.tracking_id import TrackingId
+from src.domain.value_objects.unit_status import UnitStatus
+from src.infrastructure.external.checkpoint_stream import (
+    CheckpointStream, CheckpointStreamConsumer)
+from src.infrastructure.monitoring.metrics import metrics
+from tests.fakes import FakeRedis
+
+
+def success(items):
+    """Resultado del caso de uso de lote con todos los items exitosos"""
+    return {
+        "results": [{"tracking_id": str(tid), "status": "success"} for tid, _ in items]
+    }
+
+
+class TestCheckpointStream:
+    """Tests para el buffer de ingesta sobre Redis Streams"""
+
+    def setup_method(self):
+        """Setup para cada test"""
+        self.redis = FakeRedis()
+        self.stream = CheckpointStream(self.redis, partitions=4)
+        self.stream.ensure_groups()
+        self.batch_use_case = Mock()
+        self.batch_use_case.execute.side_effect = success
+        self.consumer = CheckpointStreamConsumer(
+            stream=self.stream,
+            batch_use_case=self.batch_use_case,
+            consumer_name="worker-0",
+            partitions=[0, 1, 2, 3],
+            block_ms=0,
+        )
+        self.start = datetime.utcnow() - timedelta(hours=1)
+
+    def checkpoint(self, status: UnitStatus, minutes: int) -> CheckpointData:
+        return CheckpointData(
+            status=status,
+            timestamp=self.start + timedelta(minutes=minutes),
+            location="Bogotá",
+        )
+
+    def test_partition_is_stable_per_tracking_id(self):
+        """Test que un tracking ID siempre cae en la misma partición"""
+        tracking_id = TrackingId("STREAM001")
+        receipts = [
+            self.stream.publish(tracking_id, self.checkpoint(UnitStatus.PICKED_UP, i))
+            for i in range(3)
+        ]
+
+        partitions = {receipt.split(":")[0] for receipt in receipts}
+        assert partitions == {str(self.stream.partition_for(tracking_id))}
+
+    def test_encode_decode_roundtrip(self):
+        """Test que un checkpoint se reconstruye igual desde el stream"""
+        tracking_id = TrackingId("STREAM001")
+        checkpoint_data = self.checkpoint(UnitStatus.PICKED_UP, 1)
+
+        decoded = self.stream.decode(self.stream.encode(tracking_id, checkpoint_data))
+
+        assert decoded == (tracking_id, checkpoint_data)
+
+    def test_consumer_preserves_order_and_acknowledges(self):
+        """Test que el consumidor entrega en orden y confirma tras persistir"""
+        tracking_id = TrackingId("STREAM001")
+        statuses = [UnitStatus.PICKED_UP, UnitStatus.IN_TRANSIT, UnitStatus.AT_FACILITY]
+        for minutes, status in enumerate(statuses):
+            self.stream.publish(tracking_id, self.checkpoint(status, minutes))
+
+        acknowledged = self.consumer.drain_once()
+
+        assert acknowledged == 3
+        items = self.batch_use_case.execute.call_args.args[0]
+        assert [data.status for _, data in items] == statuses
+        partition = self.stream.partition_for(tracking_id)
+        assert self.redis.xlen(self.stream.stream_name(partition)) == 0
+
+    def test_failed_entries_are_redelivered(self):
+        """Test de semántica at-least-once ante un error de persistencia"""
+        tracking_id = TrackingId("STREAM001")
+        self.stream.publish(tracking_id, self.checkpoint(UnitStatus.PICKED_UP, 1))
+        self.batch_use_case.execute.side_effect = lambda items: {
+            "results": [
+                {
+                    "tracking_id": str(tid),
+                    "status": "error",
+                    "error": "internal_error",
+                    "message": "db down",
+                }
+                for tid, _ in items
+            ]
+        }
+
+        assert self.consumer.drain_once() == 0
+        assert self.consumer.last_failed == 1
+
+        self.batch_use_case.execute.side_effect = success
+        assert self.consumer.drain_once() == 1
+        assert self.batch_use_case.execute.call_count == 2
+
+    def test_rejected_checkpoints_are_acknowledged(self):
+        """Test que un checkpoint rechazado por el dominio no se reintenta"""
+        tracking_id = TrackingId("STREAM001")
+        self.stream.publish(tracking_id, self.checkpoint(UnitStatus.DELIVERED, 1))
+        self.batch_use_case.execute.side_effect = lambda items: {
+            "results": [
+                {
+                    "tracking_id": str(tid),
+                    "status": "error",
+                    "error": "business_error",
+                    "message": "No se puede cambiar de CREATED a DELIVERED",
+                }
+                for tid, _ in items
+            ]
+        }
+
+        assert self.consumer.drain_once() == 1
+        assert self.consumer.drain_once() == 0
+
+    def test_orphaned_entries_are_claimed(self):
+        """Test que las entradas de un consumidor caído se recuperan"""
+        tracking_id = TrackingId("STREAM001")
+        self.stream.publish(tracking_id, self.checkpoint(UnitStatus.PICKED_UP, 1))
+        partition = self.stream.partition_for(tracking_id)
+        self.redis.xreadgroup(
+            self.stream.group,
+            "crashed-worker",
+            {self.stream.stream_name(partition): ">"},
+        )
+
+        self.consumer.claim_idle_ms = 0
+        assert self.consumer.drain_once() == 1
+
+    def test_lag_metric(self):
+        """Test para la métrica de lag por partición"""
+        tracking_id = TrackingId("STREAM001")
+        partition = self.stream.partition_for(tracking_id)
+        for minutes in range(2):
+            self.stream.publish(
+                tracking_id, self.checkpoint(UnitStatus.PICKED_UP, minutes)
+            )
+
+        lags = self.consumer.report_lag()
+
+        assert lags[partition] == 2
+        assert (
+            metrics.get_gauge("checkpoint_stream_lag", tags={"partition": partition})
+            == 2
+        )
+
+
+class TestStreamIngestionMode:
+    """Tests para el registro de checkpoints en modo write-behind"""
+
+    def test_register_checkpoint_returns_receipt(self, app, sample_checkpoint_data):
+        """Test que en modo stream el registro responde 202 sin escribir en BD"""
+        from src.presentation.controllers.checkpoint_controller import \
+            CheckpointController
+
+        redis_client = FakeRedis()
+        stream = CheckpointStream(redis_client, partitions=2)
+        register_use_case = Mock()
+        controller = CheckpointController(
+            register_checkpoint_use_case=register_use_case,
+            get_tracking_history_use_case=Mock(),
+            list_units_by_status_use_case=Mock(),
+            register_checkpoint_batch_use_case=Mock(),
+            checkpoint_stream=stream,
+        )
+        payload = {
+            "tracking_id": "STREAM002",
+            "checkpoint_data": sample_checkpoint_data,
+        }
+
+        with app.test_request_context(json=payload):
+            response, status_code = controller.register_checkpoint()
+
+        assert status_code == 202
+        data = response.get_json()
+        assert data["status"] == "accepted"
+        partition, entry_id = data["receipt"].split(":")
+        assert redis_client.xlen(stream.stream_name(int(partition))) == 1
+        register_use_case.execute.assert_not_called()
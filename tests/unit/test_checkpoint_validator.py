@@ -0,0 +1,88 @@
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+from marshmallow import ValidationError
+
+from src.domain.value_objects.unit_status import UnitStatus
+from src.presentation.schemas.checkpoint_schemas import \
+    RegisterCheckpointSchema
+from src.presentation.schemas.checkpoint_validator import (
+    CheckpointPayloadValidator, build_checkpoint, loads)
+
+PAST = (datetime.utcnow() - timedelta(hours=1)).isoformat()
+FUTURE = (datetime.utcnow() + timedelta(days=1)).isoformat()
+
+
+def payload(**checkpoint_data):
+    return {
+        "tracking_id": "FAST001",
+        "checkpoint_data": {"status": "PICKED_UP", **checkpoint_data},
+    }
+
+
+def schema_result(raw):
+    """Resultado del camino marshmallow: objetos de dominio o mensajes de error"""
+    try:
+        return build_checkpoint(RegisterCheckpointSchema().load(raw))
+    except ValidationError as e:
+        return e.messages
+
+
+def validator_result(raw):
+    try:
+        return CheckpointPayloadValidator().load(raw)
+    except ValidationError as e:
+        return e.messages
+
+
+class TestCheckpointPayloadValidator:
+    """Tests para el validador rápido del payload de checkpoint"""
+
+    @pytest.mark.parametrize(
+        "raw",
+        [
+            payload(timestamp=PAST, location="Bogotá", notes="ok", operator_id="OP1"),
+            payload(timestamp=PAST, location=None),
+            payload(timestamp=FUTURE),
+            payload(timestamp="15/01/2024"),
+            payload(timestamp=None),
+            payload(timestamp=PAST, status="LOST"),
+            payload(timestamp=PAST, location="x" * 201),
+            payload(timestamp=PAST, operator_id=42),
+            payload(timestamp=PAST, extra="campo"),
+            {"tracking_id": "AB", "checkpoint_data": {"status": "PICKED_UP"}},
+            {"tracking_id": "BAD ID!", "checkpoint_data": {"status": "PICKED_UP"}},
+            {"tracking_id": 123, "checkpoint_data": {"status": "PICKED_UP"}},
+            {"checkpoint_data": {"status": "PICKED_UP"}},
+            {"tracking_id": "FAST001"},
+            ["no", "es", "un", "objeto"],
+        ],
+    )
+    def test_matches_schema_results(self, raw):
+        """Test que el validador da los mismos resultados y errores que el schema"""
+        assert validator_result(raw) == schema_result(raw)
+
+    def test_valid_payload_skips_schema(self):
+        """Test que un payload válido no pasa por marshmallow"""
+        validator = CheckpointPayloadValidator()
+
+        with patch.object(validator.schema, "load") as schema_load:
+            tracking_id, checkpoint_data = validator.load(payload(timestamp=PAST))
+
+        schema_load.assert_not_called()
+        assert str(tracking_id) == "FAST001"
+        assert checkpoint_data.status == UnitStatus.PICKED_UP
+        assert checkpoint_data.timestamp == datetime.fromisoformat(PAST)
+
+    def test_missing_timestamp_defaults_to_now(self):
+        """Test que sin timestamp se usa la hora actual, como en el schema"""
+        _, checkpoint_data = CheckpointPayloadValidator().load(payload())
+
+        assert datetime.utcnow() - checkpoint_data.timestamp < timedelta(seconds=5)
+
+    def test_loads_accepts_bytes(self):
+        """Test del decodificador JSON rápido"""
+        assert loads(b'{"tracking_id": "FAST001"}') == {"tracking_id": "FAST001"}
+        with pytest.raises(ValueError):
+            loads(b"{no json")
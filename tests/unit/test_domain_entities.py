@@ -4,9 +4,11 @@ import pytest
 
 from src.domain.entities.checkpoint import Checkpoint
 from src.domain.entities.unit import Unit
+from src.domain.read_models.unit_summary import UnitSummary
 from src.domain.value_objects.checkpoint_data import CheckpointData
 from src.domain.value_objects.tracking_id import TrackingId
-from src.domain.value_objects.unit_status import UnitStatus
+from src.domain.value_objects.unit_status import (UnitStatus,
+                                                  first_invalid_transition)
 
 
 class TestTrackingId:
@@ -76,6 +78,34 @@ class TestUnitStatus:
         next_statuses = UnitStatus.get_next_valid_statuses(UnitStatus.DELIVERED)
         assert len(next_statuses) == 0
 
+    def test_transition_matrix_matches_table(self):
+        """Test que la matriz compilada coincide con la tabla de transiciones"""
+        for status in UnitStatus:
+            for target in UnitStatus:
+                assert status.can_transition_to(target) == (
+                    target in UnitStatus.get_next_valid_statuses(status)
+                )
+
+    def test_first_invalid_transition(self):
+        """Test de la validación de una secuencia de transiciones"""
+        route = [
+            UnitStatus.PICKED_UP,
+            UnitStatus.IN_TRANSIT,
+            UnitStatus.AT_FACILITY,
+            UnitStatus.OUT_FOR_DELIVERY,
+            UnitStatus.DELIVERED,
+        ]
+
+        assert first_invalid_transition(UnitStatus.CREATED, route) is None
+        assert first_invalid_transition(UnitStatus.CREATED, []) is None
+        assert first_invalid_transition(UnitStatus.PICKED_UP, route) == 0
+        assert (
+            first_invalid_transition(
+                UnitStatus.CREATED, route + [UnitStatus.IN_TRANSIT]
+            )
+            == 5
+        )
+
 
 class TestCheckpointData:
     """Tests para el value object CheckpointData"""
@@ -114,6 +144,30 @@ class TestCheckpointData:
                 location=long_location,
             )
 
+    def test_fingerprint_identifies_same_scan(self):
+        """Test que la huella depende solo de los datos del escaneo"""
+        timestamp = datetime(2024, 1, 15, 10, 30)
+        scan = CheckpointData(
+            status=UnitStatus.PICKED_UP,
+            timestamp=timestamp,
+            location="Bogotá",
+            operator_id="OP001",
+        )
+        same_scan = CheckpointData(
+            status=UnitStatus.PICKED_UP,
+            timestamp=timestamp,
+            location="Bogotá",
+            notes="Reintento del escáner",
+            operator_id="OP001",
+        )
+        other_scan = CheckpointData(
+            status=UnitStatus.PICKED_UP, timestamp=timestamp, location="Medellín"
+        )
+
+        assert scan.fingerprint("TEST123456") == same_scan.fingerprint("TEST123456")
+        assert scan.fingerprint("TEST123456") != other_scan.fingerprint("TEST123456")
+        assert scan.fingerprint("TEST123456") != scan.fingerprint("TEST654321")
+
 
 class TestUnit:
     """Tests para la entidad Unit"""
@@ -180,6 +234,153 @@ class TestUnit:
         ):
             unit.add_checkpoint(past_checkpoint)
 
+    def test_late_checkpoint_within_reorder_window(self):
+        """Test que un checkpoint tardío se inserta en su posición cronológica"""
+        start = datetime.utcnow() - timedelta(hours=2)
+        unit = Unit(
+            tracking_id=TrackingId("TEST123"),
+            current_status=UnitStatus.CREATED,
+            created_at=start,
+            updated_at=start,
+            checkpoints=[],
+        )
+        window = timedelta(minutes=30)
+        unit.add_checkpoint(
+            CheckpointData(status=UnitStatus.PICKED_UP, timestamp=start)
+        )
+        unit.add_checkpoint(
+            CheckpointData(
+                status=UnitStatus.AT_FACILITY, timestamp=start + timedelta(minutes=20)
+            )
+        )
+        unit.mark_checkpoints_persisted()
+
+        late = CheckpointData(
+            status=UnitStatus.IN_TRANSIT, timestamp=start + timedelta(minutes=10)
+        )
+        unit.add_checkpoint(late, reorder_window=window)
+
+        assert [cp.status for cp in unit.checkpoints] == [
+            UnitStatus.PICKED_UP,
+            UnitStatus.IN_TRANSIT,
+            UnitStatus.AT_FACILITY,
+        ]
+        assert unit.current_status == UnitStatus.AT_FACILITY
+        assert unit.get_pending_checkpoints() == [late]
+
+        # Fuera de la ventana se mantiene el rechazo
+        with pytest.raises(ValueError, match="debe ser posterior al último"):
+            unit.add_checkpoint(
+                CheckpointData(
+                    status=UnitStatus.IN_TRANSIT,
+                    timestamp=start - timedelta(minutes=20),
+                ),
+                reorder_window=window,
+            )
+
+    def test_late_checkpoint_must_fit_neighbours(self):
+        """Test que un checkpoint tardío respeta las transiciones vecinas"""
+        start = datetime.utcnow() - timedelta(hours=2)
+        unit = Unit(
+            tracking_id=TrackingId("TEST123"),
+            current_status=UnitStatus.CREATED,
+            created_at=start,
+            updated_at=start,
+            checkpoints=[],
+        )
+        unit.add_checkpoint(
+            CheckpointData(status=UnitStatus.PICKED_UP, timestamp=start)
+        )
+        unit.add_checkpoint(
+            CheckpointData(
+                status=UnitStatus.IN_TRANSIT, timestamp=start + timedelta(minutes=20)
+            )
+        )
+
+        late = CheckpointData(
+            status=UnitStatus.DELIVERED, timestamp=start + timedelta(minutes=10)
+        )
+        with pytest.raises(ValueError, match="No se puede cambiar de PICKED_UP"):
+            unit.add_checkpoint(late, reorder_window=timedelta(hours=1))
+        assert len(unit.checkpoints) == 2
+
+    def test_late_checkpoint_with_last_timestamp(self):
+        """Test que un checkpoint con el timestamp del último se rechaza"""
+        start = datetime.utcnow() - timedelta(hours=2)
+        unit = Unit(
+            tracking_id=TrackingId("TEST123"),
+            current_status=UnitStatus.CREATED,
+            created_at=start,
+            updated_at=start,
+            checkpoints=[],
+        )
+        unit.add_checkpoint(
+            CheckpointData(status=UnitStatus.PICKED_UP, timestamp=start)
+        )
+
+        with pytest.raises(ValueError, match="mismo timestamp"):
+            unit.add_checkpoint(
+                CheckpointData(status=UnitStatus.IN_TRANSIT, timestamp=start),
+                reorder_window=timedelta(minutes=30),
+            )
+        assert len(unit.checkpoints) == 1
+        assert unit.current_status == UnitStatus.PICKED_UP
+
+    def test_pending_checkpoints_tracking(self):
+        """Test para el seguimiento de checkpoints pendientes de persistir"""
+        tracking_id = TrackingId("TEST123")
+        unit = Unit.create(tracking_id)
+        unit.mark_checkpoints_persisted()
+
+        checkpoint_data = CheckpointData(
+            status=UnitStatus.PICKED_UP, timestamp=datetime.utcnow()
+        )
+        unit.add_checkpoint(checkpoint_data)
+
+        assert unit.get_pending_checkpoints() == [checkpoint_data]
+        unit.mark_checkpoints_persisted()
+        assert unit.get_pending_checkpoints() == []
+        assert len(unit.checkpoints) == 2
+
+    def test_add_checkpoints_sequence(self):
+        """Test que una secuencia se valida de una vez y reporta los rechazos"""
+        start = datetime.utcnow() - timedelta(hours=5)
+        sequence = [
+            CheckpointData(status=status, timestamp=start + timedelta(hours=hours))
+            for hours, status in enumerate(
+                [
+                    UnitStatus.PICKED_UP,
+                    UnitStatus.DELIVERED,
+                    UnitStatus.IN_TRANSIT,
+                    UnitStatus.OUT_FOR_DELIVERY,
+                    UnitStatus.DELIVERED,
+                ]
+            )
+        ]
+        # Mismo timestamp que el anterior: se rechaza como en add_checkpoint
+        sequence.insert(
+            3,
+            CheckpointData(
+                status=UnitStatus.AT_FACILITY, timestamp=sequence[2].timestamp
+            ),
+        )
+
+        unit = Unit.create_for_checkpoint(TrackingId("TEST123"), sequence[0])
+
+        errors = unit.add_checkpoints(sequence)
+
+        assert errors == {
+            1: "No se puede cambiar de PICKED_UP a DELIVERED",
+            3: "El timestamp del nuevo checkpoint debe ser posterior al último",
+        }
+        assert unit.current_status == UnitStatus.DELIVERED
+        assert [cp.status for cp in unit.get_pending_checkpoints()] == [
+            UnitStatus.PICKED_UP,
+            UnitStatus.IN_TRANSIT,
+            UnitStatus.OUT_FOR_DELIVERY,
+            UnitStatus.DELIVERED,
+        ]
+
     def test_unit_is_delivered(self):
         """Test para verificar si unidad está entregada"""
         tracking_id = TrackingId("TEST123")
@@ -202,6 +403,31 @@ class TestUnit:
         assert unit.get_delivery_time() is not None
 
 
+class TestUnitSummary:
+    """Tests para el read model UnitSummary"""
+
+    def test_to_dict_matches_unit_listing_fields(self):
+        """Test que el resumen produce los campos del listado de Unit"""
+        unit = Unit.create(TrackingId("SUMMARY123"))
+        delivered_at = datetime.utcnow()
+        summary = UnitSummary(
+            id=unit.id,
+            tracking_id=str(unit.tracking_id),
+            current_status=UnitStatus.DELIVERED,
+            created_at=unit.created_at,
+            updated_at=unit.updated_at,
+            delivered_at=delivered_at,
+        )
+
+        data = summary.to_dict()
+
+        assert "checkpoints" not in data
+        assert set(data) == set(unit.to_dict()) - {"checkpoints"}
+        assert data["is_delivered"] is True
+        assert data["has_exception"] is False
+        assert data["delivery_time"] == delivered_at.isoformat()
+
+
 class TestCheckpoint:
     """Tests para la entidad Checkpoint"""
 
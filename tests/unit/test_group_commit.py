@@ -0,0 +1,112 @@
+import threading
+from datetime import datetime
+from unittest.mock import Mock
+
+import pytest
+
+from src.domain.value_objects.checkpoint_data import CheckpointData
+from src.domain.value_objects.tracking_id import TrackingId
+from src.domain.value_objects.unit_status import UnitStatus
+from src.infrastructure.database.group_commit import (GroupCommitCoordinator,
+                                                      create_group_commit)
+
+
+def echo_group(items):
+    """Resultado por item: el tracking ID o un error si es DELIVERED"""
+    return [
+        (
+            ValueError(f"No se puede cambiar de CREATED a {data.status.value}")
+            if data.status == UnitStatus.DELIVERED
+            else {"tracking_id": str(tracking_id)}
+        )
+        for tracking_id, data in items
+    ]
+
+
+def submit_concurrently(coordinator, statuses):
+    """Envía un checkpoint por hilo y retorna el resultado o error de cada uno"""
+    outcomes = [None] * len(statuses)
+    barrier = threading.Barrier(len(statuses))
+
+    def scan(index):
+        barrier.wait()
+        try:
+            outcomes[index] = coordinator.submit(
+                TrackingId(f"GROUP{index:03d}"),
+                CheckpointData(status=statuses[index], timestamp=datetime.utcnow()),
+            )
+        except ValueError as e:
+            outcomes[index] = e
+
+    threads = [
+        threading.Thread(target=scan, args=(index,)) for index in range(len(statuses))
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return outcomes
+
+
+class TestGroupCommitCoordinator:
+    """Tests para el coordinador de group commit"""
+
+    def test_concurrent_checkpoints_share_one_group(self):
+        """Test que los checkpoints de la ventana se registran juntos"""
+        use_case = Mock()
+        use_case.execute_group.side_effect = echo_group
+        coordinator = GroupCommitCoordinator(use_case, window=0.5, max_batch_size=4)
+
+        outcomes = submit_concurrently(
+            coordinator,
+            [
+                UnitStatus.PICKED_UP,
+                UnitStatus.DELIVERED,
+                UnitStatus.PICKED_UP,
+                UnitStatus.EXCEPTION,
+            ],
+        )
+
+        # El grupo se llenó: un solo commit sin esperar toda la ventana
+        assert use_case.execute_group.call_count == 1
+        assert outcomes[0] == {"tracking_id": "GROUP000"}
+        assert isinstance(outcomes[1], ValueError)
+        assert outcomes[3] == {"tracking_id": "GROUP003"}
+
+    def test_groups_are_capped_at_max_batch_size(self):
+        """Test que un grupo no supera max_batch_size"""
+        use_case = Mock()
+        use_case.execute_group.side_effect = echo_group
+        coordinator = GroupCommitCoordinator(use_case, window=0.05, max_batch_size=2)
+
+        outcomes = submit_concurrently(coordinator, [UnitStatus.PICKED_UP] * 5)
+
+        sizes = [len(call.args[0]) for call in use_case.execute_group.call_args_list]
+        assert sum(sizes) == 5
+        assert max(sizes) <= 2
+        assert all(outcome["tracking_id"].startswith("GROUP") for outcome in outcomes)
+
+    def test_group_failure_reaches_every_request(self):
+        """Test que un error al registrar el grupo se entrega a cada request"""
+        use_case = Mock()
+        use_case.execute_group.side_effect = RuntimeError("base de datos caída")
+        coordinator = GroupCommitCoordinator(use_case, window=0.001)
+
+        with pytest.raises(RuntimeError, match="base de datos caída"):
+            coordinator.submit(
+                TrackingId("GROUP001"),
+                CheckpointData(
+                    status=UnitStatus.PICKED_UP, timestamp=datetime.utcnow()
+                ),
+            )
+
+    def test_disabled_by_default(self, monkeypatch):
+        """Test que el group commit es opcional"""
+        monkeypatch.delenv("CHECKPOINT_GROUP_COMMIT_WINDOW_MS", raising=False)
+        assert create_group_commit(Mock()) is None
+
+        monkeypatch.setenv("CHECKPOINT_GROUP_COMMIT_WINDOW_MS", "3")
+        monkeypatch.setenv("CHECKPOINT_GROUP_COMMIT_MAX_BATCH", "16")
+        coordinator = create_group_commit(Mock())
+        assert coordinator.window == pytest.approx(0.003)
+        assert coordinator.max_batch_size == 16
@@ -0,0 +1,164 @@
+import threading
+import time
+
+from flask import Flask, jsonify
+
+from src.infrastructure.security.idempotency import (InMemoryIdempotencyStore,
+                                                     RedisIdempotencyStore,
+                                                     idempotent)
+from tests.fakes import FakeRedis
+
+RECORD = {"fingerprint": "abc", "status_code": 201, "body": "{}"}
+
+
+class TestInMemoryIdempotencyStore:
+    """Tests para el almacén de idempotencia en memoria"""
+
+    def test_reserve_and_replay(self):
+        """Test que solo el primer request reserva la clave"""
+        store = InMemoryIdempotencyStore()
+
+        assert store.reserve("key-1") is True
+        assert store.reserve("key-1") is False
+
+        store.complete("key-1", RECORD)
+        assert store.wait("key-1", timeout=0) == RECORD
+
+    def test_release_allows_retry(self):
+        """Test que una reserva liberada puede volver a tomarse"""
+        store = InMemoryIdempotencyStore()
+        store.reserve("key-1")
+
+        store.release("key-1")
+
+        assert store.wait("key-1", timeout=0) is None
+        assert store.reserve("key-1") is True
+
+    def test_store_is_bounded(self):
+        """Test que se descartan las entradas más antiguas al superar el límite"""
+        store = InMemoryIdempotencyStore(max_entries=2)
+        for key in ("key-1", "key-2", "key-3"):
+            store.reserve(key)
+            store.complete(key, RECORD)
+
+        assert store.wait("key-1", timeout=0) is None
+        assert store.wait("key-3", timeout=0) == RECORD
+
+    def test_entries_expire(self):
+        """Test de expiración por TTL"""
+        store = InMemoryIdempotencyStore(ttl=0)
+        store.reserve("key-1")
+        store.complete("key-1", RECORD)
+
+        assert store.reserve("key-1") is True
+
+    def test_concurrent_duplicate_waits_for_first_request(self):
+        """Test que un duplicado concurrente recibe la respuesta del primero"""
+        store = InMemoryIdempotencyStore()
+        store.reserve("key-1")
+        results = []
+        waiter = threading.Thread(
+            target=lambda: results.append(store.wait("key-1", timeout=5))
+        )
+
+        waiter.start()
+        time.sleep(0.05)
+        store.complete("key-1", RECORD)
+        waiter.join()
+
+        assert results == [RECORD]
+
+
+class TestRedisIdempotencyStore:
+    """Tests para el almacén de idempotencia en Redis"""
+
+    def test_reserve_complete_and_wait(self):
+        """Test del ciclo de reserva y respuesta guardada"""
+        store = RedisIdempotencyStore(FakeRedis())
+
+        assert store.reserve("key-1") is True
+        assert store.reserve("key-1") is False
+        assert store.wait("key-1", timeout=0) is None
+
+        store.complete("key-1", RECORD)
+        assert store.wait("key-1", timeout=0) == RECORD
+
+    def test_release_allows_retry(self):
+        """Test que una reserva liberada puede volver a tomarse"""
+        store = RedisIdempotencyStore(FakeRedis())
+        store.reserve("key-1")
+
+        store.release("key-1")
+
+        assert store.reserve("key-1") is True
+
+
+class TestIdempotentDecorator:
+    """Tests para el decorador de Idempotency-Key"""
+
+    def setup_method(self):
+        self.store = InMemoryIdempotencyStore()
+        self.responses = []
+        self.calls = 0
+        app = Flask(__name__)
+
+        @app.route("/scan", methods=["POST"])
+        @idempotent(self.store)
+        def scan():
+            self.calls += 1
+            return self.responses.pop(0)
+
+        self.client = app.test_client()
+
+    def post(self, api_key="client-a"):
+        return self.client.post(
+            "/scan",
+            data="{}",
+            headers={"X-API-Key": api_key, "Idempotency-Key": "retry-1"},
+        )
+
+    def test_temporary_failures_are_not_replayed(self):
+        """Test que un 409 por concurrencia o un 429 no se guardan"""
+        with Flask(__name__).app_context():
+            self.responses = [
+                (jsonify({"error": "concurrent_modification"}), 409),
+                (jsonify({"error": "rate_limit_exceeded"}), 429),
+                (jsonify({"status": "ok"}), 201),
+            ]
+
+        assert self.post().status_code == 409
+        assert self.post().status_code == 429
+        assert self.post().status_code == 201
+        replay = self.post()
+
+        assert replay.status_code == 201
+        assert replay.headers["Idempotent-Replayed"] == "true"
+        assert self.calls == 3
+
+    def test_final_conflicts_are_replayed(self):
+        """Test que un 409 definitivo se reenvía como resultado final"""
+        with Flask(__name__).app_context():
+            self.responses = [(jsonify({"error": "duplicate_checkpoint"}), 409)]
+
+        self.post()
+        replay = self.post()
+
+        assert replay.status_code == 409
+        assert replay.headers["Idempotent-Replayed"] == "true"
+        assert self.calls == 1
+
+    def test_keys_are_scoped_per_client(self):
+        """Test que dos clientes con la misma clave no comparten respuestas"""
+        with Flask(__name__).app_context():
+            self.responses = [
+                (jsonify({"client": "a"}), 201),
+                (jsonify({"client": "b"}), 201),
+            ]
+
+        first = self.post("client-a")
+        other = self.post("client-b")
+
+        assert first.get_json() == {"client": "a"}
+        assert other.get_json() == {"client": "b"}
+        assert "Idempotent-Replayed" not in other.headers
+        assert self.calls == 2
@@ -0,0 +1,110 @@
+import redis
+
+from src.domain.value_objects.tracking_id import TrackingId
+from src.infrastructure.external.tracking_cache import (
+    RedisTrackingHistoryCache, create_tracking_history_cache)
+from src.infrastructure.monitoring.metrics import metrics
+from tests.fakes import FakeRedis
+
+TRACKING_ID = TrackingId("CACHE001")
+HISTORY = {"unit": {"tracking_id": "CACHE001"}, "total_checkpoints": 2}
+
+
+class FailingRedis:
+    """Cliente de Redis que falla en todos los comandos"""
+
+    def get(self, name):
+        raise redis.ConnectionError("redis down")
+
+    def set(self, name, value, ex=None, nx=False):
+        raise redis.ConnectionError("redis down")
+
+
+class TestRedisTrackingHistoryCache:
+    """Tests para la caché del historial de tracking en Redis"""
+
+    def test_miss_then_hit(self):
+        """Test de lectura read-through con métricas de hit y miss"""
+        cache = RedisTrackingHistoryCache(FakeRedis())
+        hits = metrics.get_counter("tracking_cache_hits")
+        misses = metrics.get_counter("tracking_cache_misses")
+
+        cached, version = cache.get(TRACKING_ID, "all")
+        assert cached is None
+        cache.set(TRACKING_ID, "all", HISTORY, version)
+
+        assert cache.get(TRACKING_ID, "all") == (HISTORY, version)
+        assert cache.get(TRACKING_ID, "other")[0] is None
+        assert metrics.get_counter("tracking_cache_hits") == hits + 1
+        assert metrics.get_counter("tracking_cache_misses") == misses + 2
+
+    def test_invalidate_drops_every_variant(self):
+        """Test que invalidar una unidad descarta todas sus variantes"""
+        cache = RedisTrackingHistoryCache(FakeRedis())
+        other = TrackingId("CACHE002")
+        for variant in ("all", "page-2"):
+            cache.set(TRACKING_ID, variant, HISTORY, cache.get(TRACKING_ID, variant)[1])
+        cache.set(other, "all", HISTORY, cache.get(other, "all")[1])
+
+        cache.invalidate([TRACKING_ID])
+
+        assert cache.get(TRACKING_ID, "all")[0] is None
+        assert cache.get(TRACKING_ID, "page-2")[0] is None
+        assert cache.get(other, "all")[0] == HISTORY
+        # Las respuestas posteriores a la invalidación se leen normalmente
+        _, version = cache.get(TRACKING_ID, "all")
+        cache.set(TRACKING_ID, "all", {"total_checkpoints": 3}, version)
+        assert cache.get(TRACKING_ID, "all")[0] == {"total_checkpoints": 3}
+
+    def test_invalidation_during_miss_discards_result(self):
+        """Test que un resultado leído antes de una invalidación no se sirve"""
+        cache = RedisTrackingHistoryCache(FakeRedis())
+        _, version = cache.get(TRACKING_ID, "all")
+
+        # Una escritura invalida la unidad mientras el miss consulta la base
+        cache.invalidate([TRACKING_ID])
+        cache.set(TRACKING_ID, "all", HISTORY, version)
+
+        assert cache.get(TRACKING_ID, "all")[0] is None
+
+    def test_final_units_use_longer_ttl(self):
+        """Test que las unidades en estado final usan su propio TTL"""
+        client = FakeRedis()
+        cache = RedisTrackingHistoryCache(client, ttl=30, final_ttl=3600)
+
+        cache.set(TRACKING_ID, "active", HISTORY, "0")
+        cache.set(TRACKING_ID, "final", HISTORY, "0", final=True)
+
+        expires = {
+            key.rsplit(":", 1)[-1]: expires_at
+            for key, (_, expires_at) in client.values.items()
+        }
+        assert expires["final"] - expires["active"] > 3000
+
+    def test_entries_expire(self):
+        """Test de expiración por TTL"""
+        client = FakeRedis()
+        cache = RedisTrackingHistoryCache(client)
+        cache.set(TRACKING_ID, "all", HISTORY, "0")
+
+        for key, (value, _) in list(client.values.items()):
+            client.values[key] = (value, 0)
+
+        assert cache.get(TRACKING_ID, "all")[0] is None
+
+    def test_redis_errors_are_misses(self):
+        """Test que un error de Redis no falla el request"""
+        cache = RedisTrackingHistoryCache(FailingRedis())
+        errors = metrics.get_counter("tracking_cache_errors")
+
+        assert cache.get(TRACKING_ID, "all") == (None, None)
+        cache.set(TRACKING_ID, "all", HISTORY, "0")
+        cache.invalidate([TRACKING_ID])
+
+        assert metrics.get_counter("tracking_cache_errors") == errors + 3
+
+    def test_disabled_by_default(self, monkeypatch):
+        """Test que la caché se deshabilita con TTL 0"""
+        monkeypatch.delenv("TRACKING_CACHE_TTL_SECONDS", raising=False)
+
+        assert create_tracking_history_cache() is None
@@ -0,0 +1,98 @@
+import threading
+import time
+from unittest.mock import Mock
+
+from sqlalchemy.exc import OperationalError
+
+from src.domain.value_objects.tracking_id import TrackingId
+from src.infrastructure.database.unit_locks import (AdvisoryUnitLock,
+                                                    StripedUnitLock,
+                                                    create_unit_lock)
+from src.infrastructure.monitoring.metrics import metrics
+
+
+class TestStripedUnitLock:
+    """Tests para los locks en memoria por tracking ID"""
+
+    def test_serializes_writes_to_same_unit(self):
+        """Test que dos escrituras de la misma unidad no se solapan"""
+        unit_lock = StripedUnitLock(stripes=8)
+        tracking_id = TrackingId("HOT123")
+        active = []
+        overlaps = []
+
+        def write():
+            with unit_lock.hold(tracking_id):
+                active.append(1)
+                overlaps.append(len(active))
+                time.sleep(0.01)
+                active.pop()
+
+        threads = [threading.Thread(target=write) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert overlaps == [1] * 5
+
+    def test_reports_wait_time(self):
+        """Test que el tiempo de espera por el lock se reporta como métrica"""
+        unit_lock = StripedUnitLock(stripes=8)
+        before = len(metrics.timers.get("unit_lock_wait_ms_lock:striped", []))
+
+        with unit_lock.hold(TrackingId("HOT123")):
+            pass
+
+        assert len(metrics.timers["unit_lock_wait_ms_lock:striped"]) == before + 1
+
+    def test_timeout_proceeds_without_lock(self):
+        """Test que tras el timeout la escritura continúa en lugar de fallar"""
+        unit_lock = StripedUnitLock(stripes=1, timeout=0.01)
+        before = metrics.get_counter("unit_lock_timeouts", tags={"lock": "striped"})
+        executed = []
+
+        with unit_lock.hold(TrackingId("HOT123")):
+            with unit_lock.hold(TrackingId("HOT456")):
+                executed.append(True)
+
+        assert executed == [True]
+        assert (
+            metrics.get_counter("unit_lock_timeouts", tags={"lock": "striped"})
+            == before + 1
+        )
+
+
+class TestAdvisoryUnitLock:
+    """Tests para los advisory locks de PostgreSQL"""
+
+    def test_takes_transaction_scoped_lock(self):
+        """Test que el lock se toma con pg_advisory_xact_lock y un timeout"""
+        session = Mock()
+        unit_lock = AdvisoryUnitLock(timeout=1.5, session=session)
+
+        with unit_lock.hold(TrackingId("HOT123")):
+            pass
+
+        statements = [str(call.args[0]) for call in session.execute.call_args_list]
+        assert statements[0] == "SET LOCAL lock_timeout = '1500ms'"
+        assert "pg_advisory_xact_lock" in statements[1]
+        session.rollback.assert_not_called()
+
+    def test_lock_timeout_proceeds_without_lock(self):
+        """Test que un timeout revierte la transacción y continúa"""
+        session = Mock()
+        session.execute.side_effect = [None, OperationalError("lock", {}, None)]
+        unit_lock = AdvisoryUnitLock(session=session)
+
+        with unit_lock.hold(TrackingId("HOT123")):
+            pass
+
+        session.rollback.assert_called_once()
+
+    def test_factory_selects_lock_by_database(self):
+        """Test que se usan advisory locks solo en PostgreSQL"""
+        assert isinstance(
+            create_unit_lock("postgresql://user:pass@db/tracking"), AdvisoryUnitLock
+        )
+        assert isinstance(create_unit_lock("sqlite:///tracking.db"), StripedUnitLock)
@@ -1,16 +1,28 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 from unittest.mock import MagicMock, Mock
 
 import pytest
 
-from src.application.use_cases.get_tracking_history import \
-    GetTrackingHistoryUseCase
+from src.application.use_cases.get_tracking_history import (
+    CachedGetTrackingHistoryUseCase, GetTrackingHistoryUseCase)
 from src.application.use_cases.list_units_by_status import \
     ListUnitsByStatusUseCase
+from src.application.use_cases.pagination import decode_cursor, encode_cursor
 from src.application.use_cases.register_checkpoint import \
     RegisterCheckpointUseCase
+from src.application.use_cases.register_checkpoint_batch import \
+    RegisterCheckpointBatchUseCase
+from src.application.use_cases.register_shipment_checkpoint import \
+    RegisterShipmentCheckpointUseCase
 from src.domain.entities.checkpoint import Checkpoint
+from src.domain.entities.shipment import Shipment
 from src.domain.entities.unit import Unit
+from src.domain.exceptions import (ConcurrentModificationError,
+                                   DuplicateCheckpointError)
+from src.domain.read_models.checkpoint_view import (CHECKPOINT_VIEW_FIELDS,
+                                                    CheckpointView)
+from src.domain.read_models.unit_summary import (UNIT_SUMMARY_FIELDS,
+                                                 UnitSummary)
 from src.domain.value_objects.checkpoint_data import CheckpointData
 from src.domain.value_objects.tracking_id import TrackingId
 from src.domain.value_objects.unit_status import UnitStatus
@@ -22,30 +34,21 @@ class TestRegisterCheckpointUseCase:
     def setup_method(self):
         """Setup para cada test"""
         self.unit_repository = Mock()
-        self.checkpoint_repository = Mock()
-        self.unit_service = Mock()
+        self.unit_repository.save_with_checkpoint.return_value = set()
 
         self.use_case = RegisterCheckpointUseCase(
             unit_repository=self.unit_repository,
-            checkpoint_repository=self.checkpoint_repository,
-            unit_service=self.unit_service,
         )
 
     def test_register_checkpoint_success(self):
         """Test para registro exitoso de checkpoint"""
         # Arrange
         tracking_id = TrackingId("TEST123")
+        unit = Unit.create(tracking_id)
         checkpoint_data = CheckpointData(
             status=UnitStatus.PICKED_UP, timestamp=datetime.utcnow()
         )
-
-        unit = Unit.create(tracking_id)
-        checkpoint = Checkpoint.create(tracking_id, checkpoint_data)
-
         self.unit_repository.find_by_tracking_id.return_value = unit
-        self.unit_service.add_checkpoint.return_value = unit
-        self.unit_repository.save.return_value = unit
-        self.checkpoint_repository.save.return_value = checkpoint
 
         # Act
         result = self.use_case.execute(tracking_id, checkpoint_data)
@@ -53,51 +56,52 @@ class TestRegisterCheckpointUseCase:
         # Assert
         assert "checkpoint" in result
         assert "unit" in result
+        assert result["unit"]["current_status"] == UnitStatus.PICKED_UP.value
         self.unit_repository.find_by_tracking_id.assert_called_once_with(tracking_id)
-        self.unit_service.add_checkpoint.assert_called_once_with(
-            tracking_id, checkpoint_data
+        self.unit_repository.save_with_checkpoint.assert_called_once()
+        saved_unit, saved_checkpoint = (
+            self.unit_repository.save_with_checkpoint.call_args.args
         )
-        self.unit_repository.save.assert_called_once_with(unit)
-        self.checkpoint_repository.save.assert_called_once()
+        assert saved_unit is unit
+        assert saved_checkpoint.checkpoint_data == checkpoint_data
+        assert result["checkpoint"]["id"] == saved_checkpoint.id
 
-    def test_register_checkpoint_unit_not_found(self):
-        """Test para crear unidad automáticamente cuando no existe"""
+    def test_register_checkpoint_single_load_and_write(self):
+        """Test que el registro carga la unidad una vez y no recarga tras guardar"""
         # Arrange
         tracking_id = TrackingId("TEST123")
+        self.unit_repository.find_by_tracking_id.return_value = Unit.create(tracking_id)
         checkpoint_data = CheckpointData(
             status=UnitStatus.PICKED_UP, timestamp=datetime.utcnow()
         )
 
-        self.unit_repository.find_by_tracking_id.return_value = None
+        # Act
+        self.use_case.execute(tracking_id, checkpoint_data)
 
-        # Mock para la unidad creada
-        created_unit = Unit(
-            id="test-id",
-            tracking_id=tracking_id,
-            current_status=UnitStatus.CREATED,
-            created_at=datetime.utcnow(),
-            updated_at=datetime.utcnow(),
-            checkpoints=[],
-        )
-        self.unit_repository.save.return_value = created_unit
+        # Assert
+        assert self.unit_repository.find_by_tracking_id.call_count == 1
+        self.unit_repository.save.assert_not_called()
+        self.unit_repository.find_by_id.assert_not_called()
 
-        # Mock para el checkpoint creado
-        created_checkpoint = Checkpoint(
-            id="checkpoint-id",
-            tracking_id=tracking_id,
-            checkpoint_data=checkpoint_data,
-            created_at=datetime.utcnow(),
+    def test_register_checkpoint_unit_not_found(self):
+        """Test para crear unidad automáticamente cuando no existe"""
+        # Arrange
+        tracking_id = TrackingId("TEST123")
+        checkpoint_data = CheckpointData(
+            status=UnitStatus.PICKED_UP, timestamp=datetime.utcnow()
         )
-        self.checkpoint_repository.save.return_value = created_checkpoint
+
+        self.unit_repository.find_by_tracking_id.return_value = None
 
         # Act
         result = self.use_case.execute(tracking_id, checkpoint_data)
 
         # Assert - Debería crear la unidad automáticamente
         assert result is not None
-        # save se llama 2 veces: una para crear la unidad y otra para guardar después de agregar checkpoint
-        assert self.unit_repository.save.call_count == 2
-        self.checkpoint_repository.save.assert_called_once()
+        assert result["unit"]["tracking_id"] == str(tracking_id)
+        assert result["unit"]["current_status"] == UnitStatus.PICKED_UP.value
+        # La unidad nueva y su checkpoint se guardan en una sola escritura
+        self.unit_repository.save_with_checkpoint.assert_called_once()
 
     def test_register_checkpoint_invalid_transition(self):
         """Test para error en transición inválida"""
@@ -110,11 +114,407 @@ class TestRegisterCheckpointUseCase:
 
         unit = Unit.create(tracking_id)
         self.unit_repository.find_by_tracking_id.return_value = unit
-        self.unit_service.add_checkpoint.side_effect = ValueError("Transición inválida")
 
         # Act & Assert
-        with pytest.raises(ValueError, match="Transición inválida"):
+        with pytest.raises(
+            ValueError, match="No se puede cambiar de CREATED a DELIVERED"
+        ):
+            self.use_case.execute(tracking_id, checkpoint_data)
+        self.unit_repository.save_with_checkpoint.assert_not_called()
+
+    def test_register_checkpoint_reports_duplicate_scan(self):
+        """Test que un escaneo ya registrado se reporta como duplicado"""
+        # Arrange
+        history_cache = Mock()
+        self.use_case.history_cache = history_cache
+        tracking_id = TrackingId("TEST123")
+        self.unit_repository.find_by_tracking_id.return_value = Unit.create(tracking_id)
+        checkpoint_data = CheckpointData(
+            status=UnitStatus.PICKED_UP, timestamp=datetime.utcnow()
+        )
+        self.unit_repository.save_with_checkpoint.return_value = {
+            checkpoint_data.fingerprint(tracking_id)
+        }
+
+        # Act & Assert
+        with pytest.raises(DuplicateCheckpointError):
+            self.use_case.execute(tracking_id, checkpoint_data)
+        history_cache.invalidate.assert_not_called()
+
+    def test_register_checkpoint_invalidates_history_cache(self):
+        """Test que el historial en caché se invalida solo tras guardar"""
+        # Arrange
+        history_cache = Mock()
+        self.use_case.history_cache = history_cache
+        tracking_id = TrackingId("TEST123")
+        self.unit_repository.find_by_tracking_id.return_value = Unit.create(tracking_id)
+
+        # Act
+        with pytest.raises(ValueError):
+            self.use_case.execute(
+                tracking_id,
+                CheckpointData(
+                    status=UnitStatus.DELIVERED, timestamp=datetime.utcnow()
+                ),
+            )
+        history_cache.invalidate.assert_not_called()
+        self.use_case.execute(
+            tracking_id,
+            CheckpointData(status=UnitStatus.PICKED_UP, timestamp=datetime.utcnow()),
+        )
+
+        # Assert
+        history_cache.invalidate.assert_called_once_with([tracking_id])
+
+    def test_register_checkpoint_holds_unit_lock_per_attempt(self):
+        """Test que cada intento de escritura se hace con el lock de la unidad"""
+        # Arrange
+        tracking_id = TrackingId("TEST123")
+        unit_lock = MagicMock()
+        self.use_case.unit_lock = unit_lock
+        self.unit_repository.find_by_tracking_id.side_effect = [
+            self.stored_unit(tracking_id),
+            self.stored_unit(tracking_id),
+        ]
+        self.unit_repository.save_with_checkpoint.side_effect = [
+            ConcurrentModificationError("TEST123"),
+            set(),
+        ]
+        checkpoint_data = CheckpointData(
+            status=UnitStatus.PICKED_UP, timestamp=datetime.utcnow()
+        )
+
+        # Act
+        self.use_case.execute(tracking_id, checkpoint_data)
+
+        # Assert
+        assert unit_lock.hold.call_count == 2
+        unit_lock.hold.assert_called_with(tracking_id)
+        assert unit_lock.hold.return_value.__exit__.call_count == 2
+
+    def stored_unit(self, tracking_id: TrackingId) -> Unit:
+        """Unidad persistida tal como la cargaría el repositorio"""
+        start = datetime.utcnow() - timedelta(hours=1)
+        return Unit(
+            tracking_id=tracking_id,
+            current_status=UnitStatus.CREATED,
+            created_at=start,
+            updated_at=start,
+            checkpoints=[],
+            version=1,
+        )
+
+    def test_register_checkpoint_retries_on_concurrent_modification(self):
+        """Test que un conflicto de versión recarga la unidad y reintenta"""
+        # Arrange
+        tracking_id = TrackingId("TEST123")
+        self.unit_repository.find_by_tracking_id.side_effect = [
+            self.stored_unit(tracking_id),
+            self.stored_unit(tracking_id),
+        ]
+        self.unit_repository.save_with_checkpoint.side_effect = [
+            ConcurrentModificationError("TEST123"),
+            set(),
+        ]
+        checkpoint_data = CheckpointData(
+            status=UnitStatus.PICKED_UP, timestamp=datetime.utcnow()
+        )
+
+        # Act
+        result = self.use_case.execute(tracking_id, checkpoint_data)
+
+        # Assert
+        assert result["unit"]["current_status"] == UnitStatus.PICKED_UP.value
+        assert self.unit_repository.find_by_tracking_id.call_count == 2
+        assert self.unit_repository.save_with_checkpoint.call_count == 2
+
+    def test_register_checkpoint_retries_are_bounded(self):
+        """Test que los reintentos por conflicto están acotados"""
+        # Arrange
+        tracking_id = TrackingId("TEST123")
+        self.use_case.max_retries = 2
+        self.unit_repository.find_by_tracking_id.side_effect = lambda _: (
+            self.stored_unit(tracking_id)
+        )
+        self.unit_repository.save_with_checkpoint.side_effect = (
+            ConcurrentModificationError("TEST123")
+        )
+        checkpoint_data = CheckpointData(
+            status=UnitStatus.PICKED_UP, timestamp=datetime.utcnow()
+        )
+
+        # Act & Assert
+        with pytest.raises(ConcurrentModificationError):
             self.use_case.execute(tracking_id, checkpoint_data)
+        assert self.unit_repository.save_with_checkpoint.call_count == 3
+
+
+class TestRegisterCheckpointBatchUseCase:
+    """Tests para el caso de uso RegisterCheckpointBatchUseCase"""
+
+    def setup_method(self):
+        """Setup para cada test"""
+        self.unit_repository = Mock()
+        self.unit_repository.find_by_tracking_ids.return_value = []
+        self.unit_repository.save_batch.return_value = set()
+        self.use_case = RegisterCheckpointBatchUseCase(
+            unit_repository=self.unit_repository, units_per_transaction=2
+        )
+        self.start = datetime.utcnow() - timedelta(hours=1)
+
+    def checkpoint(self, status: UnitStatus, minutes: int) -> CheckpointData:
+        return CheckpointData(
+            status=status, timestamp=self.start + timedelta(minutes=minutes)
+        )
+
+    def test_register_batch_groups_and_orders_by_unit(self):
+        """Test que los checkpoints se agrupan por unidad y se aplican en orden"""
+        # Arrange - los checkpoints de TEST1 llegan desordenados
+        first, second = TrackingId("TEST1"), TrackingId("TEST2")
+        items = [
+            (first, self.checkpoint(UnitStatus.IN_TRANSIT, 2)),
+            (second, self.checkpoint(UnitStatus.PICKED_UP, 1)),
+            (first, self.checkpoint(UnitStatus.PICKED_UP, 1)),
+        ]
+
+        # Act
+        result = self.use_case.execute(items)
+
+        # Assert
+        assert result["summary"] == {
+            "total": 3,
+            "succeeded": 3,
+            "duplicates": 0,
+            "failed": 0,
+        }
+        assert [r["index"] for r in result["results"]] == [0, 1, 2]
+        self.unit_repository.save_batch.assert_called_once()
+        new_units, updated_units, checkpoints = (
+            self.unit_repository.save_batch.call_args.args
+        )
+        assert len(new_units) == 2
+        assert updated_units == []
+        assert len(checkpoints) == 3
+        assert new_units[0].current_status == UnitStatus.IN_TRANSIT
+
+    def test_register_batch_reports_invalid_transitions_per_item(self):
+        """Test que una transición inválida solo falla su propio item"""
+        # Arrange
+        tracking_id = TrackingId("TEST1")
+        unit = Unit(
+            tracking_id=tracking_id,
+            current_status=UnitStatus.CREATED,
+            created_at=self.start,
+            updated_at=self.start,
+            checkpoints=[],
+        )
+        self.unit_repository.find_by_tracking_ids.return_value = [unit]
+        items = [
+            (tracking_id, self.checkpoint(UnitStatus.DELIVERED, 1)),
+            (tracking_id, self.checkpoint(UnitStatus.PICKED_UP, 2)),
+        ]
+
+        # Act
+        result = self.use_case.execute(items)
+
+        # Assert
+        assert result["results"][0]["status"] == "error"
+        assert result["results"][0]["error"] == "business_error"
+        assert result["results"][1]["status"] == "success"
+        new_units, updated_units, _ = self.unit_repository.save_batch.call_args.args
+        assert new_units == []
+        assert updated_units == [unit]
+
+    def test_register_batch_uses_one_transaction_per_chunk(self):
+        """Test que el lote se persiste por bloques de unidades"""
+        # Arrange
+        items = [
+            (TrackingId(f"TEST{i}"), self.checkpoint(UnitStatus.PICKED_UP, 1))
+            for i in range(5)
+        ]
+
+        # Act
+        self.use_case.execute(items)
+
+        # Assert - 5 unidades en bloques de 2
+        assert self.unit_repository.find_by_tracking_ids.call_count == 3
+        assert self.unit_repository.save_batch.call_count == 3
+
+    def test_register_batch_marks_chunk_failed_on_persistence_error(self):
+        """Test que un error de persistencia se reporta en los items del bloque"""
+        # Arrange
+        self.unit_repository.save_batch.side_effect = RuntimeError("db down")
+        items = [(TrackingId("TEST1"), self.checkpoint(UnitStatus.PICKED_UP, 1))]
+
+        # Act
+        result = self.use_case.execute(items)
+
+        # Assert
+        assert result["results"][0]["error"] == "internal_error"
+        assert result["summary"]["failed"] == 1
+
+    def test_register_batch_reports_duplicate_scans(self):
+        """Test que los escaneos omitidos por duplicados no se reportan como éxito"""
+        # Arrange
+        duplicate = self.checkpoint(UnitStatus.PICKED_UP, 1)
+        items = [
+            (TrackingId("TEST1"), duplicate),
+            (TrackingId("TEST2"), self.checkpoint(UnitStatus.PICKED_UP, 1)),
+        ]
+        self.unit_repository.save_batch.return_value = {duplicate.fingerprint("TEST1")}
+
+        # Act
+        result = self.use_case.execute(items)
+
+        # Assert
+        assert [r["status"] for r in result["results"]] == ["duplicate", "success"]
+        assert "checkpoint_id" not in result["results"][0]
+        assert result["summary"] == {
+            "total": 2,
+            "succeeded": 1,
+            "duplicates": 1,
+            "failed": 0,
+        }
+
+    def test_register_batch_invalidates_history_of_committed_chunks(self):
+        """Test que solo se invalida el historial de los bloques confirmados"""
+        # Arrange
+        history_cache = Mock()
+        self.use_case.history_cache = history_cache
+        self.unit_repository.save_batch.side_effect = [set(), RuntimeError("db down")]
+        items = [
+            (TrackingId(f"TEST{i}"), self.checkpoint(UnitStatus.PICKED_UP, 1))
+            for i in range(4)
+        ]
+
+        # Act
+        self.use_case.execute(items)
+
+        # Assert - el segundo bloque falló y no se invalida
+        history_cache.invalidate.assert_called_once()
+        invalidated = history_cache.invalidate.call_args.args[0]
+        assert sorted(str(tracking_id) for tracking_id in invalidated) == [
+            "TEST0",
+            "TEST1",
+        ]
+
+    def test_register_batch_accepts_late_checkpoints_within_window(self):
+        """Test que un checkpoint tardío dentro de la ventana se reordena"""
+        # Arrange - historial persistido PICKED_UP -> AT_FACILITY
+        tracking_id = TrackingId("TEST1")
+        unit = Unit(
+            tracking_id=tracking_id,
+            current_status=UnitStatus.CREATED,
+            created_at=self.start,
+            updated_at=self.start,
+            checkpoints=[],
+        )
+        unit.add_checkpoint(self.checkpoint(UnitStatus.PICKED_UP, 1))
+        unit.add_checkpoint(self.checkpoint(UnitStatus.AT_FACILITY, 20))
+        unit.mark_checkpoints_persisted()
+        self.unit_repository.find_by_tracking_ids.return_value = [unit]
+        self.use_case.reorder_window = timedelta(minutes=15)
+        items = [
+            (tracking_id, self.checkpoint(UnitStatus.IN_TRANSIT, 10)),
+            (tracking_id, self.checkpoint(UnitStatus.IN_TRANSIT, 2)),
+        ]
+
+        # Act
+        result = self.use_case.execute(items)
+
+        # Assert - el de 18 minutos de retraso queda fuera de la ventana
+        assert [r["status"] for r in result["results"]] == ["success", "error"]
+        assert unit.current_status == UnitStatus.AT_FACILITY
+        assert [cp.status for cp in unit.checkpoints] == [
+            UnitStatus.PICKED_UP,
+            UnitStatus.IN_TRANSIT,
+            UnitStatus.AT_FACILITY,
+        ]
+
+
+class TestRegisterShipmentCheckpointUseCase:
+    """Tests para el caso de uso RegisterShipmentCheckpointUseCase"""
+
+    def setup_method(self):
+        """Setup para cada test"""
+        self.shipment_repository = Mock()
+        self.unit_repository = Mock()
+        self.unit_repository.save_batch.return_value = set()
+        self.use_case = RegisterShipmentCheckpointUseCase(
+            shipment_repository=self.shipment_repository,
+            unit_repository=self.unit_repository,
+        )
+        self.start = datetime.utcnow() - timedelta(hours=1)
+        self.shipment_repository.find_by_tracking_id.return_value = Shipment.create(
+            TrackingId("GUIA0001"), ["unit-1", "unit-2"]
+        )
+
+    def unit(self, tracking_id: str, status: UnitStatus) -> Unit:
+        """Unidad persistida con solo su último checkpoint"""
+        return Unit(
+            tracking_id=TrackingId(tracking_id),
+            current_status=status,
+            created_at=self.start,
+            updated_at=self.start,
+            checkpoints=[CheckpointData(status=status, timestamp=self.start)],
+            version=1,
+        )
+
+    def test_applies_checkpoint_to_valid_units_in_one_batch(self):
+        """Test que las unidades válidas se guardan juntas y las demás se reportan"""
+        picked_up = self.unit("SHIPU001", UnitStatus.PICKED_UP)
+        delivered = self.unit("SHIPU002", UnitStatus.DELIVERED)
+        self.unit_repository.find_by_shipment_id.return_value = [picked_up, delivered]
+        checkpoint_data = CheckpointData(
+            status=UnitStatus.IN_TRANSIT, timestamp=datetime.utcnow()
+        )
+
+        result = self.use_case.execute(TrackingId("GUIA0001"), checkpoint_data)
+
+        assert result["summary"] == {
+            "total": 2,
+            "succeeded": 1,
+            "duplicates": 0,
+            "failed": 1,
+        }
+        assert result["results"][1]["error"] == "business_error"
+        self.unit_repository.save_batch.assert_called_once()
+        new_units, updated_units, checkpoints = (
+            self.unit_repository.save_batch.call_args.args
+        )
+        assert new_units == []
+        assert updated_units == [picked_up]
+        assert [cp.id for cp in checkpoints] == [result["results"][0]["checkpoint_id"]]
+
+    def test_shipment_not_found(self):
+        """Test que un envío inexistente produce un error de negocio"""
+        self.shipment_repository.find_by_tracking_id.return_value = None
+
+        with pytest.raises(ValueError, match="Envío no encontrado"):
+            self.use_case.execute(
+                TrackingId("GUIA9999"),
+                CheckpointData(
+                    status=UnitStatus.IN_TRANSIT, timestamp=datetime.utcnow()
+                ),
+            )
+
+    def test_retries_with_fresh_units_after_conflict(self):
+        """Test que un conflicto de versión recarga las unidades y reintenta"""
+        self.unit_repository.find_by_shipment_id.side_effect = lambda _: [
+            self.unit("SHIPU001", UnitStatus.PICKED_UP)
+        ]
+        self.unit_repository.save_batch.side_effect = [
+            ConcurrentModificationError("SHIPU001"),
+            set(),
+        ]
+
+        result = self.use_case.execute(
+            TrackingId("GUIA0001"),
+            CheckpointData(status=UnitStatus.IN_TRANSIT, timestamp=datetime.utcnow()),
+        )
+
+        assert result["summary"]["succeeded"] == 1
+        assert self.unit_repository.find_by_shipment_id.call_count == 2
 
 
 class TestGetTrackingHistoryUseCase:
@@ -134,23 +534,21 @@ class TestGetTrackingHistoryUseCase:
         """Test para obtener historial exitosamente"""
         # Arrange
         tracking_id = TrackingId("TEST123")
-        unit = Unit.create(tracking_id)
+        unit = summary("TEST123")
 
-        checkpoint1 = Checkpoint.create(
-            tracking_id,
-            CheckpointData(status=UnitStatus.CREATED, timestamp=datetime.utcnow()),
+        checkpoint1 = CheckpointView(
+            status=UnitStatus.CREATED, timestamp=datetime.utcnow()
         )
-
-        checkpoint2 = Checkpoint.create(
-            tracking_id,
-            CheckpointData(status=UnitStatus.PICKED_UP, timestamp=datetime.utcnow()),
+        checkpoint2 = CheckpointView(
+            status=UnitStatus.PICKED_UP, timestamp=datetime.utcnow()
         )
 
-        self.unit_repository.find_by_tracking_id.return_value = unit
-        self.checkpoint_repository.find_by_tracking_id.return_value = [
+        self.unit_repository.find_summary_by_tracking_id.return_value = unit
+        self.checkpoint_repository.find_views_by_tracking_id.return_value = [
             checkpoint1,
             checkpoint2,
         ]
+        self.checkpoint_repository.count_by_tracking_id.return_value = 2
 
         # Act
         result = self.use_case.execute(tracking_id)
@@ -160,16 +558,112 @@ class TestGetTrackingHistoryUseCase:
         assert "checkpoints" in result
         assert "total_checkpoints" in result
         assert result["total_checkpoints"] == 2
-        self.unit_repository.find_by_tracking_id.assert_called_once_with(tracking_id)
-        self.checkpoint_repository.find_by_tracking_id.assert_called_once_with(
-            tracking_id
+        assert result["unit"] == unit.to_dict()
+        self.unit_repository.find_summary_by_tracking_id.assert_called_once_with(
+            tracking_id, fields=UNIT_SUMMARY_FIELDS
+        )
+        self.checkpoint_repository.find_views_by_tracking_id.assert_called_once_with(
+            tracking_id,
+            fields=CHECKPOINT_VIEW_FIELDS,
+            limit=101,
+            before=None,
+            newest_first=True,
+        )
+
+    def test_get_tracking_history_with_fields(self):
+        """Test que solo se consultan y retornan los campos solicitados"""
+        tracking_id = TrackingId("TEST123")
+        self.unit_repository.find_summary_by_tracking_id.return_value = summary(
+            "TEST123"
+        )
+        self.checkpoint_repository.find_views_by_tracking_id.return_value = [
+            CheckpointView(status=UnitStatus.PICKED_UP)
+        ]
+
+        result = self.use_case.execute(
+            tracking_id, fields=("unit.current_status", "checkpoints.status")
+        )
+
+        assert result == {
+            "unit": {"current_status": "CREATED"},
+            "checkpoints": [{"status": "PICKED_UP"}],
+            "pagination": {"limit": 100, "has_more": False},
+            "next_cursor": None,
+        }
+        self.unit_repository.find_summary_by_tracking_id.assert_called_once_with(
+            tracking_id, fields=("current_status",)
+        )
+        self.checkpoint_repository.find_views_by_tracking_id.assert_called_once_with(
+            tracking_id, fields=("status",), limit=101, before=None, newest_first=True
         )
+        self.checkpoint_repository.count_by_tracking_id.assert_not_called()
+
+    def test_get_tracking_history_pages_newest_first(self):
+        """Test que el historial se pagina por keyset del más reciente"""
+        tracking_id = TrackingId("TEST123")
+        now = datetime.utcnow()
+        views = [
+            CheckpointView(
+                id=f"cp-{step}",
+                status=UnitStatus.IN_TRANSIT,
+                timestamp=now - timedelta(minutes=step),
+            )
+            for step in range(3)
+        ]
+        self.unit_repository.find_summary_by_tracking_id.return_value = summary(
+            "TEST123"
+        )
+        self.checkpoint_repository.find_views_by_tracking_id.return_value = views
+        self.checkpoint_repository.count_by_tracking_id.return_value = 40
+
+        result = self.use_case.execute(tracking_id, limit=2, before=now)
+
+        self.checkpoint_repository.find_views_by_tracking_id.assert_called_once_with(
+            tracking_id,
+            fields=CHECKPOINT_VIEW_FIELDS,
+            limit=3,
+            before=(now, ""),
+            newest_first=True,
+        )
+        assert [cp["id"] for cp in result["checkpoints"]] == ["cp-0", "cp-1"]
+        assert result["pagination"] == {"limit": 2, "has_more": True}
+        assert decode_cursor(result["next_cursor"]) == (views[1].timestamp, "cp-1")
+        assert result["total_checkpoints"] == 40
+
+        self.checkpoint_repository.find_views_by_tracking_id.reset_mock()
+        self.checkpoint_repository.count_by_tracking_id.reset_mock()
+        next_page = self.use_case.execute(
+            tracking_id, limit=2, cursor=result["next_cursor"]
+        )
+
+        assert self.checkpoint_repository.find_views_by_tracking_id.call_args.kwargs[
+            "before"
+        ] == (views[1].timestamp, "cp-1")
+        # El total solo se cuenta en la primera página
+        assert "total_checkpoints" not in next_page
+        self.checkpoint_repository.count_by_tracking_id.assert_not_called()
+
+    def test_get_tracking_history_total_only(self):
+        """Test que el total sin checkpoints se cuenta sin cargarlos"""
+        tracking_id = TrackingId("TEST123")
+        self.unit_repository.find_summary_by_tracking_id.return_value = summary(
+            "TEST123"
+        )
+        self.checkpoint_repository.count_by_tracking_id.return_value = 7
+
+        result = self.use_case.execute(tracking_id, fields=("total_checkpoints",))
+
+        assert result == {"total_checkpoints": 7}
+        self.unit_repository.find_summary_by_tracking_id.assert_called_once_with(
+            tracking_id, fields=()
+        )
+        self.checkpoint_repository.find_views_by_tracking_id.assert_not_called()
 
     def test_get_tracking_history_unit_not_found(self):
         """Test para error cuando unidad no existe"""
         # Arrange
         tracking_id = TrackingId("TEST123")
-        self.unit_repository.find_by_tracking_id.return_value = None
+        self.unit_repository.find_summary_by_tracking_id.return_value = None
 
         # Act & Assert
         with pytest.raises(
@@ -178,6 +672,94 @@ class TestGetTrackingHistoryUseCase:
             self.use_case.execute(tracking_id)
 
 
+class TestCachedGetTrackingHistoryUseCase:
+    """Tests para la caché read-through del historial de tracking"""
+
+    def setup_method(self):
+        """Setup para cada test"""
+        self.inner = Mock()
+        self.cache = Mock()
+        self.use_case = CachedGetTrackingHistoryUseCase(self.inner, self.cache)
+
+    def test_hit_skips_use_case(self):
+        """Test que un hit retorna la respuesta guardada sin consultar"""
+        # Arrange
+        self.cache.get.return_value = ({"total_checkpoints": 3}, "7")
+
+        # Act
+        result = self.use_case.execute(TrackingId("TEST123"))
+
+        # Assert
+        assert result == {"total_checkpoints": 3}
+        self.inner.execute.assert_not_called()
+        self.cache.set.assert_not_called()
+
+    def test_miss_executes_and_stores_result(self):
+        """Test que un miss ejecuta el caso de uso y guarda su resultado"""
+        # Arrange
+        tracking_id = TrackingId("TEST123")
+        history = {"unit": {"is_delivered": True}, "checkpoints": []}
+        self.cache.get.return_value = (None, "7")
+        self.inner.execute.return_value = history
+
+        # Act
+        result = self.use_case.execute(tracking_id, fields=["unit"], limit=10)
+
+        # Assert
+        assert result == history
+        self.inner.execute.assert_called_once_with(
+            tracking_id, fields=["unit"], limit=10, before=None, cursor=None
+        )
+        variant = self.cache.get.call_args.args[1]
+        self.cache.set.assert_called_once_with(
+            tracking_id, variant, history, "7", final=True
+        )
+
+    def test_unit_not_found_is_not_cached(self):
+        """Test que el error de unidad inexistente no se guarda"""
+        # Arrange
+        self.cache.get.return_value = (None, "7")
+        self.inner.execute.side_effect = ValueError("no encontrada")
+
+        # Act & Assert
+        with pytest.raises(ValueError):
+            self.use_case.execute(TrackingId("TEST123"))
+        self.cache.set.assert_not_called()
+
+    def test_variant_depends_on_query(self):
+        """Test que cada combinación de campos y página es una variante"""
+        variant = CachedGetTrackingHistoryUseCase.variant
+        before = datetime(2024, 1, 15, 10, 30)
+
+        assert variant(["unit", "checkpoints"], 100, None, None) == variant(
+            ["checkpoints", "unit"], 100, None, None
+        )
+        assert (
+            len(
+                {
+                    variant(None, 100, None, None),
+                    variant(["unit"], 100, None, None),
+                    variant(None, 50, None, None),
+                    variant(None, 100, before, None),
+                    variant(None, 100, None, "cursor"),
+                }
+            )
+            == 5
+        )
+
+
+def summary(tracking_id: str) -> UnitSummary:
+    """Resumen de una unidad creada, como lo retorna el repositorio"""
+    now = datetime.utcnow()
+    return UnitSummary(
+        id=f"id-{tracking_id}",
+        tracking_id=tracking_id,
+        current_status=UnitStatus.CREATED,
+        created_at=now,
+        updated_at=now,
+    )
+
+
 class TestListUnitsByStatusUseCase:
     """Tests para el caso de uso ListUnitsByStatusUseCase"""
 
@@ -190,10 +772,11 @@ class TestListUnitsByStatusUseCase:
         """Test para listar unidades por estado exitosamente"""
         # Arrange
         status = UnitStatus.PICKED_UP
-        unit1 = Unit.create(TrackingId("TEST123"))
-        unit2 = Unit.create(TrackingId("TEST456"))
+        unit1 = summary("TEST123")
+        unit2 = summary("TEST456")
 
-        self.unit_repository.find_by_status.return_value = [unit1, unit2]
+        self.unit_repository.count_by_status.return_value = 2
+        self.unit_repository.find_summaries_by_status.return_value = [unit1, unit2]
 
         # Act
         result = self.use_case.execute(status, limit=10, offset=0)
@@ -205,21 +788,29 @@ class TestListUnitsByStatusUseCase:
         assert len(result["units"]) == 2
         assert result["status"] == status.value
         assert result["pagination"]["total"] == 2
-        self.unit_repository.find_by_status.assert_called_once_with(status)
+        self.unit_repository.find_summaries_by_status.assert_called_once_with(
+            status, limit=10, offset=0, fields=None
+        )
 
     def test_list_units_by_status_with_pagination(self):
         """Test para listar unidades con paginación"""
         # Arrange
         status = UnitStatus.PICKED_UP
-        units = [Unit.create(TrackingId(f"TEST{i}")) for i in range(5)]
+        units = [summary(f"TEST{i}") for i in range(5)]
 
-        self.unit_repository.find_by_status.return_value = units
+        # La página la recorta el repositorio en SQL
+        self.unit_repository.count_by_status.return_value = 5
+        self.unit_repository.find_summaries_by_status.return_value = units[1:3]
 
         # Act
         result = self.use_case.execute(status, limit=2, offset=1)
 
         # Assert
+        self.unit_repository.find_summaries_by_status.assert_called_once_with(
+            status, limit=2, offset=1, fields=None
+        )
         assert len(result["units"]) == 2
+        assert result["pagination"]["total"] == 5
         assert result["pagination"]["limit"] == 2
         assert result["pagination"]["offset"] == 1
         assert result["pagination"]["has_more"] is True
@@ -228,7 +819,8 @@ class TestListUnitsByStatusUseCase:
         """Test para límite inválido"""
         # Arrange
         status = UnitStatus.PICKED_UP
-        self.unit_repository.find_by_status.return_value = []
+        self.unit_repository.count_by_status.return_value = 0
+        self.unit_repository.find_summaries_by_status.return_value = []
 
         # Act
         result = self.use_case.execute(status, limit=0, offset=0)
@@ -240,10 +832,82 @@ class TestListUnitsByStatusUseCase:
         """Test para offset inválido"""
         # Arrange
         status = UnitStatus.PICKED_UP
-        self.unit_repository.find_by_status.return_value = []
+        self.unit_repository.count_by_status.return_value = 0
+        self.unit_repository.find_summaries_by_status.return_value = []
 
         # Act
         result = self.use_case.execute(status, limit=10, offset=-1)
 
         # Assert
         assert result["pagination"]["offset"] == 0  # Valor por defecto
+
+    def test_offset_past_the_end_skips_page_query(self):
+        """Test que un offset fuera del total no consulta la página"""
+        self.unit_repository.count_by_status.return_value = 3
+
+        result = self.use_case.execute(UnitStatus.PICKED_UP, limit=10, offset=50)
+
+        self.unit_repository.find_summaries_by_status.assert_not_called()
+        assert result["units"] == []
+        assert result["pagination"]["has_more"] is False
+
+    def test_cursor_pages_by_keyset(self):
+        """Test que con cursor se pagina por keyset sin contar el total"""
+        units = [summary(f"CURSOR{i}") for i in range(3)]
+        self.unit_repository.find_summaries_by_status.return_value = units
+        cursor = encode_cursor(units[0].created_at, units[0].id)
+
+        result = self.use_case.execute(UnitStatus.CREATED, limit=2, cursor=cursor)
+
+        self.unit_repository.find_summaries_by_status.assert_called_once_with(
+            UnitStatus.CREATED,
+            limit=3,
+            after=(units[0].created_at, units[0].id),
+            fields=None,
+        )
+        self.unit_repository.count_by_status.assert_not_called()
+        assert len(result["units"]) == 2
+        assert result["pagination"]["total"] is None
+        assert result["pagination"]["has_more"] is True
+        assert decode_cursor(result["next_cursor"]) == (
+            units[1].created_at,
+            units[1].id,
+        )
+
+    def test_last_cursor_page_has_no_next_cursor(self):
+        """Test que la última página no retorna next_cursor"""
+        unit = summary("CURSOR9")
+        self.unit_repository.find_summaries_by_status.return_value = [unit]
+
+        result = self.use_case.execute(
+            UnitStatus.CREATED, limit=2, cursor=encode_cursor(unit.created_at, unit.id)
+        )
+
+        assert result["pagination"]["has_more"] is False
+        assert result["next_cursor"] is None
+
+    def test_list_units_with_fields(self):
+        """Test que fields se aplica en la consulta y en la respuesta"""
+        self.unit_repository.count_by_status.return_value = 1
+        self.unit_repository.find_summaries_by_status.return_value = [
+            summary("FIELDS1")
+        ]
+
+        result = self.use_case.execute(
+            UnitStatus.CREATED, fields=("tracking_id", "current_status")
+        )
+
+        self.unit_repository.find_summaries_by_status.assert_called_once_with(
+            UnitStatus.CREATED,
+            limit=100,
+            offset=0,
+            fields=("tracking_id", "current_status"),
+        )
+        assert result["units"] == [
+            {"tracking_id": "FIELDS1", "current_status": "CREATED"}
+        ]
+
+    def test_invalid_cursor(self):
+        """Test que un cursor mal formado es un error de validación"""
+        with pytest.raises(ValueError, match="Cursor inválido"):
+            self.use_case.execute(UnitStatus.CREATED, cursor="no-es-un-cursor")